@@ -1,3 +1,5 @@
 from DRF_API_Library.celery import app as celery_app
+# Counts database connections of web and worker processes
+from DRF_API_Library import db  # noqa: F401
 
 __all__ = ("celery_app",)
@@ -0,0 +1,141 @@
+import functools
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+from prometheus_client import Counter
+from rest_framework import status
+from rest_framework.response import Response
+
+from DRF_API_Library.replicas import use_database
+from DRF_API_Library.versioning import etag_matches
+
+
+RESPONSES = Counter(
+    "response_cache_requests_total",
+    "GET responses looked up in the response cache by outcome",
+    ["view", "outcome"],
+)
+
+
+def version_key(model) -> str:
+    return f"response:version:{model._meta.label_lower}"
+
+
+def model_versions(models) -> list[int]:
+    """Current versions of the models, read in one round trip.
+
+    A missing version starts from the clock, so it never goes back
+    to a value that responses were stored under before eviction.
+    """
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+
+    return [versions[key] for key in keys]
+
+
+def bump_model_version(model) -> None:
+    try:
+        cache.incr(version_key(model))
+    except ValueError:
+        model_versions([model])
+
+
+@functools.lru_cache(maxsize=None)
+def _bump_on_commit(model):
+    return lambda: bump_model_version(model)
+
+
+def invalidate_responses(model) -> None:
+    """Invalidate cached responses built from rows of the model.
+
+    The version is bumped again after commit, so a reader racing
+    the transaction can not keep stale responses under the new version.
+    Call it after queryset updates, which send no signals.
+    """
+    bump_model_version(model)
+
+    # Once per transaction however many rows it changes
+    bump = _bump_on_commit(model)
+    if not any(
+        callback[1] is bump for callback in connection.run_on_commit
+    ):
+        transaction.on_commit(bump)
+
+
+def response_cache_key(request, models, scope: str) -> str:
+    versions = ":".join(str(version) for version in model_versions(models))
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+
+    return (
+        f"response:{versions}:{scope}:"
+        f"{request.get_host()}{request.path}?{query}"
+    )
+
+
+class CachedResponseMixin:
+    """Serve GET responses from the shared cache.
+
+    cache_models maps list and retrieve to the models their responses
+    are built from. Responses are keyed by the versions of these
+    models, the route, the query string and, for actions in
+    cache_per_user, the user. Saving or deleting a row of a model bumps
+    its version, so responses are never served stale. Misses are read
+    from the primary even in views reading from replicas, a replica
+    behind the new version would store old rows under it. ETags of the
+    responses are cached with them and answer If-None-Match.
+    """
+
+    cache_models = {}
+    cache_per_user = ()
+
+    def list(self, request, *args, **kwargs):
+        return self._cached("list", super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached(
+            "retrieve", super().retrieve, request, *args, **kwargs
+        )
+
+    def _cached(self, action: str, view, request, *args, **kwargs):
+        if action not in self.cache_models:
+            return view(request, *args, **kwargs)
+
+        scope = (
+            f"user-{request.user.pk}" if action in self.cache_per_user
+            else "public"
+        )
+        key = response_cache_key(request, self.cache_models[action], scope)
+        label = f"{self.__class__.__name__}.{action}"
+        cached = cache.get(key)
+
+        if cached is not None:
+            RESPONSES.labels(label, "hit").inc()
+            data, etag = cached
+            headers = {"ETag": etag} if etag else None
+            if etag and etag_matches(request, "If-None-Match", etag):
+                return Response(
+                    status=status.HTTP_304_NOT_MODIFIED, headers=headers
+                )
+
+            return Response(data, headers=headers)
+
+        RESPONSES.labels(label, "miss").inc()
+        with use_database(DEFAULT_DB_ALIAS):
+            response = view(request, *args, **kwargs)
+        if response.status_code == 200:
+            # Stored with the ETag the view computed before the body
+            cache.set(
+                key,
+                (response.data, response.get("ETag")),
+                settings.RESPONSE_CACHE_TIMEOUT,
+            )
+
+        return response
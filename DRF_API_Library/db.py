@@ -0,0 +1,70 @@
+import logging
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from prometheus_client import Counter
+from prometheus_client.core import GaugeMetricFamily
+
+
+logger = logging.getLogger(__name__)
+
+CONNECTIONS_OPENED = Counter(
+    "db_connections_opened_total",
+    "Database connections opened by web and worker processes",
+    ["alias"],
+)
+
+
+@receiver(connection_created, dispatch_uid="db_connection_metrics")
+def count_connection(sender, connection, **kwargs):
+    """Handle new database connections"""
+    CONNECTIONS_OPENED.labels(connection.alias).inc()
+
+
+class ServerConnectionsCollector:
+    """Saturation of the Postgres server, read when metrics are scraped.
+
+    Reports connections to the database by state next to
+    max_connections of the server.
+    """
+
+    @staticmethod
+    def _families():
+        return (
+            GaugeMetricFamily(
+                "db_server_connections",
+                "Connections to the database by state",
+                labels=["state"],
+            ),
+            GaugeMetricFamily(
+                "db_server_max_connections",
+                "Connections the database server accepts",
+            ),
+        )
+
+    def describe(self):
+        # Lets the registry learn the names without querying
+        return self._families()
+
+    def collect(self):
+        by_state, max_connections = self._families()
+
+        try:
+            with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+                cursor.execute(
+                    "SELECT coalesce(state, 'unknown'), count(*) "
+                    "FROM pg_stat_activity "
+                    "WHERE datname = current_database() GROUP BY 1"
+                )
+                for state, count in cursor.fetchall():
+                    by_state.add_metric([state], count)
+
+                cursor.execute("SHOW max_connections")
+                max_connections.add_metric([], int(cursor.fetchone()[0]))
+        except Exception:
+            logger.exception("Error collecting database connections")
+            return
+
+        yield by_state
+        yield max_connections
@@ -0,0 +1,51 @@
+import hmac
+import os
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+    multiprocess,
+)
+
+from DRF_API_Library.db import ServerConnectionsCollector
+
+
+SERVER_CONNECTIONS = ServerConnectionsCollector()
+REGISTRY.register(SERVER_CONNECTIONS)
+
+
+def is_scraper(request) -> bool:
+    """Tell whether the request comes with METRICS_TOKEN or from staff"""
+    if request.user.is_staff:
+        return True
+
+    token = settings.METRICS_TOKEN
+    return bool(token) and hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    )
+
+
+def metrics(request):
+    """Expose Prometheus metrics to scrapers with METRICS_TOKEN.
+
+    Scrapes query the primary database for its connections, so the
+    endpoint is closed to anyone else. With PROMETHEUS_MULTIPROC_DIR
+    set, metrics of every web and worker process sharing the directory
+    are aggregated, otherwise only this process is reported.
+    """
+    if not is_scraper(request):
+        return HttpResponseForbidden()
+
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(SERVER_CONNECTIONS)
+
+    return HttpResponse(
+        generate_latest(registry), content_type=CONTENT_TYPE_LATEST
+    )
@@ -0,0 +1,209 @@
+import os
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from prometheus_client import Counter, Gauge, Histogram
+from requests.adapters import HTTPAdapter
+
+
+REQUEST_SECONDS = Histogram(
+    "outbound_request_seconds",
+    "Latency of calls to external services",
+    ["upstream", "outcome"],
+)
+RETRIES = Counter(
+    "outbound_retries_total",
+    "Calls to external services that were retried",
+    ["upstream"],
+)
+CIRCUIT_OPEN = Gauge(
+    "outbound_circuit_open",
+    "1 while calls to the external service are short-circuited",
+    ["upstream"],
+)
+
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of calling an upstream that keeps failing"""
+
+
+class CircuitBreaker:
+    """Stop calling an upstream after consecutive failures.
+
+    Once failure_threshold calls in a row fail, calls are refused for
+    reset_timeout seconds. After that a single trial call is let
+    through, and its outcome closes or reopens the circuit.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or (
+                time.monotonic() - self._opened_at < self.reset_timeout
+            ):
+                return False
+
+            self._trial = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+        CIRCUIT_OPEN.labels(self.name).set(0)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._trial = False
+                CIRCUIT_OPEN.labels(self.name).set(1)
+
+
+class OutboundClient:
+    """HTTP client for one external service.
+
+    Keeps a pooled keep-alive session, bounds every call with connect
+    and read timeouts, retries connection errors and throttling with
+    jittered exponential backoff, and guards the service with a circuit
+    breaker. Latency of every call is exported per upstream.
+    """
+
+    RETRY_STATUSES = frozenset([429, 502, 503, 504])
+
+    def __init__(
+            self,
+            name: str,
+            connect_timeout: float,
+            read_timeout: float,
+            retries: int,
+            backoff: float,
+            backoff_max: float,
+            pool_size: int,
+            failure_threshold: int,
+            reset_timeout: float,
+    ):
+        self.name = name
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def request(
+            self, method: str, url: str, retries: int = None, **kwargs
+    ) -> requests.Response:
+        """Send a request, retrying failures that are safe to repeat.
+
+        Connection errors and 429/502/503/504 answers are retried,
+        read timeouts only for idempotent methods, since the upstream
+        may already have acted on the request.
+        """
+        retries = self.retries if retries is None else retries
+        kwargs.setdefault("timeout", self.timeout)
+
+        for attempt in range(retries + 1):
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"Circuit to {self.name} is open")
+
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.RequestException as e:
+                self._observe("error", started)
+                self.breaker.record_failure()
+                if attempt == retries or not self._can_retry(method, e):
+                    raise
+            else:
+                self._observe(str(response.status_code), started)
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+
+                if (
+                    attempt == retries
+                    or response.status_code not in self.RETRY_STATUSES
+                ):
+                    return response
+
+            RETRIES.labels(self.name).inc()
+            time.sleep(self._backoff_time(attempt))
+
+    @staticmethod
+    def _can_retry(method: str, error: requests.RequestException) -> bool:
+        if isinstance(error, requests.exceptions.SSLError):
+            return False
+        if isinstance(error, requests.ConnectionError):
+            return True
+
+        return (
+            isinstance(error, requests.Timeout)
+            and method.upper() in IDEMPOTENT_METHODS
+        )
+
+    def _backoff_time(self, attempt: int) -> float:
+        """Full jitter, so throttled workers do not retry in lockstep"""
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff * 2 ** attempt)
+        )
+
+    def _observe(self, outcome: str, started: float) -> None:
+        REQUEST_SECONDS.labels(self.name, outcome).observe(
+            time.perf_counter() - started
+        )
+
+
+_clients = {}
+_clients_pid = None
+_clients_lock = threading.Lock()
+
+
+def outbound(name: str) -> OutboundClient:
+    """Return the client of the named upstream for this process.
+
+    Clients are created from OUTBOUND_HTTP on first use and recreated
+    in forked children, so worker processes never share sockets.
+    """
+    global _clients_pid
+
+    with _clients_lock:
+        if _clients_pid != os.getpid():
+            _clients.clear()
+            _clients_pid = os.getpid()
+
+        if name not in _clients:
+            options = {
+                **settings.OUTBOUND_HTTP["default"],
+                **settings.OUTBOUND_HTTP.get(name, {}),
+            }
+            _clients[name] = OutboundClient(name, **options)
+
+        return _clients[name]
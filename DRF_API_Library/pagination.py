@@ -0,0 +1,22 @@
+class KeysetPaginationMixin:
+    """Switch a viewset to keyset pagination with ?pagination=cursor.
+
+    Cursor pages skip the COUNT(*) and the OFFSET scan of page number
+    pagination, so the cost of a page does not grow with its depth.
+    """
+
+    keyset_pagination_class = None
+    keyset_query_param = "pagination"
+
+    @property
+    def paginator(self):
+        if (
+            not hasattr(self, "_paginator")
+            and self.request is not None
+            and self.request.query_params.get(
+                self.keyset_query_param
+            ) == "cursor"
+        ):
+            self._paginator = self.keyset_pagination_class()
+
+        return super().paginator
@@ -0,0 +1,186 @@
+import functools
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+
+
+class QueryPlan:
+    """Columns and relations of one model a serializer reads.
+
+    Single relations are joined with select_related, many relations
+    are prefetched with a queryset planned the same way. Columns are
+    limited with only() unless the serializer reads something that
+    cannot be traced to a field, like a method or __str__.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.fields = set()
+        self.all_fields = False
+        self.joins = {}
+        self.prefetches = {}
+
+    def add_serializer(self, serializer) -> None:
+        for field in serializer.fields.values():
+            if not field.write_only:
+                self.add_field(field)
+
+    def add_field(self, field) -> None:
+        if field.source == "*":
+            if isinstance(field, serializers.BaseSerializer):
+                self.add_serializer(field)
+            else:
+                # SerializerMethodField and alike read the whole object
+                self.all_fields = True
+            return
+
+        plan = self
+        attrs = field.source.split(".")
+        for attr in attrs[:-1]:
+            plan = plan.relation(attr)
+            if plan is None:
+                return
+
+        plan.add_last(attrs[-1], field)
+
+    def relation(self, attr: str):
+        """Return the plan of a related model, None if attr is not one"""
+        try:
+            model_field = self.model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            # A property or method of the model
+            self.all_fields = True
+            return None
+
+        if not model_field.is_relation:
+            self.fields.add(model_field.name)
+            return None
+
+        relations = (
+            self.prefetches
+            if model_field.one_to_many or model_field.many_to_many
+            else self.joins
+        )
+        if attr not in relations:
+            relations[attr] = QueryPlan(model_field.related_model)
+
+        return relations[attr]
+
+    def add_last(self, attr: str, field) -> None:
+        try:
+            model_field = self.model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            self.all_fields = True
+            return
+
+        if not model_field.is_relation:
+            self.fields.add(model_field.name)
+            return
+
+        if (
+            isinstance(field, PrimaryKeyRelatedField)
+            and model_field.concrete
+        ):
+            # Serialized from the foreign key column, without a join
+            self.fields.add(model_field.name)
+            return
+
+        plan = self.relation(attr)
+        if isinstance(field, serializers.ListSerializer):
+            plan.add_serializer(field.child)
+        elif isinstance(field, serializers.BaseSerializer):
+            plan.add_serializer(field)
+        elif not (
+            isinstance(field, ManyRelatedField)
+            and isinstance(field.child_relation, PrimaryKeyRelatedField)
+        ):
+            # Related objects rendered with __str__ or another field
+            plan.all_fields = True
+
+    def apply(self, queryset, required=()):
+        """Return the queryset loading everything the plan reads"""
+        select, prefetch, only = [], [], []
+        self._collect("", select, prefetch, only)
+
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+
+        return queryset.only(*only, *required)
+
+    def _collect(self, prefix: str, select, prefetch, only) -> None:
+        if self.all_fields:
+            names = {field.name for field in self.model._meta.concrete_fields}
+        else:
+            names = {self.model._meta.pk.name, *self.fields, *self.joins}
+        only.extend(f"{prefix}{name}" for name in sorted(names))
+
+        for name, plan in sorted(self.joins.items()):
+            select.append(f"{prefix}{name}")
+            plan._collect(f"{prefix}{name}__", select, prefetch, only)
+
+        for name, plan in sorted(self.prefetches.items()):
+            model_field = self.model._meta.get_field(name)
+            # Prefetched rows are matched to their parent by this key
+            required = [model_field.field.name] if (
+                model_field.one_to_many and model_field.auto_created
+            ) else []
+            prefetch.append(Prefetch(
+                f"{prefix}{name}",
+                queryset=plan.apply(
+                    plan.model._default_manager.all(), required
+                ),
+            ))
+
+
+@functools.lru_cache(maxsize=None)
+def plan_for(serializer_class) -> QueryPlan:
+    """Plan the queries of a model serializer class, cached per class"""
+    serializer = serializer_class()
+    plan = QueryPlan(serializer.Meta.model)
+    plan.add_serializer(serializer)
+
+    return plan
+
+
+class SerializerPrefetchMixin:
+    """Load what the serializer of an action reads in a fixed number
+    of queries.
+
+    The serializer tree of the action is traced back to model fields:
+    nested serializers and related fields become select_related joins
+    or planned prefetches, and columns no serializer reads are left out
+    with only(). New nested serializers so never add N+1 queries.
+    """
+
+    prefetch_actions = ("list", "retrieve")
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+
+        if self.action not in self.prefetch_actions:
+            return queryset
+
+        return plan_for(self.get_serializer_class()).apply(
+            queryset, self._ordering_fields(queryset)
+        )
+
+    @staticmethod
+    def _ordering_fields(queryset) -> list[str]:
+        """Model fields the queryset is ordered by, which cursor
+        pagination reads from the last row"""
+        fields = []
+        for name in queryset.query.order_by or queryset.model._meta.ordering:
+            if not isinstance(name, str):
+                continue
+            try:
+                fields.append(
+                    queryset.model._meta.get_field(name.lstrip("-")).name
+                )
+            except FieldDoesNotExist:
+                pass
+
+        return fields
@@ -0,0 +1,165 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from prometheus_client import Counter
+from rest_framework.permissions import SAFE_METHODS
+
+
+logger = logging.getLogger(__name__)
+
+READS = Counter(
+    "db_replica_reads_total",
+    "Requests of replica reading views by the database they read from",
+    ["database"],
+)
+
+# Database reads of the current request or task are routed to
+_read_database = ContextVar("read_database", default=DEFAULT_DB_ALIAS)
+
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery()
+            OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+        THEN 0
+        ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+class ReplicaRouter:
+    """Send reads to the database chosen for the current context.
+
+    Reads go to the primary unless a view switched them to a replica
+    with use_database(), writes and migrations always go to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def use_database(alias: str):
+    """Route reads within the block to the given database"""
+    token = _read_database.set(alias)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+def pin_key(user_id) -> str:
+    return f"replica:pin:{user_id}"
+
+
+def pin_to_primary(user) -> None:
+    """Read from the primary for a while after the user wrote, so
+    replicas catch up before they serve the user again"""
+    if user.is_authenticated:
+        cache.set(pin_key(user.pk), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user) -> bool:
+    return user.is_authenticated and bool(cache.get(pin_key(user.pk)))
+
+
+_lags = {}
+_lags_lock = threading.Lock()
+
+
+def replica_lag(alias: str) -> float:
+    """Seconds the replica is behind the primary, checked at most once
+    per REPLICA_LAG_CHECK_SECONDS by this process. An unreachable
+    replica is infinitely behind."""
+    now = time.monotonic()
+
+    with _lags_lock:
+        checked_at, lag = _lags.get(alias, (None, None))
+    if checked_at is not None and (
+        now - checked_at < settings.REPLICA_LAG_CHECK_SECONDS
+    ):
+        return lag
+
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            lag = float(cursor.fetchone()[0])
+    except Exception as e:
+        # The replica is skipped until the next check
+        logger.warning("Error checking lag of %s: %s", alias, e)
+        lag = float("inf")
+
+    with _lags_lock:
+        _lags[alias] = (now, lag)
+
+    return lag
+
+
+def choose_replica():
+    """Return a replica within REPLICA_MAX_LAG_SECONDS, None if there is
+    none and reads have to go to the primary"""
+    replicas = [
+        alias
+        for alias in settings.DATABASE_REPLICAS
+        if replica_lag(alias) <= settings.REPLICA_MAX_LAG_SECONDS
+    ]
+
+    return random.choice(replicas) if replicas else None
+
+
+class ReplicaReadMixin:
+    """Serve safe requests of a view from a read replica.
+
+    Users are pinned to the primary for REPLICA_PIN_SECONDS after any
+    successful write through such a view, so they read their own
+    writes. Reads fall back to the primary when every replica lags
+    behind by more than REPLICA_MAX_LAG_SECONDS. Safe actions which
+    write or must see the latest writes are listed in primary_actions,
+    cache misses of CachedResponseMixin always read from the primary.
+    """
+
+    primary_actions = ()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        alias = DEFAULT_DB_ALIAS
+        if (
+            request.method in SAFE_METHODS
+            and self.action not in self.primary_actions
+            and not is_pinned(request.user)
+        ):
+            alias = choose_replica() or DEFAULT_DB_ALIAS
+
+        READS.labels(alias).inc()
+        self._read_database_token = _read_database.set(alias)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_read_database_token", None)
+        if token is not None:
+            self._read_database_token = None
+            _read_database.reset(token)
+
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            pin_to_primary(request.user)
+
+        return super().finalize_response(request, response, *args, **kwargs)
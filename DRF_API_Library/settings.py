@@ -49,6 +49,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "debug_toolbar",
     "drf_spectacular",
@@ -57,6 +58,7 @@ INSTALLED_APPS = [
     "user",
     "book",
     "payment",
+    "notification",
 ]
 
 MIDDLEWARE = [
@@ -98,9 +100,74 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
         "HOST": os.getenv("POSTGRES_HOST"),
         "PORT": os.getenv("POSTGRES_PORT"),
+        # Seconds a connection is reused by the requests or tasks of
+        # a thread, set per process type, 0 closes it after each one
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", 60)),
+        # Reused connections are checked before the next request or task
+        "CONN_HEALTH_CHECKS": True,
+        # PgBouncer in transaction mode can not keep server side
+        # cursors open between the transactions of .iterator()
+        "DISABLE_SERVER_SIDE_CURSORS": os.getenv("DB_POOLER") == "pgbouncer",
     }
 }
 
+# Streaming replicas of the default database as comma separated
+# host[:port], safe requests of views with ReplicaReadMixin read from them
+DATABASE_REPLICAS = []
+for index, address in enumerate(
+    filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(","))
+):
+    host, _, port = address.strip().partition(":")
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        # Tests read the rows they create from the test database
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["DRF_API_Library.replicas.ReplicaRouter"]
+# Seconds a user reads from the primary after writing, longer than
+# the replication lag users should not notice
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 5))
+# Replicas further behind are skipped until they catch up
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", 5))
+# Each process checks the lag of a replica at most this often
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", 1))
+
+# Shared cache for all web and worker processes,
+# local memory of the process when Redis is not configured
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+if CACHE_REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+        }
+    }
+
+# Cached responses are invalidated by model versions, the timeout only
+# reclaims memory of outdated versions
+RESPONSE_CACHE_TIMEOUT = int(
+    os.getenv("RESPONSE_CACHE_TIMEOUT", 24 * 60 * 60)
+)
+# Title autocomplete index of each process is rebuilt in the background
+# this often to pick up books changed by other processes
+BOOK_AUTOCOMPLETE_REFRESH_SECONDS = int(
+    os.getenv("BOOK_AUTOCOMPLETE_REFRESH_SECONDS", 15 * 60)
+)
+# Rows written per transaction by the bulk book import
+BOOK_IMPORT_CHUNK_SIZE = int(os.getenv("BOOK_IMPORT_CHUNK_SIZE", 5000))
+
+
+# Seconds authenticated users are served from the cache. save(),
+# delete() and User queryset updates invalidate it, changes made
+# around the ORM, like raw SQL or manual database edits, show up
+# after this long
+USER_CACHE_TIMEOUT = int(os.getenv("USER_CACHE_TIMEOUT", 60))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -145,7 +212,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
@@ -157,17 +224,160 @@ SIMPLE_JWT = {
 }
 
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL")
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", CELERY_BROKER_URL)
 CELERY_TIMEZONE = "Europe/Kiev"
 CELERY_TASK_TRACK_STARTED = True
 CELERYD_TIME_LIMIT = 30 * 60
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+# Notification tasks go to their own queue, see the
+# celery-notifications service, so they never wait behind the overdue
+# sweep or payment work on the default workers.
+CELERY_TASK_ROUTES = {
+    task: {"queue": "notifications"}
+    for task in (
+        "borrowings.tasks.send_borrowing_created_notification",
+        "borrowings.tasks.send_borrowing_overdue_notification",
+        "borrowings.tasks.send_borrowing_overdue_notifications",
+        "payment.tasks.send_success_payment_notification",
+        "payment.tasks.notify_payment_paid",
+        "notification.tasks.send_notification",
+        "notification.tasks.flush_notifications",
+        "notification.tasks.relay_outbox",
+    )
+}
+CELERY_BEAT_SCHEDULE = {
+    # Pick up checkout sessions whose on-commit task was lost
+    "create-checkout-sessions": {
+        "task": "payment.tasks.create_checkout_sessions",
+        "schedule": 60.0,
+    },
+    "purge-stripe-events": {
+        "task": "payment.tasks.purge_stripe_events",
+        "schedule": 24 * 60 * 60.0,
+    },
+}
+
+# Broker and results on the local filesystem, used by benchmarks
+# to run real workers fully offline
+CELERY_FILESYSTEM_DIR = os.getenv("CELERY_FILESYSTEM_DIR")
+if CELERY_FILESYSTEM_DIR:
+    CELERY_BROKER_URL = "filesystem://"
+    CELERY_BROKER_TRANSPORT_OPTIONS = {
+        "data_folder_in": os.path.join(CELERY_FILESYSTEM_DIR, "queue"),
+        "data_folder_out": os.path.join(CELERY_FILESYSTEM_DIR, "queue"),
+        "control_folder": os.path.join(CELERY_FILESYSTEM_DIR, "control"),
+    }
+    CELERY_RESULT_BACKEND = (
+        f"file://{os.path.join(CELERY_FILESYSTEM_DIR, 'results')}"
+    )
+
+# Overdue borrowings are streamed and notified in chunks of this size
+OVERDUE_SCAN_CHUNK_SIZE = int(os.getenv("OVERDUE_SCAN_CHUNK_SIZE", 2000))
+# The overdue sweep is split into this many id ranges across workers
+OVERDUE_SWEEP_SHARDS = int(os.getenv("OVERDUE_SWEEP_SHARDS", 8))
+# Days overdue at which a borrowing is notified again, ascending. The
+# first is when it becomes overdue, each next one raises its level.
+OVERDUE_ESCALATION_DAYS = [1, 7, 30]
 
 # Telegram API
 TOKEN = os.getenv("TOKEN")
 CHAT_ID = os.getenv("CHAT_ID")
 
+# Where notifications are delivered, see notification.backends
+NOTIFICATION_BACKEND = os.getenv(
+    "NOTIFICATION_BACKEND", "notification.backends.TelegramBackend"
+)
+# Endpoint of HTTPBackend and file of FileBackend
+NOTIFICATION_HTTP_URL = os.getenv(
+    "NOTIFICATION_HTTP_URL", "http://127.0.0.1:8025/"
+)
+NOTIFICATION_FILE_PATH = os.getenv(
+    "NOTIFICATION_FILE_PATH", "notifications.jsonl"
+)
+# Notifications are buffered in this Redis and sent by a periodic task,
+# without it every process buffers and sends its own
+NOTIFICATION_REDIS_URL = os.getenv("NOTIFICATION_REDIS_URL", CACHE_REDIS_URL)
+# Telegram rejects longer messages
+NOTIFICATION_MAX_LENGTH = 4096
+# Messages sent per second on average and at once
+NOTIFICATION_RATE = float(os.getenv("NOTIFICATION_RATE", 1))
+NOTIFICATION_BURST = int(os.getenv("NOTIFICATION_BURST", 5))
+# Seconds between flushes of the notification buffer
+NOTIFICATION_FLUSH_INTERVAL = float(
+    os.getenv("NOTIFICATION_FLUSH_INTERVAL", 2)
+)
+# Outbox messages published per batch and days delivered ones are kept
+NOTIFICATION_OUTBOX_BATCH_SIZE = int(
+    os.getenv("NOTIFICATION_OUTBOX_BATCH_SIZE", 500)
+)
+NOTIFICATION_OUTBOX_RETENTION_DAYS = int(
+    os.getenv("NOTIFICATION_OUTBOX_RETENTION_DAYS", 7)
+)
+# Seconds after which a published message nobody delivered, because its
+# consumer failed or died, is published again
+NOTIFICATION_OUTBOX_REDELIVER_SECONDS = int(
+    os.getenv("NOTIFICATION_OUTBOX_REDELIVER_SECONDS", 10 * 60)
+)
+CELERY_BEAT_SCHEDULE.update({
+    "flush-notifications": {
+        "task": "notification.tasks.flush_notifications",
+        "schedule": NOTIFICATION_FLUSH_INTERVAL,
+    },
+    # Publish outbox messages whose on-commit relay or consumer failed
+    "relay-outbox": {
+        "task": "notification.tasks.relay_outbox",
+        "schedule": 60.0,
+    },
+    "purge-outbox": {
+        "task": "notification.tasks.purge_outbox",
+        "schedule": 24 * 60 * 60.0,
+    },
+})
+
 STRIPE_API_KEY = os.environ.get("STRIPE_API_KEY")
 
+# "stripe" or "local", an in-process stand-in for offline runs
+STRIPE_BACKEND = os.getenv("STRIPE_BACKEND", "stripe")
+STRIPE_LOCAL_LATENCY_MS = int(os.getenv("STRIPE_LOCAL_LATENCY_MS", 0))
+# With a webhook secret payments are confirmed by Stripe webhooks
+# instead of retrieving the session when the user is redirected back
+STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
+# Processed webhook events are kept this long to drop Stripe retries
+STRIPE_EVENT_RETENTION_DAYS = int(
+    os.getenv("STRIPE_EVENT_RETENTION_DAYS", 30)
+)
+# "sync" redirects to a checkout session created in the request,
+# "async" answers 202 and lets a worker create the session
+PAYMENT_CHECKOUT_MODE = os.getenv("PAYMENT_CHECKOUT_MODE", "sync")
+# Checkout sessions created per outbox batch
+CHECKOUT_BATCH_SIZE = int(os.getenv("CHECKOUT_BATCH_SIZE", 20))
+# Seconds other workers leave claimed outbox payments alone, longer
+# than creating the sessions of a batch takes
+CHECKOUT_CLAIM_SECONDS = int(os.getenv("CHECKOUT_CLAIM_SECONDS", 300))
+
+# Outbound HTTP clients, see DRF_API_Library.outbound. Services listed
+# by name override the defaults.
+OUTBOUND_HTTP = {
+    "default": {
+        "connect_timeout": float(
+            os.getenv("OUTBOUND_CONNECT_TIMEOUT", 3.05)
+        ),
+        "read_timeout": float(os.getenv("OUTBOUND_READ_TIMEOUT", 10)),
+        "retries": int(os.getenv("OUTBOUND_RETRIES", 2)),
+        "backoff": 0.5,
+        "backoff_max": 8,
+        "pool_size": 10,
+        "failure_threshold": 5,
+        "reset_timeout": 30,
+    },
+    "stripe": {
+        "read_timeout": float(os.getenv("STRIPE_READ_TIMEOUT", 30)),
+    },
+}
+# Bearer token Prometheus scrapes /metrics/ with, without it only staff
+# users signed in to the admin can read them
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
 
 SPECTACULAR_SETTINGS = {
     "TITLE": "DRF APILibrary",
@@ -0,0 +1,32 @@
+import json
+
+
+def plan_nodes(queryset) -> list[dict]:
+    """Return every node of the query plan of the queryset"""
+    nodes = [json.loads(queryset.explain(format="json"))[0]["Plan"]]
+    found = []
+
+    while nodes:
+        node = nodes.pop()
+        found.append(node)
+        nodes.extend(node.get("Plans", []))
+
+    return found
+
+
+def seq_scanned_tables(queryset) -> set:
+    """Return tables the planner reads with a sequential scan"""
+    return {
+        node["Relation Name"]
+        for node in plan_nodes(queryset)
+        if node["Node Type"] == "Seq Scan"
+    }
+
+
+def scanned_indexes(queryset) -> set:
+    """Return indexes the planner reads"""
+    return {
+        node["Index Name"]
+        for node in plan_nodes(queryset)
+        if "Index Name" in node
+    }
@@ -0,0 +1,111 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+from DRF_API_Library.caching import invalidate_responses
+from book.models import Book
+from borrowings.models import Borrowing
+from borrowings.tests.utils import created_message_disconnected
+from payment.models import Payment
+
+ME_URL = reverse("user:manage")
+
+
+def book_url(book_id: int) -> str:
+    return reverse("book:book-detail", args=[book_id])
+
+
+def borrowing_url(borrowing_id: int) -> str:
+    return reverse("borrowings:borrowing-detail", args=[borrowing_id])
+
+
+def cache_lookups(view: str, outcome: str) -> float:
+    return REGISTRY.get_sample_value(
+        "response_cache_requests_total", {"view": view, "outcome": outcome}
+    ) or 0
+
+
+class ResponseCacheTests(TestCase):
+    """GET responses are cached until a model they read changes"""
+
+    def setUp(self):
+        self.enterContext(created_message_disconnected())
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com", "testpass", first_name="Test"
+        )
+        self.client.force_authenticate(self.user)
+        self.book = Book.objects.create(
+            title="Sample book", inventory=2, daily_fee=2
+        )
+        self.borrowing = Borrowing.objects.create(
+            expected_return_date=(
+                datetime.date.today() + datetime.timedelta(days=3)
+            ),
+            book=self.book,
+            user=self.user,
+        )
+        self.payment = Payment.objects.create(
+            borrowing=self.borrowing, money_to_pay=6
+        )
+
+    def test_book_detail_is_served_from_cache(self):
+        hits = cache_lookups("BookViewSet.retrieve", "hit")
+        self.client.get(book_url(self.book.id))
+
+        with self.assertNumQueries(0):
+            res = self.client.get(book_url(self.book.id))
+
+        self.assertEqual(res.data["title"], "Sample book")
+        self.assertEqual(cache_lookups("BookViewSet.retrieve", "hit"), hits + 1)
+
+    def test_borrowing_detail_is_invalidated_by_related_models(self):
+        url = borrowing_url(self.borrowing.id)
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.payment.status = Payment.Status.PAID
+            self.payment.save()
+        res = self.client.get(url)
+        self.assertEqual(res.data["payments"][0]["status"], "PAID")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.filter(pk=self.book.pk).update(title="Renamed")
+            invalidate_responses(Book)
+        res = self.client.get(url)
+        self.assertEqual(res.data["book"]["title"], "Renamed")
+
+    def test_borrowing_detail_is_cached_per_user(self):
+        url = borrowing_url(self.borrowing.id)
+        self.client.get(url)
+
+        other = get_user_model().objects.create_user(
+            "other@test.com", "testpass"
+        )
+        self.client.force_authenticate(other)
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, 404)
+
+    def test_profile_update_invalidates_cache(self):
+        self.client.get(ME_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(ME_URL, {"first_name": "Updated"})
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["first_name"], "Updated")
+
+    def test_errors_are_not_cached(self):
+        self.client.get(book_url(0))
+
+        with self.assertNumQueries(1):
+            res = self.client.get(book_url(0))
+
+        self.assertEqual(res.status_code, 404)
@@ -0,0 +1,26 @@
+from django.test import SimpleTestCase
+
+from DRF_API_Library.celery import app
+
+
+class TaskRoutesTests(SimpleTestCase):
+
+    def queue(self, task: str) -> str:
+        return app.amqp.router.route({}, task)["queue"].name
+
+    def test_notification_tasks_use_notifications_queue(self):
+        for task in (
+            "borrowings.tasks.send_borrowing_created_notification",
+            "borrowings.tasks.send_borrowing_overdue_notifications",
+            "payment.tasks.send_success_payment_notification",
+            "notification.tasks.flush_notifications",
+        ):
+            self.assertEqual(self.queue(task), "notifications")
+
+    def test_database_tasks_stay_on_default_queue(self):
+        for task in (
+            "borrowings.tasks.check_borrowings_for_overdue",
+            "borrowings.tasks.sweep_overdue_shard",
+            "payment.tasks.create_checkout_sessions",
+        ):
+            self.assertEqual(self.queue(task), "celery")
@@ -0,0 +1,35 @@
+from unittest.mock import patch
+
+from django.db import DatabaseError, connection, connections
+from django.db.backends.signals import connection_created
+from django.test import TestCase
+
+from DRF_API_Library.db import CONNECTIONS_OPENED, ServerConnectionsCollector
+
+
+class ConnectionMetricsTests(TestCase):
+
+    def test_new_connections_are_counted(self):
+        opened = CONNECTIONS_OPENED.labels("default")._value.get()
+
+        connection_created.send(
+            sender=connection.__class__, connection=connection
+        )
+
+        self.assertEqual(
+            CONNECTIONS_OPENED.labels("default")._value.get(), opened + 1
+        )
+
+    def test_server_connections_are_collected(self):
+        by_state, max_connections = ServerConnectionsCollector().collect()
+
+        self.assertIn(
+            "active", [sample.labels["state"] for sample in by_state.samples]
+        )
+        self.assertGreater(max_connections.samples[0].value, 0)
+
+    def test_collection_errors_are_logged(self):
+        with patch.object(
+            connections["default"], "cursor", side_effect=DatabaseError
+        ), self.assertLogs("DRF_API_Library.db", "ERROR"):
+            self.assertEqual(list(ServerConnectionsCollector().collect()), [])
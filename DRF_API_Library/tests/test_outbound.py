@@ -0,0 +1,180 @@
+from unittest.mock import Mock, patch
+
+import requests
+import stripe
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from DRF_API_Library import outbound as outbound_module
+from DRF_API_Library.metrics import SERVER_CONNECTIONS
+from DRF_API_Library.outbound import (
+    CircuitOpenError,
+    OutboundClient,
+    outbound,
+)
+from payment.utils.stripe_client import StripeHTTPClient
+
+
+def sample_client(**params):
+    defaults = {
+        "name": "test",
+        "connect_timeout": 1,
+        "read_timeout": 2,
+        "retries": 2,
+        "backoff": 0.1,
+        "backoff_max": 1,
+        "pool_size": 2,
+        "failure_threshold": 3,
+        "reset_timeout": 60,
+    }
+    defaults.update(params)
+
+    return OutboundClient(**defaults)
+
+
+def sample_response(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b"{}"
+
+    return response
+
+
+@patch("DRF_API_Library.outbound.time.sleep")
+class OutboundClientTests(SimpleTestCase):
+    """Tests for retries and circuit breaking of outbound calls"""
+    def test_connection_error_is_retried(self, sleep):
+        client = sample_client()
+        client.session.request = Mock(side_effect=[
+            requests.ConnectionError("refused"), sample_response(200)
+        ])
+
+        response = client.post("http://upstream.local/send", json={})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.session.request.call_count, 2)
+        self.assertEqual(
+            client.session.request.call_args.kwargs["timeout"], (1, 2)
+        )
+        sleep.assert_called_once()
+        self.assertLessEqual(sleep.call_args.args[0], 0.1)
+
+    def test_read_timeout_of_post_is_not_retried(self, sleep):
+        client = sample_client()
+        client.session.request = Mock(side_effect=requests.ReadTimeout())
+
+        with self.assertRaises(requests.ReadTimeout):
+            client.post("http://upstream.local/send")
+
+        self.assertEqual(client.session.request.call_count, 1)
+
+    def test_throttled_request_is_retried_until_attempts_run_out(self, sleep):
+        client = sample_client()
+        client.session.request = Mock(return_value=sample_response(429))
+
+        response = client.request("GET", "http://upstream.local/")
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(client.session.request.call_count, 3)
+
+    def test_circuit_opens_after_consecutive_failures(self, sleep):
+        client = sample_client(retries=0)
+        client.session.request = Mock(return_value=sample_response(500))
+
+        for _ in range(3):
+            client.post("http://upstream.local/send")
+        with self.assertRaises(CircuitOpenError):
+            client.post("http://upstream.local/send")
+
+        self.assertEqual(client.session.request.call_count, 3)
+
+    def test_circuit_lets_a_trial_call_through(self, sleep):
+        client = sample_client(retries=0, reset_timeout=0)
+        client.session.request = Mock(return_value=sample_response(500))
+        for _ in range(3):
+            client.post("http://upstream.local/send")
+
+        client.session.request.return_value = sample_response(200)
+        client.post("http://upstream.local/send")
+        client.post("http://upstream.local/send")
+
+        self.assertEqual(client.session.request.call_count, 5)
+
+    @override_settings(OUTBOUND_HTTP={
+        "default": {
+            "connect_timeout": 1,
+            "read_timeout": 2,
+            "retries": 0,
+            "backoff": 0.1,
+            "backoff_max": 1,
+            "pool_size": 2,
+            "failure_threshold": 3,
+            "reset_timeout": 60,
+        },
+        "slow": {"read_timeout": 30},
+    })
+    def test_clients_are_shared_per_upstream(self, sleep):
+        outbound_module._clients.clear()
+        self.addCleanup(outbound_module._clients.clear)
+
+        self.assertIs(outbound("slow"), outbound("slow"))
+        self.assertEqual(outbound("slow").timeout, (1, 30))
+        self.assertEqual(outbound("fast").timeout, (1, 2))
+
+
+class StripeHTTPClientTests(SimpleTestCase):
+    """Tests for Stripe requests sent through the outbound client"""
+    @patch("DRF_API_Library.outbound.OutboundClient.request")
+    def test_request(self, request):
+        request.return_value = sample_response(200)
+
+        content, status_code, _ = StripeHTTPClient().request(
+            "post", "https://api.stripe.com/v1/x", {}, "a=1"
+        )
+
+        self.assertEqual((content, status_code), (b"{}", 200))
+        self.assertEqual(request.call_args.kwargs["retries"], 0)
+
+    @patch("DRF_API_Library.outbound.OutboundClient.request")
+    def test_network_errors_are_stripe_errors(self, request):
+        request.side_effect = CircuitOpenError("Circuit to stripe is open")
+
+        with self.assertRaises(stripe.error.APIConnectionError) as error:
+            StripeHTTPClient().request("get", "https://api.stripe.com", {})
+
+        self.assertFalse(error.exception.should_retry)
+
+    def test_stripe_uses_shared_client(self):
+        self.assertIsInstance(stripe.default_http_client, StripeHTTPClient)
+
+
+@override_settings(METRICS_TOKEN="scrape-token")
+class MetricsTests(SimpleTestCase):
+    """Tests for the Prometheus endpoint"""
+    def setUp(self):
+        # Queries the database, see test_db
+        patcher = patch.object(SERVER_CONNECTIONS, "collect", return_value=[])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_metrics(self):
+        res = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-token"
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn(b"outbound_request_seconds", res.content)
+
+    def test_metrics_need_token(self):
+        for headers in ({}, {"HTTP_AUTHORIZATION": "Bearer wrong"}):
+            res = self.client.get(reverse("metrics"), **headers)
+
+            self.assertEqual(res.status_code, 403)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_metrics_closed_without_token(self):
+        res = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer None"
+        )
+
+        self.assertEqual(res.status_code, 403)
@@ -0,0 +1,124 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from DRF_API_Library.prefetch import QueryPlan
+from book.models import Book
+from borrowings.models import Borrowing
+from borrowings.serializers import BorrowingDetailSerializer
+from borrowings.tests.utils import created_message_disconnected
+from payment.models import Payment
+
+BORROWING_URL = reverse("borrowings:borrowing-list")
+PAYMENT_URL = reverse("payment:payment-list")
+BOOK_URL = reverse("book:book-list")
+
+
+def plan(serializer_class) -> QueryPlan:
+    query_plan = QueryPlan(serializer_class.Meta.model)
+    query_plan.add_serializer(serializer_class())
+
+    return query_plan
+
+
+class QueryPlanTests(TestCase):
+
+    def test_nested_serializers_are_joined_and_prefetched(self):
+        query_plan = plan(BorrowingDetailSerializer)
+
+        self.assertEqual(set(query_plan.joins), {"book", "user"})
+        self.assertEqual(set(query_plan.prefetches), {"payments"})
+        self.assertNotIn("password", query_plan.joins["user"].fields)
+        self.assertEqual(
+            query_plan.prefetches["payments"].fields,
+            {"id", "status", "payment_type", "session_url", "money_to_pay"},
+        )
+
+    def test_unknown_attributes_load_all_fields(self):
+        class PaymentSummarySerializer(serializers.ModelSerializer):
+            summary = serializers.SerializerMethodField()
+            book = serializers.StringRelatedField(source="borrowing.book")
+
+            class Meta:
+                model = Payment
+                fields = ("id", "summary", "book")
+
+            def get_summary(self, payment):
+                return str(payment)
+
+        query_plan = plan(PaymentSummarySerializer)
+
+        self.assertTrue(query_plan.all_fields)
+        self.assertTrue(query_plan.joins["borrowing"].joins["book"].all_fields)
+        self.assertFalse(query_plan.joins["borrowing"].all_fields)
+
+
+class QueryBudgetTests(TestCase):
+    """Endpoints run a fixed number of queries however many rows
+    and relations they serialize"""
+
+    def setUp(self):
+        self.enterContext(created_message_disconnected())
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            "admin@test.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def add_rows(self, count: int) -> None:
+        for number in range(count):
+            user = get_user_model().objects.create_user(
+                f"user{Borrowing.objects.count()}@test.com", "testpass"
+            )
+            book = Book.objects.create(
+                title=f"Book {number}", inventory=5, daily_fee=2
+            )
+            borrowing = Borrowing.objects.create(
+                expected_return_date=(
+                    datetime.date.today() + datetime.timedelta(days=3)
+                ),
+                book=book,
+                user=user,
+            )
+            for _ in range(2):
+                Payment.objects.create(borrowing=borrowing, money_to_pay=6)
+
+    def assert_budget(self, url: str, queries: int) -> None:
+        for rows in (2, 5):
+            self.add_rows(rows)
+            cache.clear()
+            with self.assertNumQueries(queries):
+                res = self.client.get(url)
+            self.assertEqual(res.status_code, 200)
+
+    def test_borrowing_list(self):
+        # Count and page
+        self.assert_budget(BORROWING_URL, 2)
+
+    def test_borrowing_cursor_list(self):
+        self.assert_budget(f"{BORROWING_URL}?pagination=cursor", 1)
+
+    def test_borrowing_detail(self):
+        self.add_rows(1)
+        borrowing = Borrowing.objects.last()
+
+        # ETag, borrowing with book and user, then its payments
+        with self.assertNumQueries(3):
+            res = self.client.get(
+                reverse("borrowings:borrowing-detail", args=[borrowing.id])
+            )
+
+        self.assertEqual(len(res.data["payments"]), 2)
+        self.assertEqual(res.data["user"]["email"], borrowing.user.email)
+
+    def test_payment_list(self):
+        self.assert_budget(PAYMENT_URL, 1)
+
+    def test_book_list(self):
+        self.assert_budget(BOOK_URL, 2)
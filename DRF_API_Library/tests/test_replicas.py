@@ -0,0 +1,222 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from DRF_API_Library import replicas
+from DRF_API_Library.replicas import (
+    ReplicaRouter,
+    _read_database,
+    choose_replica,
+    is_pinned,
+    replica_lag,
+    use_database,
+)
+from book.models import Book
+
+BOOK_URL = reverse("book:book-list")
+PAYMENT_URL = reverse("payment:payment-list")
+PAYMENT_EXPORT_URL = reverse("payment:payment-export")
+# Alias of a replica connection made by a test, never configured
+LAGGING_REPLICA = "lagging_replica"
+
+
+class ReplicaRouterTests(TestCase):
+
+    def test_reads_follow_the_context(self):
+        router = ReplicaRouter()
+
+        self.assertEqual(router.db_for_read(Book), "default")
+        with use_database("replica_0"):
+            self.assertEqual(router.db_for_read(Book), "replica_0")
+            self.assertEqual(router.db_for_write(Book), "default")
+        self.assertEqual(router.db_for_read(Book), "default")
+
+    def test_only_primary_is_migrated(self):
+        router = ReplicaRouter()
+
+        self.assertTrue(router.allow_migrate("default", "book"))
+        self.assertFalse(router.allow_migrate("replica_0", "book"))
+
+
+@override_settings(
+    DATABASE_REPLICAS=["replica_0", "replica_1"],
+    REPLICA_MAX_LAG_SECONDS=5,
+)
+class ReplicaLagTests(TestCase):
+
+    def setUp(self):
+        replicas._lags.clear()
+
+    def test_lagging_replicas_are_skipped(self):
+        lags = {"replica_0": 10, "replica_1": 1}
+
+        with mock.patch.object(replicas, "replica_lag", lags.get):
+            self.assertEqual(choose_replica(), "replica_1")
+
+    def test_primary_is_used_when_every_replica_lags(self):
+        lags = {"replica_0": 10, "replica_1": float("inf")}
+
+        with mock.patch.object(replicas, "replica_lag", lags.get):
+            self.assertIsNone(choose_replica())
+
+    def test_lag_is_checked_once_per_interval(self):
+        self.assertEqual(replica_lag("default"), 0)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(replica_lag("default"), 0)
+
+
+class ReplicaReadMixinTests(TestCase):
+    """Safe requests read from a replica unless the user just wrote"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "testpass"
+        )
+        self.client.force_authenticate(self.admin)
+        Book.objects.create(title="Sample book", inventory=2, daily_fee=2)
+
+    def read_databases(self, method: str, *args) -> set:
+        """Databases the router sends reads of the request to, while
+        every replica is served by the primary connection"""
+        databases = set()
+
+        def db_for_read(router, model, **hints):
+            databases.add(_read_database.get())
+            return "default"
+
+        with mock.patch.object(
+            replicas, "choose_replica", return_value="replica_0"
+        ), mock.patch.object(ReplicaRouter, "db_for_read", db_for_read):
+            response = getattr(self.client, method)(*args)
+
+        self.assertLess(response.status_code, 400)
+        return databases
+
+    def test_safe_requests_read_from_replica(self):
+        self.assertEqual(
+            self.read_databases("get", PAYMENT_URL), {"replica_0"}
+        )
+        self.assertEqual(_read_database.get(), "default")
+
+    def test_cache_misses_read_from_primary(self):
+        self.assertEqual(self.read_databases("get", BOOK_URL), {"default"})
+
+    def test_writes_pin_user_to_primary(self):
+        payload = {"title": "New book", "inventory": 1, "daily_fee": 1}
+
+        self.assertNotIn(
+            "replica_0", self.read_databases("post", BOOK_URL, payload)
+        )
+        self.assertTrue(is_pinned(self.admin))
+        self.assertEqual(self.read_databases("get", PAYMENT_URL), {"default"})
+
+    def test_failed_writes_do_not_pin_user(self):
+        response = self.client.post(BOOK_URL, {"title": ""})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(is_pinned(self.admin))
+
+
+class LaggingReplicaTests(TestCase):
+    """Rows read from a replica behind the primary are never cached"""
+
+    def setUp(self):
+        cache.clear()
+        # A second connection to the test database does not see the
+        # rows of the test transaction, like a replica that has not
+        # replayed them yet
+        primary = connections["default"]
+        replica = primary.__class__(
+            {**primary.settings_dict}, LAGGING_REPLICA
+        )
+        connections[LAGGING_REPLICA] = replica
+        self.addCleanup(connections.__delitem__, LAGGING_REPLICA)
+        self.addCleanup(replica.close)
+
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "testpass"
+        )
+        self.reader = get_user_model().objects.create_user(
+            "reader@test.com", "testpass"
+        )
+
+    def test_writer_reads_own_write_after_lagging_replica_read(self):
+        with mock.patch.object(
+            replicas, "choose_replica", return_value=LAGGING_REPLICA
+        ):
+            self.client.force_authenticate(self.admin)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    BOOK_URL,
+                    {"title": "New book", "inventory": 1, "daily_fee": 1},
+                )
+
+            self.assertFalse(Book.objects.using(LAGGING_REPLICA).exists())
+            self.client.force_authenticate(self.reader)
+            reader_books = self.client.get(BOOK_URL).data["results"]
+
+            self.client.force_authenticate(self.admin)
+            writer_books = self.client.get(BOOK_URL).data["results"]
+
+        for books in (reader_books, writer_books):
+            self.assertEqual([book["title"] for book in books], ["New book"])
+
+
+@override_settings(REPLICA_MAX_LAG_SECONDS=5)
+class ReplicaDatabaseTests(TestCase):
+    """Reads against replica aliases configured by DB_REPLICA_HOSTS,
+    which mirror the default test database"""
+
+    databases = "__all__"
+
+    def setUp(self):
+        if not settings.DATABASE_REPLICAS:
+            self.skipTest("DB_REPLICA_HOSTS is not configured")
+
+        replicas._lags.clear()
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("user@test.com", "testpass")
+        )
+
+    def test_payment_list_is_read_from_replica(self):
+        alias = settings.DATABASE_REPLICAS[0]
+
+        with override_settings(DATABASE_REPLICAS=[alias]):
+            with CaptureQueriesContext(connections[alias]) as queries:
+                response = self.client.get(PAYMENT_URL)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(
+            any('FROM "payment_payment"' in query["sql"] for query in queries)
+        )
+
+    def test_export_streams_from_replica(self):
+        alias = settings.DATABASE_REPLICAS[0]
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                "admin@test.com", "testpass"
+            )
+        )
+
+        with override_settings(DATABASE_REPLICAS=[alias]):
+            response = self.client.get(PAYMENT_EXPORT_URL)
+        with CaptureQueriesContext(connections[alias]) as queries:
+            b"".join(response.streaming_content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(
+            any('FROM "payment_payment"' in query["sql"] for query in queries)
+        )
@@ -0,0 +1,132 @@
+import datetime
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from DRF_API_Library.values import ValuesListMixin, ValuesPlan, values_plan
+from book.models import Book
+from book.serializers import BookSerializer
+from borrowings.models import Borrowing
+from borrowings.serializers import BorrowingSerializer
+from borrowings.tests.utils import created_message_disconnected
+from payment.models import Payment
+from payment.serializers import PaymentSerializer
+
+BORROWING_URL = reverse("borrowings:borrowing-list")
+PAYMENT_URL = reverse("payment:payment-list")
+BOOK_URL = reverse("book:book-list")
+
+
+def serializer_list(self, request, *args, **kwargs):
+    return super(ValuesListMixin, self).list(request, *args, **kwargs)
+
+
+class ValuesListTests(TestCase):
+    """The values() path renders the same JSON as the serializers"""
+
+    def setUp(self):
+        self.enterContext(created_message_disconnected())
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            "admin@test.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+
+        today = datetime.date.today()
+        for number in range(12):
+            book = Book.objects.create(
+                title=f"Book é {number}",
+                author=f"Author \"{number}\"",
+                cover="SOFT" if number % 2 else "HARD",
+                inventory=number + 1,
+                daily_fee="1.50",
+            )
+            borrowing = Borrowing.objects.create(
+                expected_return_date=today + datetime.timedelta(days=3),
+                actual_return_date=today if number % 3 else None,
+                book=book,
+                user=self.user,
+            )
+            Payment.objects.create(
+                borrowing=borrowing,
+                money_to_pay="4.50",
+                session_url="https://checkout.test/" if number % 2 else None,
+            )
+
+    def assert_same_json(self, url: str) -> None:
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+
+        cache.clear()
+        with mock.patch.object(ValuesListMixin, "list", serializer_list):
+            expected = self.client.get(url)
+
+        self.assertEqual(res.content, expected.content)
+
+    def test_borrowing_list(self):
+        self.assert_same_json(BORROWING_URL)
+        self.assert_same_json(f"{BORROWING_URL}?page=2")
+
+    def test_borrowing_cursor_list(self):
+        res = self.client.get(f"{BORROWING_URL}?pagination=cursor")
+        self.assert_same_json(res.data["next"])
+
+    def test_payment_list(self):
+        self.assert_same_json(PAYMENT_URL)
+        self.assert_same_json(f"{PAYMENT_URL}?pagination=cursor&page_size=5")
+
+    def test_book_list(self):
+        self.assert_same_json(BOOK_URL)
+        self.assert_same_json(f"{BOOK_URL}?cover=soft")
+
+    def test_plans_render_like_serializers(self):
+        for serializer_class, queryset in (
+            (BorrowingSerializer, Borrowing.objects.order_by("id")),
+            (BookSerializer, Book.objects.order_by("id")),
+            (PaymentSerializer, Payment.objects.order_by("id")),
+        ):
+            plan = values_plan(serializer_class)
+            self.assertEqual(
+                JSONRenderer().render(plan.render(plan.values(queryset))),
+                JSONRenderer().render(
+                    serializer_class(queryset, many=True).data
+                ),
+            )
+
+    def test_values_lists_are_opt_in(self):
+        with mock.patch.object(
+            ValuesPlan, "render", side_effect=AssertionError
+        ), mock.patch(
+            "book.views.BookViewSet.values_list_enabled", False
+        ):
+            res = self.client.get(BOOK_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertFalse(ValuesListMixin.values_list_enabled)
+
+    def test_unmapped_fields_are_rejected(self):
+        class PaymentBookSerializer(serializers.ModelSerializer):
+            book = serializers.StringRelatedField(source="borrowing.book")
+
+            class Meta:
+                model = Payment
+                fields = ("id", "book")
+
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesPlan(PaymentBookSerializer)
+
+        PaymentBookSerializer.Meta.values_sources = {
+            "book": "borrowing__book__title"
+        }
+        self.assertEqual(
+            ValuesPlan(PaymentBookSerializer).lookups,
+            ["id", "borrowing__book__title"],
+        )
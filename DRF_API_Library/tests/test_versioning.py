@@ -0,0 +1,166 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from DRF_API_Library.replicas import use_database
+from book.models import Book
+from book.services import reserve_copy
+from borrowings.models import Borrowing
+from borrowings.tests.utils import created_message_disconnected
+from payment.models import Payment
+
+ME_URL = reverse("user:manage")
+
+
+def book_url(book_id: int) -> str:
+    return reverse("book:book-detail", args=[book_id])
+
+
+def borrowing_url(borrowing_id: int) -> str:
+    return reverse("borrowings:borrowing-detail", args=[borrowing_id])
+
+
+class RowVersionTests(TestCase):
+
+    def setUp(self):
+        self.book = Book.objects.create(
+            title="Sample book", inventory=2, daily_fee=2
+        )
+
+    def test_save_bumps_version(self):
+        self.assertEqual(self.book.version, 1)
+
+        self.book.save()
+        self.book.title = "Renamed"
+        self.book.save(update_fields=["title"])
+
+        self.assertEqual(self.book.version, 3)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.version, 3)
+
+    def test_saved_version_is_read_from_primary(self):
+        # replica_0 is not configured, reading from it would fail
+        with use_database("replica_0"):
+            self.book.save()
+
+        self.assertEqual(self.book.version, 2)
+
+    def test_queryset_updates_bump_version(self):
+        reserve_copy(self.book.id)
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.version, 2)
+
+
+class ConditionalRequestTests(TestCase):
+    """ETags from row versions answer conditional requests"""
+
+    def setUp(self):
+        self.enterContext(created_message_disconnected())
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_superuser(
+            "admin@test.com", "testpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.book = Book.objects.create(
+            title="Sample book", inventory=2, daily_fee=2
+        )
+        self.borrowing = Borrowing.objects.create(
+            expected_return_date=(
+                datetime.date.today() + datetime.timedelta(days=3)
+            ),
+            book=self.book,
+            user=self.user,
+        )
+
+    def assert_not_modified(self, url: str) -> str:
+        etag = self.client.get(url)["ETag"]
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res["ETag"], etag)
+
+        return etag
+
+    def test_book_detail_not_modified(self):
+        etag = self.assert_not_modified(book_url(self.book.id))
+
+        # Answered from the cached response without queries
+        with self.assertNumQueries(0):
+            res = self.client.get(
+                book_url(self.book.id), HTTP_IF_NONE_MATCH=f"W/{etag}"
+            )
+        self.assertEqual(res.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reserve_copy(self.book.id)
+        res = self.client.get(book_url(self.book.id), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_borrowing_etag_follows_payments(self):
+        url = borrowing_url(self.borrowing.id)
+        etag = self.assert_not_modified(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            payment = Payment.objects.create(
+                borrowing=self.borrowing, money_to_pay=6
+            )
+        new_etag = self.client.get(url, HTTP_IF_NONE_MATCH=etag)["ETag"]
+        self.assertNotEqual(new_etag, etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            payment.status = Payment.Status.PAID
+            payment.save()
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=new_etag)
+        self.assertEqual(res.status_code, 200)
+
+    def test_profile_not_modified(self):
+        self.assert_not_modified(ME_URL)
+
+    def test_update_with_stale_etag_fails(self):
+        etag = self.client.get(book_url(self.book.id))["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            reserve_copy(self.book.id)
+
+        res = self.client.patch(
+            book_url(self.book.id),
+            {"title": "Renamed", "inventory": 1, "daily_fee": 2},
+            HTTP_IF_MATCH=etag,
+        )
+
+        self.assertEqual(res.status_code, 412)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.title, "Sample book")
+
+    def test_update_with_current_etag(self):
+        etag = self.client.get(book_url(self.book.id))["ETag"]
+
+        res = self.client.patch(
+            book_url(self.book.id),
+            {"title": "Renamed", "inventory": 1, "daily_fee": 2},
+            HTTP_IF_MATCH=etag,
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["ETag"], '"2"')
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.title, "Renamed")
+
+    def test_update_with_weak_etag_fails(self):
+        etag = self.client.get(book_url(self.book.id))["ETag"]
+
+        res = self.client.patch(
+            book_url(self.book.id),
+            {"title": "Renamed", "inventory": 1, "daily_fee": 2},
+            HTTP_IF_MATCH=f"W/{etag}",
+        )
+
+        self.assertEqual(res.status_code, 412)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.title, "Sample book")
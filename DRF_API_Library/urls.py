@@ -23,9 +23,12 @@ from drf_spectacular.views import (
     SpectacularRedocView,
 )
 
+from DRF_API_Library.metrics import metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("__debug__/", include("debug_toolbar.urls")),
+    path("metrics/", metrics, name="metrics"),
     path("api/library/", include("borrowings.urls", namespace="borrowings")),
     path("api/library/", include("user.urls", namespace="user")),
     path("api/library/", include("book.urls", namespace="book")),
@@ -0,0 +1,132 @@
+import functools
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.relations import PKOnlyObject, PrimaryKeyRelatedField
+from rest_framework.response import Response
+
+
+class ValuesPlan:
+    """Read the fields of a flat model serializer with values().
+
+    Every serializer field is mapped to a lookup and rendered with the
+    field's own to_representation(), so rows come out exactly as the
+    serializer would render them, without building model instances.
+    Fields that are not model columns, like StringRelatedField, are
+    mapped with Meta.values_sources ({"field name": "lookup"}).
+    """
+
+    def __init__(self, serializer_class):
+        serializer = serializer_class()
+        self.model = serializer.Meta.model
+        sources = getattr(serializer.Meta, "values_sources", {})
+        self.fields = []
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            lookup = sources.get(name) or self._lookup(field)
+            self.fields.append((name, lookup, self._render(field)))
+
+        self.lookups = list(dict.fromkeys(
+            lookup for _, lookup, _ in self.fields
+        ))
+
+    def _lookup(self, field) -> str:
+        if isinstance(field, serializers.BaseSerializer) or (
+            field.source == "*"
+        ):
+            raise ImproperlyConfigured(
+                f"{field.field_name} can't be read with values(), "
+                f"map it in Meta.values_sources"
+            )
+
+        model = self.model
+        attrs = field.source.split(".")
+        for position, attr in enumerate(attrs):
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured(
+                    f"{field.field_name} reads {field.source}, which is "
+                    f"not a field, map it in Meta.values_sources"
+                )
+
+            last = position == len(attrs) - 1
+            if model_field.is_relation and not (
+                last and isinstance(field, PrimaryKeyRelatedField)
+            ):
+                if last or not (
+                    model_field.many_to_one or model_field.one_to_one
+                ):
+                    raise ImproperlyConfigured(
+                        f"{field.field_name} renders related objects, "
+                        f"map it in Meta.values_sources"
+                    )
+                model = model_field.related_model
+
+        return "__".join(attrs)
+
+    @staticmethod
+    def _render(field):
+        if isinstance(field, PrimaryKeyRelatedField):
+            return lambda value: field.to_representation(
+                PKOnlyObject(pk=value)
+            )
+
+        return field.to_representation
+
+    def render(self, rows) -> list[dict]:
+        """Turn values() dicts into serialized representations"""
+        return [
+            {
+                name: None if row[lookup] is None else render(row[lookup])
+                for name, lookup, render in self.fields
+            }
+            for row in rows
+        ]
+
+    def values(self, queryset, extra=()):
+        """Return the values() queryset with the lookups of the plan"""
+        return queryset.prefetch_related(None).values(
+            *dict.fromkeys([*self.lookups, *extra])
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def values_plan(serializer_class) -> ValuesPlan:
+    return ValuesPlan(serializer_class)
+
+
+class ValuesListMixin:
+    """Serve the list action from values() rows.
+
+    Opt-in fast path for read heavy lists of flat serializers: only the
+    serialized columns are fetched and no model instances or field
+    lookups per row are built, while the JSON stays byte for byte the
+    same as the serializer's. Viewsets enable it with
+    values_list_enabled = True once a test compares both outputs,
+    otherwise lists go through the serializer.
+    """
+
+    values_list_enabled = False
+
+    def list(self, request, *args, **kwargs):
+        if not self.values_list_enabled:
+            return super().list(request, *args, **kwargs)
+
+        plan = values_plan(self.get_serializer_class())
+        queryset = self.filter_queryset(self.get_queryset())
+        # Cursor pagination reads its ordering columns from the rows
+        ordering = getattr(self.paginator, "ordering", None) or ()
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        rows = plan.values(
+            queryset, [name.lstrip("-") for name in ordering]
+        )
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.render(page))
+
+        return Response(plan.render(rows))
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "DRF_API_Library.settings")
 
 application = get_wsgi_application()
+
+# Build the autocomplete index before the first request needs it
+from book.autocomplete import title_index  # noqa: E402
+
+title_index.warm_up()
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class BookConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "book"
+
+    def ready(self) -> None:
+        """Connect signal handlers"""
+        from . import signals
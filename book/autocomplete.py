@@ -0,0 +1,194 @@
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connection
+
+from book.models import Book
+
+
+def normalize(text: str) -> str:
+    """Lower case words of the text without punctuation"""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.casefold()).split())
+
+
+class PrefixIndex:
+    """Sorted array of (key, book id) pairs searched with bisect.
+
+    Every word of a title or author starts a key, so "pott" finds
+    "Harry Potter" as well as "Potter, Beatrix".
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._books = {}
+
+    def __len__(self):
+        return len(self._books)
+
+    @classmethod
+    def build(cls, books) -> "PrefixIndex":
+        """Load (id, title, author) rows and sort the keys once"""
+        index = cls()
+        for book_id, title, author in books:
+            keys = cls._keys_for(title, author)
+            index._books[book_id] = (title, author, keys)
+            index._keys.extend((key, book_id) for key in keys)
+        index._keys.sort()
+
+        return index
+
+    @staticmethod
+    def _keys_for(title: str, author: str) -> set:
+        keys = set()
+        for text in (title, author):
+            words = normalize(text).split()
+            keys.update(
+                " ".join(words[start:]) for start in range(len(words))
+            )
+
+        return keys
+
+    def add(self, book_id: int, title: str, author: str) -> None:
+        self.remove(book_id)
+        keys = self._keys_for(title, author)
+        self._books[book_id] = (title, author, keys)
+
+        for key in keys:
+            insort(self._keys, (key, book_id))
+
+    def remove(self, book_id: int) -> None:
+        if book_id not in self._books:
+            return
+
+        for key in self._books.pop(book_id)[2]:
+            del self._keys[bisect_left(self._keys, (key, book_id))]
+
+    def search(self, prefix: str, limit: int) -> list[dict]:
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        found = {}
+        position = bisect_left(self._keys, (prefix,))
+        while position < len(self._keys) and len(found) < limit:
+            key, book_id = self._keys[position]
+            if not key.startswith(prefix):
+                break
+
+            found.setdefault(book_id, None)
+            position += 1
+
+        return [
+            {
+                "id": book_id,
+                "title": self._books[book_id][0],
+                "author": self._books[book_id][1],
+            }
+            for book_id in found
+        ]
+
+
+class TitleIndex:
+    """Process wide prefix index over the book catalog.
+
+    The index is built in the background when a worker starts and is
+    updated from Book signals of this process. Changes made by other
+    processes are picked up by a background rebuild once the index is
+    older than BOOK_AUTOCOMPLETE_REFRESH_SECONDS. Only one build runs at
+    a time, searches on a cold worker wait for it instead of starting
+    their own.
+    """
+
+    def __init__(self):
+        self._index = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        # Held for the whole build, so builds never overlap
+        self._build_lock = threading.Lock()
+        self._pending = None
+        self._refreshing = False
+
+    def warm_up(self) -> None:
+        self._refresh_in_background()
+
+    def refresh(self) -> None:
+        """Rebuild an already built index after a bulk change"""
+        if self._index is not None:
+            self._refresh_in_background()
+
+    def rebuild(self) -> None:
+        """Build a new index from the database and swap it in"""
+        with self._build_lock:
+            self._build()
+
+    def _build(self) -> None:
+        with self._lock:
+            self._pending = []
+
+        try:
+            books = Book.objects.values_list("id", "title", "author")
+            index = PrefixIndex.build(books.iterator(chunk_size=10_000))
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+
+        with self._lock:
+            # Replay changes signalled while the snapshot was read
+            for change in self._pending:
+                change(index)
+            self._index, self._built_at, self._pending = (
+                index, time.monotonic(), None
+            )
+
+    def search(self, prefix: str, limit: int) -> list[dict]:
+        if self._index is None:
+            # Waits for a build already running, e.g. of warm_up()
+            with self._build_lock:
+                if self._index is None:
+                    self._build()
+        elif (
+            time.monotonic() - self._built_at
+            > settings.BOOK_AUTOCOMPLETE_REFRESH_SECONDS
+        ):
+            self._refresh_in_background()
+
+        with self._lock:
+            return self._index.search(prefix, limit)
+
+    def add(self, book_id: int, title: str, author: str) -> None:
+        self._apply(lambda index: index.add(book_id, title, author))
+
+    def remove(self, book_id: int) -> None:
+        self._apply(lambda index: index.remove(book_id))
+
+    def _apply(self, change) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(change)
+            if self._index is not None:
+                change(self._index)
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            # Postpone the next refresh attempt while this one runs
+            self._built_at = time.monotonic()
+
+        threading.Thread(target=self._background_rebuild, daemon=True).start()
+
+    def _background_rebuild(self) -> None:
+        try:
+            self.rebuild()
+        finally:
+            with self._lock:
+                self._refreshing = False
+            connection.close()
+
+
+title_index = TitleIndex()
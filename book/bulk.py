@@ -0,0 +1,314 @@
+import codecs
+import csv
+import functools
+import json
+from collections import defaultdict
+from itertools import islice
+from typing import Iterable, Iterator
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, F, IntegerField, When
+from rest_framework.exceptions import ValidationError
+
+from DRF_API_Library.caching import invalidate_responses
+from DRF_API_Library.versioning import next_version
+from book.autocomplete import title_index
+from book.models import Book
+from book.serializers import VALUE_RULES, BookSerializer
+from book.services import refresh_search_documents
+
+
+CSV = "text/csv"
+NDJSON = "application/x-ndjson"
+
+FIELDS = (
+    "id",
+    "title",
+    "author",
+    "cover",
+    "inventory",
+    "daily_fee",
+    "inventory_delta",
+)
+REQUIRED_FOR_CREATE = ("title", "inventory", "daily_fee")
+CREATE_FIELDS = ("title", "author", "cover", "inventory", "daily_fee")
+
+# New books of a chunk are sent as one array per column, which skips
+# compiling a parameter list for every row like bulk_create does
+INSERT_SQL = """
+    INSERT INTO {table} (title, author, cover, inventory, daily_fee, version)
+    SELECT *, 1 FROM unnest(
+        %s::varchar[], %s::varchar[], %s::varchar[],
+        %s::integer[], %s::numeric[]
+    )
+    RETURNING id
+"""
+
+# Only this many per-row errors are listed in the import report
+MAX_REPORTED_ERRORS = 1000
+
+
+@functools.lru_cache(maxsize=None)
+def book_fields() -> dict:
+    """Fields of BookSerializer, which convert uploaded values"""
+    return BookSerializer().fields
+
+
+def _book_value(name: str, value):
+    """Convert a value like BookSerializer does, with the same rules"""
+    if name == "cover":
+        # Covers are accepted in any case
+        value = str(value).upper()
+
+    try:
+        value = book_fields()[name].run_validation(value)
+        if name in VALUE_RULES:
+            VALUE_RULES[name](value)
+    except ValidationError as error:
+        raise ValueError(" ".join(str(detail) for detail in error.detail))
+
+    return value
+
+
+def _integer(value) -> int:
+    if isinstance(value, bool) or isinstance(value, float):
+        raise ValueError("A valid integer is required")
+
+    return int(value)
+
+
+def _positive_integer(value) -> int:
+    value = _integer(value)
+    if value < 1:
+        raise ValueError("Ensure this value is greater than 0")
+
+    return value
+
+
+CLEANERS = {
+    "id": _positive_integer,
+    **{
+        name: functools.partial(_book_value, name)
+        for name in CREATE_FIELDS
+    },
+    "inventory_delta": _integer,
+}
+
+
+def clean_row(raw) -> tuple[dict, list[str]]:
+    """Validate one uploaded row, return cleaned values and errors.
+
+    Rows without "id" create books, rows with "id" update the given
+    fields and/or shift inventory by "inventory_delta". Empty CSV
+    cells count as missing values.
+    """
+    if not isinstance(raw, dict):
+        return {}, ["Row must be an object"]
+
+    row, errors = {}, []
+    for field, value in raw.items():
+        if field not in CLEANERS:
+            errors.append(f"{field}: Unknown field")
+            continue
+        if value is None or value == "":
+            continue
+
+        try:
+            row[field] = CLEANERS[field](value)
+        except (TypeError, ValueError) as error:
+            errors.append(f"{field}: {error}")
+
+    if "id" not in row and not errors:
+        errors.extend(
+            f"{field}: This field is required"
+            for field in REQUIRED_FOR_CREATE
+            if field not in row
+        )
+        if "inventory_delta" in row:
+            errors.append(
+                "inventory_delta: Only existing books can be adjusted"
+            )
+    if "inventory" in row and "inventory_delta" in row:
+        errors.append("Set either inventory or inventory_delta, not both")
+
+    return row, errors
+
+
+def read_rows(stream: Iterable[bytes], media_type: str) -> Iterator:
+    """Yield (line number, raw row) pairs from a CSV or NDJSON upload"""
+    lines = codecs.iterdecode(stream, "utf-8-sig")
+
+    if media_type == CSV:
+        reader = csv.DictReader(lines)
+        unknown = set(reader.fieldnames or ()) - set(FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+
+        for raw in reader:
+            yield reader.line_num, raw
+
+    elif media_type == NDJSON:
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError:
+                yield line_number, None
+
+    else:
+        raise ValueError(f"Unsupported format: {media_type}")
+
+
+def import_books(rows: Iterable, chunk_size: int) -> dict:
+    """Create, update and restock books from uploaded rows in chunks.
+
+    Every chunk is validated in Python and written with a handful of
+    statements in its own transaction, so a large upload never holds
+    one long transaction. Rows failing validation are skipped and
+    reported with their line numbers.
+    """
+    report = {
+        "created": 0,
+        "updated": 0,
+        "adjusted": 0,
+        "failed": 0,
+        "errors": [],
+    }
+    rows = iter(rows)
+
+    while chunk := list(islice(rows, chunk_size)):
+        _import_chunk(chunk, report)
+
+    if report["created"] or report["updated"] or report["adjusted"]:
+        invalidate_responses(Book)
+        title_index.refresh()
+
+    return report
+
+
+def _import_chunk(chunk: list, report: dict) -> None:
+    creates, updates, deltas = [], {}, defaultdict(list)
+
+    for line, raw in chunk:
+        row, errors = clean_row(raw)
+        if errors:
+            _fail(report, line, errors)
+        elif "id" not in row:
+            creates.append(row)
+        else:
+            book_id = row.pop("id")
+            delta = row.pop("inventory_delta", None)
+            if row:
+                updates.setdefault(book_id, (line, {}))[1].update(row)
+            if delta is not None:
+                deltas[book_id].append((line, delta))
+
+    existing = set(
+        Book.objects.filter(
+            pk__in=updates.keys() | deltas.keys()
+        ).values_list("pk", flat=True)
+    )
+    for book_id in updates.keys() - existing:
+        _fail(report, updates.pop(book_id)[0], ["Book does not exist"])
+    for book_id in deltas.keys() - existing:
+        for line, _ in deltas.pop(book_id):
+            _fail(report, line, ["Book does not exist"])
+
+    with transaction.atomic():
+        created = _create(creates)
+        _update(updates)
+        adjusted = _adjust_inventory(deltas, report)
+
+        retitled = [
+            book_id
+            for book_id, (_, fields) in updates.items()
+            if "title" in fields or "author" in fields
+        ]
+        refresh_search_documents(
+            Book.objects.filter(pk__in=created + retitled)
+        )
+
+    report["created"] += len(creates)
+    report["updated"] += len(updates)
+    report["adjusted"] += adjusted
+
+
+def _create(rows: list[dict]) -> list[int]:
+    """Insert new books with a single statement, return their ids"""
+    if not rows:
+        return []
+
+    columns = []
+    for name in CREATE_FIELDS:
+        default = Book._meta.get_field(name).get_default()
+        columns.append([row.get(name, default) for row in rows])
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            INSERT_SQL.format(table=Book._meta.db_table), columns
+        )
+        return [book_id for book_id, in cursor.fetchall()]
+
+
+def _update(updates: dict) -> None:
+    """Run one bulk UPDATE per set of changed columns"""
+    by_fields = defaultdict(list)
+    for book_id, (_, fields) in updates.items():
+        by_fields[tuple(sorted(fields))].append(
+            Book(pk=book_id, version=next_version(), **fields)
+        )
+
+    for fields, books in by_fields.items():
+        Book.objects.bulk_update(books, [*fields, "version"])
+
+
+def _adjust_inventory(deltas: dict, report: dict) -> int:
+    """Shift inventory relative to the stored value.
+
+    All deltas of the chunk go in one UPDATE. If one of them would take
+    inventory below zero the database rejects the statement, and the
+    chunk falls back to one conditional UPDATE per book to find it.
+    """
+    if not deltas:
+        return 0
+
+    totals = {
+        book_id: sum(delta for _, delta in changes)
+        for book_id, changes in deltas.items()
+    }
+
+    try:
+        with transaction.atomic():
+            return Book.objects.filter(pk__in=totals).update(
+                inventory=Case(
+                    *(
+                        When(pk=book_id, then=F("inventory") + delta)
+                        for book_id, delta in totals.items()
+                    ),
+                    default=F("inventory"),
+                    output_field=IntegerField(),
+                ),
+                version=next_version(),
+            )
+    except IntegrityError:
+        pass
+
+    adjusted = 0
+    for book_id, delta in totals.items():
+        if Book.objects.filter(pk=book_id, inventory__gte=-delta).update(
+            inventory=F("inventory") + delta, version=next_version()
+        ):
+            adjusted += 1
+        else:
+            for line, _ in deltas[book_id]:
+                _fail(report, line, ["Inventory can`t be less than 0"])
+
+    return adjusted
+
+
+def _fail(report: dict, line: int, errors: list[str]) -> None:
+    report["failed"] += 1
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({"line": line, "errors": errors})
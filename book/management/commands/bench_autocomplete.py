@@ -0,0 +1,81 @@
+import time
+import tracemalloc
+
+from django.core.management import BaseCommand, call_command
+from rest_framework.test import APIRequestFactory
+
+from book.autocomplete import PrefixIndex, title_index
+from book.models import Book
+from book.views import BookViewSet
+
+
+PREFIXES = ["s", "st", "sto", "win", "golden c", "me", "iron ma", "zzz"]
+
+
+class Command(BaseCommand):
+    """Django command to benchmark title autocomplete.
+
+    Report memory taken by the in-process prefix index and p50/p99
+    latency of index lookups and of the autocomplete endpoint.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Generate this many books first (ex. 500000)",
+        )
+        parser.add_argument("--repeat", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            call_command("bench_book_search", seed=options["seed"], repeat=1)
+
+        books = list(Book.objects.values_list("id", "title", "author"))
+        self.stdout.write(f"Books in catalog: {len(books)}")
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        index = PrefixIndex.build(books)
+        elapsed = time.perf_counter() - started
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        self.stdout.write(
+            f"index: build={elapsed:.1f}s memory={size / 2 ** 20:.1f}MiB "
+            f"per_book={size / max(len(books), 1):.0f}B"
+        )
+
+        title_index.rebuild()
+        view = BookViewSet.as_view({"get": "autocomplete"})
+
+        for prefix in PREFIXES:
+            lookup = self._time(
+                lambda: index.search(prefix, 10), options["repeat"]
+            )
+            endpoint = self._time(
+                lambda: view(
+                    APIRequestFactory().get(
+                        "/", {"q": prefix}, HTTP_HOST="localhost"
+                    )
+                ).render(),
+                options["repeat"],
+            )
+            self.stdout.write(
+                f"q={prefix!r}: index p50={lookup[0]:.3f}ms "
+                f"p99={lookup[1]:.3f}ms endpoint p50={endpoint[0]:.3f}ms "
+                f"p99={endpoint[1]:.3f}ms"
+            )
+
+    @staticmethod
+    def _time(call, repeat: int) -> tuple[float, float]:
+        """Return p50 and p99 of the call in ms"""
+        timings = []
+
+        for _ in range(repeat):
+            started = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        return timings[len(timings) // 2], timings[int(len(timings) * 0.99)]
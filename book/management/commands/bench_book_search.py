@@ -0,0 +1,101 @@
+import time
+
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from book.models import Book
+from book.services import filtering, refresh_search_documents
+from book.views import BookPagination, BookViewSet
+
+
+WORDS = [
+    "night", "river", "stone", "garden", "shadow", "empire", "winter",
+    "secret", "ocean", "fire", "glass", "silent", "crown", "forest",
+    "storm", "city", "dream", "iron", "golden", "last", "wolf", "star",
+    "mountain", "letters", "house", "war", "peace", "road", "island",
+    "memory", "light", "history", "journey", "machine", "paper",
+]
+
+# Titles and authors are generated inside Postgres from random words
+SEED_SQL = """
+    INSERT INTO {table} (
+        title, author, cover, inventory, daily_fee, version
+    )
+    SELECT
+        initcap(w[1 + floor(random() * n)::int] || ' '
+            || w[1 + floor(random() * n)::int] || ' '
+            || w[1 + floor(random() * n)::int]),
+        initcap(w[1 + floor(random() * n)::int] || ' '
+            || w[1 + floor(random() * n)::int]),
+        CASE WHEN random() < 0.5 THEN 'HARD' ELSE 'SOFT' END,
+        floor(random() * 5)::int,
+        1 + round((random() * 10)::numeric, 2),
+        1
+    FROM generate_series(1, %(rows)s),
+        (SELECT %(words)s::text[] AS w, %(words_count)s AS n) AS vocabulary
+"""
+
+QUERIES = [
+    {"search": "stone"},
+    {"search": "winter garden"},
+    {"search": "golden crown", "cover": "soft"},
+    {"search": "memory", "is_available": "true"},
+    {"search": '"iron machine"'},
+    {"search": "wolf -night"},
+]
+
+
+class Command(BaseCommand):
+    """Django command to benchmark book full-text search.
+
+    Generate a large catalog and report p50/p99 latency of the first
+    page of search results, including the count the paginator runs.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Generate this many books first (ex. 500000)",
+        )
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            self._seed(options["seed"])
+
+        self.stdout.write(f"Books in catalog: {Book.objects.count()}")
+
+        for params in QUERIES:
+            timings = []
+            for _ in range(options["repeat"]):
+                request = Request(APIRequestFactory().get("/", params))
+                started = time.perf_counter()
+                queryset = filtering(BookViewSet.queryset, request)
+                count = queryset.count()
+                page = list(queryset[:BookPagination.page_size])
+                timings.append((time.perf_counter() - started) * 1000)
+
+            timings.sort()
+            self.stdout.write(
+                f"{params}: matches={count} page={len(page)} "
+                f"p50={timings[len(timings) // 2]:.1f}ms "
+                f"p99={timings[int(len(timings) * 0.99)]:.1f}ms"
+            )
+
+    def _seed(self, rows: int) -> None:
+        self.stdout.write(f"Generating {rows} books...")
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                SEED_SQL.format(table=Book._meta.db_table),
+                {"rows": rows, "words": WORDS, "words_count": len(WORDS)},
+            )
+            refresh_search_documents(
+                Book.objects.filter(search_document__isnull=True)
+            )
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"VACUUM ANALYZE {Book._meta.db_table}")
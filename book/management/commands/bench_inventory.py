@@ -0,0 +1,106 @@
+import multiprocessing
+import time
+
+from django.core.management import BaseCommand
+from django.db import connections
+
+from book.models import Book
+from book.services import reserve_copy
+
+
+def naive_reserve(book_id: int) -> bool:
+    """Read-modify-write checkout used by the views before reservations"""
+    book = Book.objects.get(pk=book_id)
+    if book.inventory <= 0:
+        return False
+
+    book.inventory -= 1
+    book.save()
+    return True
+
+
+STRATEGIES = {
+    "atomic": reserve_copy,
+    "naive": naive_reserve,
+}
+
+
+def hammer(book_id: int, attempts: int, strategy: str, results) -> None:
+    """Worker process body: try to check out the same book repeatedly"""
+    connections.close_all()
+    reserve = STRATEGIES[strategy]
+    reserved = 0
+
+    for _ in range(attempts):
+        if reserve(book_id):
+            reserved += 1
+
+    results.put(reserved)
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    """Django command to benchmark concurrent checkouts of one book"""
+
+    help = (  # noqa: VNE003
+        "Hammer a single Book row from several processes and report "
+        "checkout throughput and oversell count."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=8)
+        parser.add_argument("--attempts", type=int, default=200)
+        parser.add_argument("--stock", type=int, default=500)
+        parser.add_argument(
+            "--strategy", choices=STRATEGIES, default="atomic"
+        )
+
+    def handle(self, *args, **options):
+        processes = options["processes"]
+        attempts = options["attempts"]
+        stock = options["stock"]
+
+        book = Book.objects.create(
+            title="Inventory benchmark",
+            inventory=stock,
+            daily_fee=1,
+        )
+        connections.close_all()
+
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        workers = [
+            context.Process(
+                target=hammer,
+                args=(book.id, attempts, options["strategy"], results),
+            )
+            for _ in range(processes)
+        ]
+
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        reserved = sum(results.get() for _ in workers)
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        book.refresh_from_db()
+        taken = stock - book.inventory
+        oversold = reserved - taken
+        book.delete()
+
+        total = processes * attempts
+        self.stdout.write(
+            f"strategy={options['strategy']} processes={processes} "
+            f"attempts={total} stock={stock}"
+        )
+        self.stdout.write(
+            f"elapsed={elapsed:.3f}s throughput={total / elapsed:.0f}/s "
+            f"reserved={reserved} taken={taken} oversold={oversold}"
+        )
+
+        if oversold:
+            self.stdout.write(self.style.ERROR("Inventory was oversold!"))
+        else:
+            self.stdout.write(self.style.SUCCESS("No oversell detected"))
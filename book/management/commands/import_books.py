@@ -0,0 +1,66 @@
+import csv
+import sys
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from book.bulk import CSV, NDJSON, import_books, read_rows
+
+
+FORMATS = {"csv": CSV, "ndjson": NDJSON}
+
+
+class Command(BaseCommand):
+    """Django command to import books from a CSV or NDJSON file.
+
+    Rows without id create books, rows with id update the given fields
+    and/or shift inventory by inventory_delta. Rows are written in
+    chunks and invalid rows are reported by line number.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, - for stdin")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="File format, guessed from the extension by default",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.BOOK_IMPORT_CHUNK_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or path.rsplit(".", 1)[-1].lower()
+        if file_format not in FORMATS:
+            raise CommandError("Pass --format for this file")
+
+        started = time.perf_counter()
+        stream = sys.stdin.buffer if path == "-" else open(path, "rb")
+        try:
+            report = import_books(
+                read_rows(stream, FORMATS[file_format]),
+                options["chunk_size"],
+            )
+        except (ValueError, csv.Error) as error:
+            raise CommandError(error)
+        finally:
+            stream.close()
+        elapsed = time.perf_counter() - started
+
+        for error in report["errors"]:
+            self.stderr.write(
+                f"line {error['line']}: {'; '.join(error['errors'])}"
+            )
+
+        rows = sum(
+            report[key] for key in ("created", "updated", "adjusted", "failed")
+        )
+        self.stdout.write(
+            f"created={report['created']} updated={report['updated']} "
+            f"adjusted={report['adjusted']} failed={report['failed']} "
+            f"elapsed={elapsed:.1f}s rows/s={rows / elapsed:.0f}"
+        )
@@ -1,12 +1,16 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
+from DRF_API_Library.versioning import VersionedModel
+
 
 class CoverType(models.TextChoices):
     HARD = "HARD", "Hardcover"
     SOFT = "SOFT", "Softcover"
 
 
-class Book(models.Model):
+class Book(VersionedModel):
     """Model book"""
     title = models.CharField(max_length=60)
     author = models.CharField(max_length=60, blank=True)
@@ -15,6 +19,18 @@ class Book(models.Model):
     )
     inventory = models.PositiveIntegerField()
     daily_fee = models.DecimalField(max_digits=10, decimal_places=2)
+    search_document = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(inventory__gte=0),
+                name="book_inventory_non_negative",
+            ),
+        ]
+        indexes = [
+            GinIndex(fields=["search_document"], name="book_search_idx"),
+        ]
 
     def __str__(self):
         return self.title
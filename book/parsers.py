@@ -0,0 +1,20 @@
+from rest_framework.parsers import BaseParser
+
+
+class StreamParser(BaseParser):
+    """Hand the raw request stream to the view instead of parsing it.
+
+    Bulk uploads are read line by line by the view, so they are never
+    loaded into memory as a whole.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return stream
+
+
+class CSVStreamParser(StreamParser):
+    media_type = "text/csv"
+
+
+class NDJSONStreamParser(StreamParser):
+    media_type = "application/x-ndjson"
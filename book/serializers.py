@@ -4,6 +4,29 @@ from rest_framework.exceptions import ValidationError
 from book.models import Book
 
 
+def validate_inventory(value: int) -> None:
+    if value < 1:
+        raise ValidationError(
+            "Inventory can`t be less than 1",
+            code=status.HTTP_403_FORBIDDEN
+        )
+
+
+def validate_daily_fee(value) -> None:
+    if value <= 0:
+        raise ValidationError(
+            "Daily fee can`t be less than 0",
+            code=status.HTTP_403_FORBIDDEN
+        )
+
+
+# Rules of BookSerializer.validate(), the bulk import applies them too
+VALUE_RULES = {
+    "inventory": validate_inventory,
+    "daily_fee": validate_daily_fee,
+}
+
+
 class BookSerializer(serializers.ModelSerializer):
     """Serializer for Model book"""
     class Meta:
@@ -19,14 +42,7 @@ class BookSerializer(serializers.ModelSerializer):
 
     def validate(self, value):
         """Validate  inventory and daily_fee on positive value"""
-        if value["inventory"] < 1:
-            raise ValidationError(
-                "Inventory can`t be less than 1",
-                code=status.HTTP_403_FORBIDDEN
-            )
-        if value["daily_fee"] <= 0:
-            raise ValidationError(
-                "Daily fee can`t be less than 0",
-                code=status.HTTP_403_FORBIDDEN
-            )
+        for field, rule in VALUE_RULES.items():
+            if field in value:
+                rule(value[field])
         return value
@@ -0,0 +1,77 @@
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db.models import F
+from django.db.models.query import QuerySet
+from rest_framework.request import Request
+
+from DRF_API_Library.caching import invalidate_responses
+from DRF_API_Library.versioning import next_version
+from book.models import Book
+
+
+SEARCH_CONFIG = "english"
+
+
+def refresh_search_documents(queryset: QuerySet) -> None:
+    """Rebuild the stored full-text document of the books"""
+    queryset.update(
+        search_document=SearchVector(
+            "title", "author", config=SEARCH_CONFIG
+        )
+    )
+
+
+def filtering(
+        queryset: QuerySet, request: Request
+) -> QuerySet:
+    search = request.query_params.get("search")
+    cover = request.query_params.get("cover")
+    is_available = request.query_params.get("is_available")
+
+    if cover:
+        queryset = queryset.filter(cover=cover.upper())
+
+    if is_available is not None:
+        if is_available.lower() == "true":
+            queryset = queryset.filter(inventory__gt=0)
+
+        if is_available.lower() == "false":
+            queryset = queryset.filter(inventory=0)
+
+    if search:
+        query = SearchQuery(
+            search, config=SEARCH_CONFIG, search_type="websearch"
+        )
+        queryset = queryset.filter(search_document=query).annotate(
+            rank=SearchRank(F("search_document"), query)
+        ).order_by("-rank", "id")
+
+    return queryset
+
+
+def reserve_copy(book_id: int) -> bool:
+    """Take one copy of the book out of inventory.
+
+    The decrement is a single conditional UPDATE, so concurrent
+    checkouts never oversell and a sold out book is reported
+    without a separate read.
+    """
+    reserved = Book.objects.filter(
+        pk=book_id, inventory__gt=0
+    ).update(inventory=F("inventory") - 1, version=next_version())
+
+    if reserved:
+        invalidate_responses(Book)
+
+    return bool(reserved)
+
+
+def release_copy(book_id: int) -> None:
+    """Put one copy of the book back to inventory"""
+    Book.objects.filter(pk=book_id).update(
+        inventory=F("inventory") + 1, version=next_version()
+    )
+    invalidate_responses(Book)
@@ -0,0 +1,56 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from DRF_API_Library.caching import invalidate_responses
+from book.autocomplete import title_index
+from book.models import Book
+from book.services import refresh_search_documents
+
+
+@receiver(
+    [post_save, post_delete],
+    sender=Book,
+    dispatch_uid="book_response_cache_invalidation"
+)
+def invalidate_response_cache(sender, instance, **kwargs):
+    """Handle changes of Book"""
+    invalidate_responses(Book)
+
+
+@receiver(
+    post_save,
+    sender=Book,
+    dispatch_uid="book_search_document_refresh"
+)
+def refresh_search_document(sender, instance, update_fields, **kwargs):
+    """Keep the full-text document in sync with title and author"""
+    if update_fields and not {"title", "author"} & set(update_fields):
+        return
+
+    refresh_search_documents(Book.objects.filter(pk=instance.pk))
+
+
+@receiver(
+    post_save,
+    sender=Book,
+    dispatch_uid="book_autocomplete_update"
+)
+def update_autocomplete_index(sender, instance, update_fields, **kwargs):
+    """Index the saved book for autocomplete once it is committed"""
+    if update_fields and not {"title", "author"} & set(update_fields):
+        return
+
+    book = (instance.id, instance.title, instance.author)
+    transaction.on_commit(lambda: title_index.add(*book))
+
+
+@receiver(
+    post_delete,
+    sender=Book,
+    dispatch_uid="book_autocomplete_remove"
+)
+def remove_from_autocomplete_index(sender, instance, **kwargs):
+    """Drop the deleted book from autocomplete once it is committed"""
+    book_id = instance.id
+    transaction.on_commit(lambda: title_index.remove(book_id))
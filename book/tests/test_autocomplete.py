@@ -0,0 +1,160 @@
+import threading
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from book.autocomplete import PrefixIndex, TitleIndex, title_index
+from book.models import Book
+
+AUTOCOMPLETE_URL = reverse("book:book-autocomplete")
+
+
+class PrefixIndexTests(TestCase):
+    """Tests for the in-memory prefix index"""
+    def setUp(self):
+        self.index = PrefixIndex()
+        self.index.add(1, "Harry Potter", "J. K. Rowling")
+        self.index.add(2, "The Tale of Peter Rabbit", "Beatrix Potter")
+        self.index.add(3, "Harvest", "Jim Crace")
+
+    def test_search_by_title_start(self):
+        ids = [book["id"] for book in self.index.search("harr", 10)]
+
+        self.assertEqual(ids, [1])
+
+    def test_search_by_any_word(self):
+        ids = {book["id"] for book in self.index.search("Pott", 10)}
+
+        self.assertEqual(ids, {1, 2})
+
+    def test_search_ignores_case_and_punctuation(self):
+        ids = [book["id"] for book in self.index.search("PETER-RAB", 10)]
+
+        self.assertEqual(ids, [2])
+
+    def test_search_respects_limit(self):
+        self.assertEqual(len(self.index.search("har", 1)), 1)
+
+    def test_search_empty_prefix(self):
+        self.assertEqual(self.index.search(" ", 10), [])
+
+    def test_add_replaces_book(self):
+        self.index.add(3, "Dune", "Frank Herbert")
+
+        self.assertEqual(self.index.search("harv", 10), [])
+        self.assertEqual(
+            self.index.search("dune", 10),
+            [{"id": 3, "title": "Dune", "author": "Frank Herbert"}]
+        )
+
+    def test_build_matches_add(self):
+        index = PrefixIndex.build([
+            (1, "Harry Potter", "J. K. Rowling"),
+            (2, "The Tale of Peter Rabbit", "Beatrix Potter"),
+            (3, "Harvest", "Jim Crace"),
+        ])
+
+        self.assertEqual(index._keys, self.index._keys)
+
+    def test_remove_book(self):
+        self.index.remove(1)
+        self.index.remove(1)
+
+        ids = {book["id"] for book in self.index.search("potter", 10)}
+        self.assertEqual(ids, {2})
+        self.assertEqual(len(self.index), 2)
+
+
+class TitleIndexTests(TestCase):
+    """Tests for building the process wide index"""
+
+    def test_cold_searches_wait_for_running_build(self):
+        index = TitleIndex()
+        build = PrefixIndex.build
+        started, release = threading.Event(), threading.Event()
+
+        def slow_build(books):
+            started.set()
+            release.wait(5)
+            return build([(1, "Harry Potter", "J. K. Rowling")])
+
+        results = []
+
+        def search():
+            results.append(index.search("harr", 10))
+
+        with mock.patch.object(
+            PrefixIndex, "build", side_effect=slow_build
+        ) as build_mock:
+            index.warm_up()
+            started.wait(5)
+            searches = [threading.Thread(target=search) for _ in range(2)]
+            for thread in searches:
+                thread.start()
+            index.add(2, "Harvest", "Jim Crace")
+            release.set()
+            for thread in searches:
+                thread.join(5)
+
+        self.assertEqual(build_mock.call_count, 1)
+        self.assertEqual(
+            [[book["id"] for book in found] for found in results],
+            [[1], [1]],
+        )
+        self.assertEqual(len(index.search("harv", 10)), 1)
+
+
+class AutocompleteApiTests(TestCase):
+    """Tests for title autocomplete endpoint"""
+    def setUp(self):
+        self.client = APIClient()
+        self.book = Book.objects.create(
+            title="Harry Potter",
+            author="J. K. Rowling",
+            inventory=1,
+            daily_fee="4.64"
+        )
+        title_index.rebuild()
+
+    def test_autocomplete_does_not_query_database(self):
+        with self.assertNumQueries(0):
+            res = self.client.get(AUTOCOMPLETE_URL, {"q": "harr"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            [{"id": self.book.id, "title": "Harry Potter",
+              "author": "J. K. Rowling"}]
+        )
+
+    def test_autocomplete_follows_book_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            other = Book.objects.create(
+                title="Harvest",
+                author="Jim Crace",
+                inventory=1,
+                daily_fee="1.00"
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.delete()
+
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "har"})
+
+        self.assertEqual([book["id"] for book in res.data], [other.id])
+
+    def test_autocomplete_limit(self):
+        for number in range(3):
+            with self.captureOnCommitCallbacks(execute=True):
+                Book.objects.create(
+                    title=f"Harbour {number}",
+                    inventory=1,
+                    daily_fee="1.00"
+                )
+
+        res = self.client.get(AUTOCOMPLETE_URL, {"q": "har", "limit": 2})
+
+        self.assertEqual(len(res.data), 2)
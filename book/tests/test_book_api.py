@@ -1,8 +1,11 @@
+import unittest
 from datetime import datetime, timedelta
 from decimal import Decimal
 from django.utils import timezone
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
 from django.urls import reverse
 
@@ -11,9 +14,11 @@ from rest_framework import status
 
 from book.models import Book
 from book.serializers import BookSerializer
+from book.services import reserve_copy
 from borrowings.models import Borrowing
 
 BOOK_URL = reverse("book:book-list")
+BOOK_EXPORT_URL = reverse("book:book-export")
 
 
 def sample_book(**params):
@@ -64,7 +69,61 @@ class AuthenticatedBookApiTests(TestCase):
         serializer = BookSerializer(books, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
+
+    def test_list_books_is_paginated(self):
+        for _ in range(25):
+            sample_book()
+
+        res = self.client.get(BOOK_URL, {"page": 2})
+
+        books = Book.objects.order_by("id")[20:]
+        serializer = BookSerializer(books, many=True)
+
+        self.assertEqual(res.data["count"], 25)
+        self.assertEqual(res.data["results"], serializer.data)
+
+    def test_filter_books_by_cover_and_availability(self):
+        soft_book = sample_book(cover="SOFT")
+        sample_book(cover="SOFT", inventory=0)
+        sample_book(cover="HARD")
+
+        res = self.client.get(
+            BOOK_URL, {"cover": "soft", "is_available": "true"}
+        )
+
+        serializer = BookSerializer([soft_book], many=True)
+        self.assertEqual(res.data["results"], serializer.data)
+
+    @unittest.skipUnless(
+        connection.vendor == "postgresql", "Full-text search needs Postgres"
+    )
+    def test_search_books_by_title_and_author(self):
+        tolkien = sample_book(title="The Hobbit", author="J. R. R. Tolkien")
+        hobbits = sample_book(
+            title="Hobbits and their homes", author="Someone Else"
+        )
+        sample_book(title="Dune", author="Frank Herbert")
+
+        res = self.client.get(BOOK_URL, {"search": "hobbit"})
+        ids = {book["id"] for book in res.data["results"]}
+        self.assertEqual(ids, {tolkien.id, hobbits.id})
+
+        res = self.client.get(BOOK_URL, {"search": "tolkien"})
+        self.assertEqual(
+            [book["id"] for book in res.data["results"]], [tolkien.id]
+        )
+
+    @unittest.skipUnless(
+        connection.vendor == "postgresql", "Full-text search needs Postgres"
+    )
+    def test_search_ranks_best_matches_first(self):
+        sample_book(title="Gardening", author="Mary Stone")
+        best = sample_book(title="Stone garden", author="Mary Stone")
+
+        res = self.client.get(BOOK_URL, {"search": "stone"})
+
+        self.assertEqual(res.data["results"][0]["id"], best.id)
 
     def test_retrieve_book_detail(self):
         book = sample_book()
@@ -90,6 +149,49 @@ class AuthenticatedBookApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class BookCatalogCacheTests(TestCase):
+    """Tests for the cached book catalog"""
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.book = sample_book(inventory=2)
+
+    def test_list_is_served_from_cache(self):
+        self.client.get(BOOK_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(BOOK_URL)
+
+        self.assertEqual(res.data["results"][0]["title"], "Sample book")
+
+    def test_cache_is_keyed_by_query_params(self):
+        sample_book(title="Another book")
+
+        self.client.get(BOOK_URL, {"page_size": 1})
+        res = self.client.get(BOOK_URL, {"page_size": 1, "page": 2})
+
+        self.assertEqual(res.data["results"][0]["title"], "Another book")
+
+    def test_book_update_invalidates_cache(self):
+        self.client.get(BOOK_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.title = "Updated book"
+            self.book.save()
+        res = self.client.get(BOOK_URL)
+
+        self.assertEqual(res.data["results"][0]["title"], "Updated book")
+
+    def test_inventory_reservation_invalidates_cache(self):
+        self.client.get(BOOK_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reserve_copy(self.book.id)
+        res = self.client.get(BOOK_URL)
+
+        self.assertEqual(res.data["results"][0]["inventory"], 1)
+
+
 class AdminBookApiTests(TestCase):
     """Tests for user with admin permission that can create/delete book"""
     def setUp(self):
@@ -132,3 +234,21 @@ class AdminBookApiTests(TestCase):
 
         delete_res = self.client.delete(reverse('book:book-detail', args=[self.book.id]))
         self.assertEqual(delete_res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_books_csv(self):
+        sample_book(title="Dune, part one", cover="SOFT", inventory=0)
+
+        res = self.client.get(BOOK_EXPORT_URL, {"is_available": "true"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/csv")
+        self.assertEqual(
+            b"".join(res.streaming_content).decode(),
+            "id,title,author,cover,inventory,daily_fee\r\n"
+            f"{self.book.id},Sample book,Same author,HARD,1,4.64\r\n"
+        )
+
+    def test_export_unknown_output(self):
+        res = self.client.get(BOOK_EXPORT_URL, {"output": "xlsx"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,188 @@
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from book.bulk import clean_row
+from book.models import Book
+
+BULK_URL = reverse("book:book-bulk")
+
+
+def sample_book(**params):
+    defaults = {
+        "title": "Sample book",
+        "author": "Same author",
+        "inventory": 5,
+        "daily_fee": "4.64"
+    }
+    defaults.update(params)
+
+    return Book.objects.create(**defaults)
+
+
+class CleanRowTests(TestCase):
+    """Tests for validation of uploaded rows"""
+    def test_new_book_requires_fields(self):
+        row, errors = clean_row({"title": "Dune"})
+
+        self.assertEqual(
+            errors,
+            [
+                "inventory: This field is required",
+                "daily_fee: This field is required",
+            ]
+        )
+
+    def test_values_are_converted(self):
+        row, errors = clean_row({
+            "title": " Dune ",
+            "cover": "soft",
+            "inventory": "3",
+            "daily_fee": "1.50",
+            "author": "",
+        })
+
+        self.assertEqual(errors, [])
+        self.assertEqual(row["title"], "Dune")
+        self.assertEqual(row["cover"], "SOFT")
+        self.assertEqual(row["inventory"], 3)
+        self.assertNotIn("author", row)
+
+    def test_invalid_values(self):
+        row, errors = clean_row({
+            "id": "1",
+            "cover": "paper",
+            "inventory": "0",
+            "daily_fee": "0.001",
+            "color": "red",
+        })
+
+        self.assertEqual(len(errors), 4)
+
+    def test_inventory_with_delta(self):
+        row, errors = clean_row(
+            {"id": 1, "inventory": 3, "inventory_delta": 1}
+        )
+
+        self.assertEqual(
+            errors, ["Set either inventory or inventory_delta, not both"]
+        )
+
+
+class BulkImportApiTests(TestCase):
+    """Tests for bulk book import endpoint"""
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@admin.com",
+            "testpass",
+            is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+
+    def post_csv(self, content):
+        return self.client.generic(
+            "POST", BULK_URL, content.encode(), content_type="text/csv"
+        )
+
+    def test_bulk_requires_admin(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("user@test.com", "pass")
+        )
+
+        res = self.post_csv("title,inventory,daily_fee\nDune,1,1\n")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_csv_creates_books(self):
+        res = self.post_csv(
+            "title,author,cover,inventory,daily_fee\n"
+            "Dune,Frank Herbert,SOFT,3,1.50\n"
+            "Emma,Jane Austen,,2,0.99\n"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 2)
+        book = Book.objects.get(title="Dune")
+        self.assertEqual(book.cover, "SOFT")
+        self.assertEqual(Book.objects.get(title="Emma").cover, "HARD")
+        self.assertTrue(
+            Book.objects.filter(search_document="herbert").exists()
+        )
+
+    def test_ndjson_updates_and_restocks(self):
+        book = sample_book()
+        other = sample_book(inventory=1)
+        rows = [
+            {"id": book.id, "title": "New title", "inventory_delta": 2},
+            {"id": other.id, "inventory_delta": -1},
+            {"id": book.id, "inventory_delta": 3},
+        ]
+
+        res = self.client.generic(
+            "POST",
+            BULK_URL,
+            "\n".join(json.dumps(row) for row in rows).encode(),
+            content_type="application/x-ndjson",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["updated"], 1)
+        self.assertEqual(res.data["adjusted"], 2)
+        book.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(book.title, "New title")
+        self.assertEqual(book.inventory, 10)
+        self.assertEqual(other.inventory, 0)
+
+    def test_rows_are_reported_with_line_numbers(self):
+        book = sample_book(inventory=1)
+
+        res = self.post_csv(
+            "id,title,inventory,daily_fee,inventory_delta\n"
+            f"{book.id},,,,-2\n"
+            ",Dune,1,-1,\n"
+            "999999,Ghost,,,\n"
+            ",Emma,1,1,\n"
+        )
+
+        self.assertEqual(res.data["created"], 1)
+        self.assertEqual(res.data["failed"], 3)
+        self.assertEqual(
+            [error["line"] for error in res.data["errors"]], [3, 4, 2]
+        )
+        book.refresh_from_db()
+        self.assertEqual(book.inventory, 1)
+
+    def test_unknown_column(self):
+        res = self.post_csv("title,price\nDune,1\n")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Book.objects.exists())
+
+
+class ImportBooksCommandTests(TestCase):
+    """Tests for import_books command"""
+    def test_import_file_in_chunks(self):
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".ndjson", delete=False
+        ) as file:
+            for number in range(5):
+                file.write(json.dumps({
+                    "title": f"Book {number}",
+                    "inventory": 1,
+                    "daily_fee": "1.00",
+                }) + "\n")
+        self.addCleanup(os.remove, file.name)
+
+        call_command("import_books", file.name, chunk_size=2, stdout=None)
+
+        self.assertEqual(Book.objects.count(), 5)
@@ -0,0 +1,49 @@
+import unittest
+
+from django.db import connection
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from DRF_API_Library.tests.plans import scanned_indexes, seq_scanned_tables
+from book.models import Book
+from book.services import filtering, refresh_search_documents
+from book.views import BookViewSet
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql", "Query plans are Postgres specific"
+)
+class BookQueryPlanTests(TestCase):
+    """Book search must be served by the full-text index"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Book.objects.bulk_create(
+            Book(
+                title=f"Sample book {number}",
+                author=f"Author {number % 100}",
+                inventory=number % 3,
+                daily_fee=1,
+            )
+            for number in range(2000)
+        )
+        refresh_search_documents(Book.objects.all())
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Book._meta.db_table}")
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def test_search_books(self):
+        request = Request(
+            APIRequestFactory().get(
+                "/", {"search": "author 42", "cover": "hard"}
+            )
+        )
+        queryset = filtering(BookViewSet.queryset, request)
+
+        self.assertNotIn(Book._meta.db_table, seq_scanned_tables(queryset))
+        self.assertIn("book_search_idx", scanned_indexes(queryset))
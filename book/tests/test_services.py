@@ -0,0 +1,42 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.test import TestCase
+
+from book.models import Book
+from book.services import reserve_copy, release_copy
+
+
+class InventoryReservationTests(TestCase):
+    """Tests for atomic inventory reservation"""
+    def setUp(self):
+        self.book = Book.objects.create(
+            title="Sample book",
+            inventory=2,
+            daily_fee="4.64"
+        )
+
+    def test_reserve_decrements_inventory(self):
+        self.assertTrue(reserve_copy(self.book.id))
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 1)
+
+    def test_reserve_sold_out_book(self):
+        self.assertTrue(reserve_copy(self.book.id))
+        self.assertTrue(reserve_copy(self.book.id))
+        self.assertFalse(reserve_copy(self.book.id))
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+
+    def test_release_increments_inventory(self):
+        release_copy(self.book.id)
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 3)
+
+    def test_inventory_can_not_be_negative(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Book.objects.filter(pk=self.book.id).update(
+                inventory=F("inventory") - 3
+            )
@@ -1,18 +1,158 @@
+import csv
+
+from django.conf import settings
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets, mixins, status
-from rest_framework.exceptions import ValidationError
+from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
 
+from DRF_API_Library.caching import CachedResponseMixin
+from DRF_API_Library.exports import ExportMixin
+from DRF_API_Library.prefetch import SerializerPrefetchMixin
+from DRF_API_Library.replicas import ReplicaReadMixin
+from DRF_API_Library.values import ValuesListMixin
+from DRF_API_Library.versioning import ConditionalRequestMixin
+from book.autocomplete import title_index
+from book.bulk import import_books, read_rows
 from book.models import Book
+from book.parsers import CSVStreamParser, NDJSONStreamParser
 from book.permissions import IsAdminOrReadOnly
 from book.serializers import BookSerializer
+from book.services import filtering
+
+
+class BookPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
 
 
 class BookViewSet(
+    ReplicaReadMixin,
+    CachedResponseMixin,
+    ConditionalRequestMixin,
+    ValuesListMixin,
+    SerializerPrefetchMixin,
+    ExportMixin,
     viewsets.ModelViewSet
 ):
     """ViewSet for Model book"""
-    queryset = Book.objects.all()
+    queryset = Book.objects.defer("search_document").order_by("id")
     serializer_class = BookSerializer
     permission_classes = (IsAdminOrReadOnly,)
+    pagination_class = BookPagination
+    values_list_enabled = True
+    cache_models = {"list": (Book,), "retrieve": (Book,)}
+    conditional_updates = True
+    export_fields = {
+        "id": "id",
+        "title": "title",
+        "author": "author",
+        "cover": "cover",
+        "inventory": "inventory",
+        "daily_fee": "daily_fee",
+    }
+
+    def get_queryset(self):
+        if self.action in ("list", "export"):
+            return filtering(self.queryset, self.request)
+
+        return self.queryset
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="search",
+                type=str,
+                description=(
+                    "Full-text search over title and author, "
+                    "best matches first (ex. ?search=harry potter)"
+                )
+            ),
+            OpenApiParameter(
+                name="cover",
+                type=str,
+                enum=["HARD", "SOFT"],
+                description="Filter by cover (ex. ?cover=soft)"
+            ),
+            OpenApiParameter(
+                name="is_available",
+                type=bool,
+                description="Filter by books in stock (ex. ?is_available=true)"
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        """Get catalog page from the shared cache when it is up to date"""
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                type=str,
+                description="Beginning of a title or author word (ex. ?q=harr)"
+            ),
+            OpenApiParameter(
+                name="limit",
+                type=int,
+                description="Number of suggestions, 10 by default, max 50"
+            ),
+        ]
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="autocomplete",
+        url_name="autocomplete"
+    )
+    def autocomplete(self, request):
+        """Title suggestions served from the in-process prefix index"""
+        try:
+            limit = min(int(request.query_params.get("limit", 10)), 50)
+        except ValueError:
+            limit = 10
+
+        suggestions = title_index.search(
+            request.query_params.get("q", ""), max(limit, 1)
+        )
+
+        return Response(suggestions, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        request={
+            "text/csv": OpenApiTypes.STR,
+            "application/x-ndjson": OpenApiTypes.STR,
+        },
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk",
+        url_name="bulk",
+        parser_classes=(CSVStreamParser, NDJSONStreamParser),
+    )
+    def bulk(self, request):
+        """Import books from a CSV or NDJSON upload (only for admin).
+
+        Rows without id create books, rows with id update the given
+        fields and/or shift inventory by inventory_delta.
+        """
+        stream = request.data if hasattr(request.data, "read") else []
+
+        try:
+            report = import_books(
+                read_rows(stream, request.content_type.split(";")[0]),
+                settings.BOOK_IMPORT_CHUNK_SIZE,
+            )
+        except (ValueError, csv.Error) as error:
+            raise ParseError(str(error))
+
+        return Response(report, status=status.HTTP_200_OK)
 
     def perform_destroy(self, instance):
         """Protection of the book from destroy if it has min 1 borrowing"""
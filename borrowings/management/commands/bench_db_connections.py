@@ -0,0 +1,96 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import BaseCommand
+from django.db import connection
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from DRF_API_Library.db import CONNECTIONS_OPENED
+
+
+class Command(BaseCommand):
+    """Django command to benchmark database connection reuse.
+
+    Send GET /borrowings/ through the WSGI handler, which closes
+    obsolete connections at the end of every request, once with a new
+    connection per request and once with persistent connections, and
+    report requests per second and connections opened by each.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument(
+            "--max-age",
+            type=int,
+            default=60,
+            help="CONN_MAX_AGE of the persistent run",
+        )
+
+    def handle(self, *args, **options):
+        staff = get_user_model().objects.filter(is_staff=True).first()
+        if staff is None:
+            self.stderr.write("A staff user is required to list borrowings")
+            return
+
+        environ = APIRequestFactory().get(
+            "/api/library/borrowings/",
+            {"pagination": "cursor"},
+            HTTP_HOST="localhost",
+            # Not in INTERNAL_IPS, so the debug toolbar stays out
+            REMOTE_ADDR="10.0.0.1",
+            HTTP_AUTHORIZE=f"Bearer {AccessToken.for_user(staff)}",
+        ).environ
+        handler = WSGIHandler()
+        max_age = connection.settings_dict["CONN_MAX_AGE"]
+
+        self.stdout.write(
+            f"Connection setup: {self._connect_ms():.2f}ms median"
+        )
+        try:
+            for label, conn_max_age in (
+                ("per request", 0),
+                ("persistent", options["max_age"]),
+            ):
+                connection.settings_dict["CONN_MAX_AGE"] = conn_max_age
+                connection.close()
+
+                opened = CONNECTIONS_OPENED.labels("default")._value.get()
+                rate = self._rate(handler, environ, options["requests"])
+                opened = (
+                    CONNECTIONS_OPENED.labels("default")._value.get() - opened
+                )
+                self.stdout.write(
+                    f"{label}: {rate:.0f} requests/s, "
+                    f"{opened:.0f} connections opened"
+                )
+        finally:
+            connection.settings_dict["CONN_MAX_AGE"] = max_age
+
+    @staticmethod
+    def _connect_ms(repeat: int = 50) -> float:
+        timings = []
+
+        for _ in range(repeat):
+            connection.close()
+            started = time.perf_counter()
+            connection.ensure_connection()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        return sorted(timings)[len(timings) // 2]
+
+    @staticmethod
+    def _rate(handler, environ: dict, requests: int) -> float:
+        def start_response(status, headers):
+            if not status.startswith("200"):
+                raise RuntimeError(f"Request failed: {status}")
+
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = handler(dict(environ), start_response)
+            b"".join(response)
+            # Sends request_finished, which closes obsolete connections
+            response.close()
+
+        return requests / (time.perf_counter() - started)
@@ -0,0 +1,61 @@
+import resource
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, call_command
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from borrowings.views import BorrowingViewSet
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the streaming borrowings export.
+
+    Download GET /borrowings/export/ in process and report throughput
+    and how much the peak RSS grew while the rows were streamed.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Generate this many borrowings first (ex. 5000000)",
+        )
+        parser.add_argument(
+            "--output", choices=["csv", "ndjson"], default="csv"
+        )
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            call_command("seed_borrowings", rows=options["seed"])
+
+        staff = get_user_model().objects.filter(is_staff=True).first()
+        if staff is None:
+            self.stderr.write("A staff user is required to export")
+            return
+
+        request = APIRequestFactory().get(
+            "/", {"output": options["output"]}, HTTP_HOST="localhost"
+        )
+        force_authenticate(request, user=staff)
+        view = BorrowingViewSet.as_view({"get": "export"})
+
+        rss_before = self._peak_rss()
+        started = time.perf_counter()
+        response = view(request)
+        rows = size = 0
+        for chunk in response.streaming_content:
+            rows += chunk.count(b"\n")
+            size += len(chunk)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"rows={rows} size={size / 2 ** 20:.1f}MiB "
+            f"elapsed={elapsed:.1f}s rows/s={rows / elapsed:.0f} "
+            f"peak_rss_growth={self._peak_rss() - rss_before:.1f}MiB"
+        )
+
+    @staticmethod
+    def _peak_rss() -> float:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
@@ -0,0 +1,71 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.core.management import BaseCommand
+
+from DRF_API_Library.outbound import outbound
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Answer every POST with a small JSON body over HTTP/1.1"""
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes, don't let Nagle
+    # hold the body back on a reused connection
+    disable_nagle_algorithm = True
+
+    def do_POST(self):  # noqa: N802
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    """Django command to benchmark outbound notification requests.
+
+    Post to a local keep-alive HTTP server with a bare requests.post
+    per message, as the notification tasks did, and with the pooled
+    outbound client that reuses connections.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/sendMessage"
+        client = outbound("telegram")
+
+        try:
+            for name, post in (
+                ("requests.post", lambda: requests.post(url, timeout=5)),
+                ("outbound", lambda: client.post(url)),
+            ):
+                self._run(name, post, options["messages"])
+        finally:
+            server.shutdown()
+
+    def _run(self, name, post, messages) -> None:
+        timings = []
+        started = time.perf_counter()
+        for _ in range(messages):
+            sent = time.perf_counter()
+            post().raise_for_status()
+            timings.append((time.perf_counter() - sent) * 1000)
+        elapsed = time.perf_counter() - started
+
+        timings.sort()
+        self.stdout.write(
+            f"{name}: messages={messages} rate={messages / elapsed:.0f}/s "
+            f"p50={timings[len(timings) // 2]:.2f}ms "
+            f"p99={timings[int(len(timings) * 0.99)]:.2f}ms"
+        )
@@ -0,0 +1,70 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, call_command
+from django.utils import timezone
+
+from borrowings.models import Borrowing
+from borrowings.services import iter_overdue_borrowings
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the overdue borrowings scan"""
+
+    help = (  # noqa: VNE003
+        "Time the chunked overdue scan used by "
+        "check_borrowings_for_overdue against the previous full-table "
+        "loop. Nothing is enqueued."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Generate this many borrowings before scanning",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.OVERDUE_SCAN_CHUNK_SIZE,
+        )
+        parser.add_argument(
+            "--legacy",
+            action="store_true",
+            help="Also time the full-table loop with a query per row",
+        )
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            call_command("seed_borrowings", rows=options["seed"])
+
+        today = timezone.now().date()
+        total = Borrowing.objects.count()
+        self.stdout.write(f"Borrowings in table: {total}")
+
+        started = time.perf_counter()
+        overdue = chunks = 0
+        for chunk in iter_overdue_borrowings(today, options["chunk_size"]):
+            overdue += len(chunk)
+            chunks += 1
+        self._report("chunked", overdue, chunks, started)
+
+        if options["legacy"]:
+            started = time.perf_counter()
+            overdue = 0
+            for borrowing in Borrowing.objects.all():
+                if (
+                    borrowing.actual_return_date is None
+                    and borrowing.expected_return_date < today
+                    and borrowing.user.email
+                ):
+                    overdue += 1
+            self._report("legacy", overdue, overdue, started)
+
+    def _report(self, name, overdue, tasks, started) -> None:
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{name}: overdue={overdue} tasks={tasks} "
+            f"elapsed={elapsed:.3f}s"
+        )
@@ -0,0 +1,115 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.core.management import BaseCommand, call_command
+
+from DRF_API_Library.celery import app
+from borrowings.tasks import report_overdue_sweep, start_overdue_sweep
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the sharded overdue sweep"""
+
+    help = (  # noqa: VNE003
+        "Run the overdue sweep as a dry run against 1..N local Celery "
+        "worker processes using a filesystem broker and report how the "
+        "wall time scales."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            nargs="+",
+            default=[1, 2, 4],
+            help="Worker process counts to measure",
+        )
+        parser.add_argument(
+            "--shards-per-worker",
+            type=int,
+            default=2,
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Generate this many borrowings before sweeping",
+        )
+        parser.add_argument("--timeout", type=int, default=600)
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            call_command("seed_borrowings", rows=options["seed"])
+
+        baseline = None
+        for workers in options["workers"]:
+            elapsed, overdue = self._sweep(workers, options)
+            baseline = baseline or elapsed
+            self.stdout.write(
+                f"workers={workers} overdue={overdue} "
+                f"elapsed={elapsed:.3f}s speedup={baseline / elapsed:.2f}x"
+            )
+
+    def _sweep(self, workers: int, options) -> tuple[float, int]:
+        with tempfile.TemporaryDirectory() as directory:
+            for folder in ("queue", "results"):
+                os.makedirs(os.path.join(directory, folder))
+
+            self._use_filesystem_broker(directory)
+            worker = subprocess.Popen(
+                [
+                    sys.executable, "-m", "celery",
+                    "-A", "DRF_API_Library", "worker",
+                    "--concurrency", str(workers),
+                    "--without-gossip", "--without-mingle",
+                    "--without-heartbeat", "--loglevel", "WARNING",
+                ],
+                env={**os.environ, "CELERY_FILESYSTEM_DIR": directory},
+            )
+
+            try:
+                # Wait until the worker consumes tasks before timing
+                report_overdue_sweep.delay([], True).get(
+                    timeout=options["timeout"], interval=0.05
+                )
+
+                started = time.perf_counter()
+                result = start_overdue_sweep(
+                    chunk_size=options["chunk_size"],
+                    shards=workers * options["shards_per_worker"],
+                    dry_run=True,
+                )
+                overdue = result.get(
+                    timeout=options["timeout"], interval=0.05
+                )
+                elapsed = time.perf_counter() - started
+            finally:
+                worker.terminate()
+                worker.wait()
+
+        return elapsed, overdue
+
+    @staticmethod
+    def _use_filesystem_broker(directory: str) -> None:
+        # Celery reads broker and backend URLs from the environment
+        # before its configuration, which is already loaded here
+        os.environ["CELERY_BROKER_URL"] = "filesystem://"
+        os.environ["CELERY_RESULT_BACKEND"] = (
+            f"file://{os.path.join(directory, 'results')}"
+        )
+        queue = os.path.join(directory, "queue")
+        app.conf.broker_transport_options = {
+            "data_folder_in": queue,
+            "data_folder_out": queue,
+            "control_folder": os.path.join(directory, "control"),
+        }
+
+        # Drop connections and the result backend cached for the
+        # previous broker, the same way Celery does after a fork
+        app._after_fork()
+        app._backend_cache = None
+        app._local.__dict__.pop("backend", None)
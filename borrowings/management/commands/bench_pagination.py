@@ -0,0 +1,88 @@
+import base64
+import time
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, call_command
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from borrowings.models import Borrowing
+from borrowings.views import BorrowingViewSet
+
+
+def cursor_at(position: int) -> str:
+    """Encode a DRF cursor pointing right after the given id"""
+    querystring = urlencode({"p": position})
+
+    return base64.b64encode(querystring.encode("ascii")).decode("ascii")
+
+
+class Command(BaseCommand):
+    """Django command to benchmark borrowing list pagination.
+
+    Time GET /borrowings/ at increasing page depths with page number
+    pagination and with cursor pagination.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Generate this many borrowings first (ex. 10000000)",
+        )
+        parser.add_argument(
+            "--pages",
+            type=int,
+            nargs="+",
+            default=[1, 100, 10_000, 100_000],
+            help="Page numbers to request",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            call_command("seed_borrowings", rows=options["seed"])
+
+        self.staff = get_user_model().objects.filter(is_staff=True).first()
+        if self.staff is None:
+            self.stderr.write("A staff user is required to list borrowings")
+            return
+
+        self.view = BorrowingViewSet.as_view({"get": "list"})
+        page_size = BorrowingViewSet.pagination_class.page_size
+        ids = Borrowing.objects.order_by("-id").values_list("id", flat=True)
+
+        for page in options["pages"]:
+            depth = (page - 1) * page_size
+            if depth and not ids[depth - 1:depth]:
+                self.stdout.write(f"page={page}: table is too small")
+                continue
+
+            cursor_params = {"pagination": "cursor"}
+            if depth:
+                cursor_params["cursor"] = cursor_at(ids[depth - 1])
+
+            offset_ms = self._time({"page": page}, options["repeat"])
+            cursor_ms = self._time(cursor_params, options["repeat"])
+            self.stdout.write(
+                f"page={page} page_number={offset_ms:.1f}ms "
+                f"cursor={cursor_ms:.1f}ms"
+            )
+
+    def _time(self, params: dict, repeat: int) -> float:
+        """Return the median response time of the list view in ms"""
+        timings = []
+
+        for _ in range(repeat):
+            request = APIRequestFactory().get(
+                "/", params, HTTP_HOST="localhost"
+            )
+            force_authenticate(request, user=self.staff)
+
+            started = time.perf_counter()
+            response = self.view(request)
+            response.render()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        return sorted(timings)[len(timings) // 2]
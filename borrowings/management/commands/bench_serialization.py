@@ -0,0 +1,88 @@
+import time
+
+from django.core.management import BaseCommand, call_command
+from rest_framework.renderers import JSONRenderer
+
+from DRF_API_Library.prefetch import plan_for
+from DRF_API_Library.values import values_plan
+from book.models import Book
+from book.serializers import BookSerializer
+from borrowings.models import Borrowing
+from borrowings.serializers import BorrowingSerializer
+from payment.models import Payment
+from payment.serializers import PaymentSerializer
+
+
+class Command(BaseCommand):
+    """Django command to benchmark list serialization.
+
+    Fetch and render pages of borrowings, books and payments to JSON
+    with the model serializers and with the values() path, and report
+    rows per second of each.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Generate this many borrowings first (ex. 100000)",
+        )
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=100,
+            help="Rows per page, the maximal page size of the API",
+        )
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            call_command("seed_borrowings", rows=options["seed"])
+
+        for serializer_class, queryset in (
+            (BorrowingSerializer, Borrowing.objects.order_by("-id")),
+            (BookSerializer, Book.objects.order_by("id")),
+            (PaymentSerializer, Payment.objects.order_by("-id")),
+        ):
+            page = queryset[:options["rows"]]
+            if not page.exists():
+                self.stdout.write(f"{serializer_class.__name__}: no rows")
+                continue
+
+            serializer_json, serializer_rate = self._time(
+                lambda: serializer_class(
+                    plan_for(serializer_class).apply(page), many=True
+                ).data,
+                options["repeat"],
+            )
+            plan = values_plan(serializer_class)
+            values_json, values_rate = self._time(
+                lambda: plan.render(plan.values(page)),
+                options["repeat"],
+            )
+
+            if serializer_json != values_json:
+                self.stderr.write(f"{serializer_class.__name__}: JSON differs")
+
+            self.stdout.write(
+                f"{serializer_class.__name__}: "
+                f"serializer={serializer_rate:.0f} rows/s "
+                f"values={values_rate:.0f} rows/s "
+                f"({values_rate / serializer_rate:.1f}x)"
+            )
+
+    @staticmethod
+    def _time(serialize, repeat: int) -> tuple[bytes, float]:
+        """Return the JSON of a page and the median rows per second"""
+        timings = []
+
+        for _ in range(repeat):
+            started = time.perf_counter()
+            data = serialize()
+            content = JSONRenderer().render(data)
+            timings.append(time.perf_counter() - started)
+
+        median = sorted(timings)[len(timings) // 2]
+
+        return content, len(data) / median if median else 0
@@ -0,0 +1,146 @@
+import datetime
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+
+from book.models import Book
+from borrowings.models import Borrowing
+
+
+SEED_EMAIL = "bench-user-{}@library.local"
+
+# Rows are generated inside Postgres, so millions of borrowings
+# never travel through Python
+SEED_SQL = """
+    INSERT INTO {table} (
+        borrow_date, expected_return_date, actual_return_date,
+        book_id, user_id, overdue_level, version
+    )
+    SELECT
+        current_date - (g %% 730),
+        current_date - (g %% 730) + 1 + (g %% 30),
+        CASE
+            WHEN random() < %(active_ratio)s THEN NULL
+            ELSE current_date - (g %% 730) + (g %% 40)
+        END,
+        (%(book_ids)s::bigint[])[1 + g %% %(books)s],
+        (%(user_ids)s::bigint[])[1 + g %% %(users)s],
+        0,
+        1
+    FROM generate_series(1, %(rows)s) AS g
+"""
+
+
+class Command(BaseCommand):
+    """Django command to generate a large borrowings table"""
+
+    help = (  # noqa: VNE003
+        "Generate synthetic users, books and borrowings for benchmarks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--books", type=int, default=100)
+        parser.add_argument(
+            "--active-ratio",
+            type=float,
+            default=0.1,
+            help="Share of borrowings that are not returned yet",
+        )
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        user_ids = self._seed_users(options["users"])
+        book_ids = self._seed_books(options["books"])
+
+        self.stdout.write(f"Generating {options['rows']} borrowings...")
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                self._seed_with_sql(user_ids, book_ids, options)
+            else:
+                self._seed_with_orm(user_ids, book_ids, options)
+
+        self.stdout.write(self.style.SUCCESS("Borrowings generated!"))
+
+    @staticmethod
+    def _seed_users(count: int) -> list[int]:
+        user_model = get_user_model()
+        emails = [SEED_EMAIL.format(number) for number in range(count)]
+        existing = set(
+            user_model.objects.filter(
+                email__in=emails
+            ).values_list("email", flat=True)
+        )
+        user_model.objects.bulk_create(
+            user_model(email=email, password="!")
+            for email in emails
+            if email not in existing
+        )
+
+        return list(
+            user_model.objects.filter(
+                email__in=emails
+            ).values_list("id", flat=True)
+        )
+
+    @staticmethod
+    def _seed_books(count: int) -> list[int]:
+        books = Book.objects.bulk_create(
+            Book(
+                title=f"Benchmark book {number}",
+                inventory=1_000_000,
+                daily_fee=1,
+            )
+            for number in range(count)
+        )
+
+        return [book.id for book in books]
+
+    @staticmethod
+    def _seed_with_sql(user_ids, book_ids, options) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                SEED_SQL.format(table=Borrowing._meta.db_table),
+                {
+                    "active_ratio": options["active_ratio"],
+                    "book_ids": book_ids,
+                    "books": len(book_ids),
+                    "user_ids": user_ids,
+                    "users": len(user_ids),
+                    "rows": options["rows"],
+                },
+            )
+            cursor.execute(f"ANALYZE {Borrowing._meta.db_table}")
+
+    @staticmethod
+    def _seed_with_orm(user_ids, book_ids, options) -> None:
+        today = datetime.date.today()
+        batch = []
+
+        for number in range(options["rows"]):
+            borrow_date = today - datetime.timedelta(days=number % 730)
+            returned = random.random() >= options["active_ratio"]
+            batch.append(
+                Borrowing(
+                    borrow_date=borrow_date,
+                    expected_return_date=(
+                        borrow_date
+                        + datetime.timedelta(days=1 + number % 30)
+                    ),
+                    actual_return_date=(
+                        borrow_date + datetime.timedelta(days=number % 40)
+                        if returned else None
+                    ),
+                    book_id=book_ids[number % len(book_ids)],
+                    user_id=user_ids[number % len(user_ids)],
+                )
+            )
+
+            if len(batch) == options["batch_size"]:
+                Borrowing.objects.bulk_create(batch)
+                batch = []
+
+        Borrowing.objects.bulk_create(batch)
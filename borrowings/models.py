@@ -1,10 +1,11 @@
 from django.db import models
 from django.conf import settings
 
+from DRF_API_Library.versioning import VersionedModel
 from book.models import Book
 
 
-class Borrowing(models.Model):
+class Borrowing(VersionedModel):
     """Borrowing model."""
 
     borrow_date = models.DateField(auto_now_add=True)
@@ -18,5 +19,29 @@ class Borrowing(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.PROTECT,
-        related_name="borrowings"
+        related_name="borrowings",
+        # Served by borrowing_user_return_idx, which starts with user
+        db_index=False,
     )
+    # Overdue notification state, see OVERDUE_ESCALATION_DAYS
+    first_overdue_notice = models.DateField(null=True, blank=True)
+    last_overdue_notice = models.DateField(null=True, blank=True)
+    overdue_level = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "actual_return_date"],
+                name="borrowing_user_return_idx",
+            ),
+            models.Index(
+                fields=["expected_return_date"],
+                condition=models.Q(actual_return_date__isnull=True),
+                name="borrowing_overdue_idx",
+            ),
+            models.Index(
+                fields=["overdue_level", "expected_return_date"],
+                condition=models.Q(actual_return_date__isnull=True),
+                name="borrowing_overdue_level_idx",
+            ),
+        ]
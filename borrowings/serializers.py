@@ -25,6 +25,8 @@ class BorrowingSerializer(serializers.ModelSerializer):
             "book",
             "user_email",
         )
+        # Book is rendered with its __str__, the title
+        values_sources = {"book": "book__title"}
 
 
 class BorrowingCreateSerializer(serializers.ModelSerializer):
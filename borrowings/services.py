@@ -1,12 +1,28 @@
 from collections import OrderedDict
 import datetime
+from typing import Iterator
+
+from django.conf import settings
 from django.utils import timezone
 
+from django.db.models import (
+    Case,
+    Max,
+    Min,
+    PositiveSmallIntegerField,
+    Q,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
 from django.db.models.query import QuerySet
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
 from rest_framework.request import Request
 
+from DRF_API_Library.versioning import next_version
+from borrowings.models import Borrowing
+
 
 def filtering(
         queryset: QuerySet, request: Request
@@ -42,12 +58,120 @@ def borrowing_create_validation(attrs: OrderedDict) -> OrderedDict:
             code=status.HTTP_403_FORBIDDEN
         )
 
-    book_inventory = attrs["book"].inventory
+    return attrs
 
-    if book_inventory <= 0:
-        raise ValidationError(
-            "Sorry but all such books were taken away",
-            code=status.HTTP_403_FORBIDDEN
+
+def overdue_borrowings(today: datetime.date) -> QuerySet:
+    return Borrowing.objects.filter(
+        actual_return_date__isnull=True,
+        expected_return_date__lt=today,
+    ).order_by()
+
+
+def overdue_level(today: datetime.date) -> Case:
+    """Escalation level a borrowing has reached on `today`,
+    0 if it is not overdue"""
+    thresholds = list(enumerate(settings.OVERDUE_ESCALATION_DAYS, 1))
+
+    return Case(
+        *(
+            When(
+                expected_return_date__lte=(
+                    today - datetime.timedelta(days=days)
+                ),
+                then=Value(level),
+            )
+            for level, days in reversed(thresholds)
+        ),
+        default=Value(0),
+        output_field=PositiveSmallIntegerField(),
+    )
+
+
+def notification_due_borrowings(today: datetime.date) -> QuerySet:
+    """Overdue borrowings that reached a level they were not notified of.
+
+    A borrowing of level k is due once it reaches the threshold of
+    level k + 1, so each level is one range of the
+    borrowing_overdue_level_idx index.
+    """
+    due = Q()
+    for level, days in enumerate(settings.OVERDUE_ESCALATION_DAYS):
+        due |= Q(
+            overdue_level=level,
+            expected_return_date__lte=today - datetime.timedelta(days=days),
         )
 
-    return attrs
+    return overdue_borrowings(today).filter(due)
+
+
+def mark_overdue_notified(ids: list[int], today: datetime.date) -> int:
+    """Record that borrowings were notified at their current level"""
+    return Borrowing.objects.filter(id__in=ids).update(
+        overdue_level=overdue_level(today),
+        first_overdue_notice=Coalesce("first_overdue_notice", Value(today)),
+        last_overdue_notice=today,
+        version=next_version(),
+    )
+
+
+def overdue_id_shards(
+        today: datetime.date, shards: int
+) -> list[tuple[int, int]]:
+    """Split the id space of borrowings due an overdue notification
+    into at most `shards` inclusive (first id, last id) ranges"""
+    bounds = notification_due_borrowings(today).aggregate(
+        first_id=Min("id"), last_id=Max("id")
+    )
+    first_id, last_id = bounds["first_id"], bounds["last_id"]
+
+    if first_id is None:
+        return []
+
+    span = last_id - first_id + 1
+    shards = max(1, min(shards, span))
+    step = -(-span // shards)
+
+    return [
+        (start, min(start + step - 1, last_id))
+        for start in range(first_id, last_id + 1, step)
+    ]
+
+
+def iter_overdue_borrowings(
+        today: datetime.date,
+        chunk_size: int,
+        id_range: tuple[int, int] = None,
+) -> Iterator[list[tuple]]:
+    """Yield chunks of (id, user email, borrow date, expected return date,
+    notified level, reached level) for overdue borrowings due a
+    notification, optionally limited to an inclusive id range.
+
+    Rows are streamed with a server-side cursor, so memory stays flat
+    regardless of the table size.
+    """
+    queryset = notification_due_borrowings(today)
+
+    if id_range:
+        queryset = queryset.filter(id__range=id_range)
+
+    rows = queryset.annotate(
+        reached_level=overdue_level(today)
+    ).values_list(
+        "id",
+        "user__email",
+        "borrow_date",
+        "expected_return_date",
+        "overdue_level",
+        "reached_level",
+    ).iterator(chunk_size=chunk_size)
+
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
@@ -1,8 +1,10 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from DRF_API_Library.caching import invalidate_responses
 from borrowings.tasks import send_borrowing_created_notification
 from borrowings.models import Borrowing
+from notification.outbox import enqueue
 
 
 @receiver(
@@ -11,15 +13,23 @@ from borrowings.models import Borrowing
     dispatch_uid="post_save_signal_processed"
 )
 def send_borrowing_created_message(sender, instance, created, **kwargs):
-    """Handle creation of Borrowing"""
-    try:
-        if created:
-            send_borrowing_created_notification.delay(
-                instance.id,
-                instance.user.email,
-                instance.borrow_date,
-                instance.expected_return_date,
-            )
-    except Exception as e:
-        print("Error sending created borrowing notification!")
-        print(e)
+    """Write the notification of a created Borrowing to the outbox"""
+    if created:
+        enqueue(
+            f"borrowing-created-{instance.id}",
+            send_borrowing_created_notification,
+            instance.id,
+            instance.user.email,
+            instance.borrow_date,
+            instance.expected_return_date,
+        )
+
+
+@receiver(
+    [post_save, post_delete],
+    sender=Borrowing,
+    dispatch_uid="borrowing_response_cache_invalidation"
+)
+def invalidate_response_cache(sender, instance, **kwargs):
+    """Handle changes of Borrowing"""
+    invalidate_responses(Borrowing)
@@ -1,18 +1,18 @@
-import requests
-
-from datetime import timedelta
-
-from celery import shared_task
+from celery import chord, shared_task
+from celery.result import AsyncResult
+from django.db import transaction
+from django.utils import timezone
 
 from DRF_API_Library import settings
-from borrowings.models import Borrowing
-
-TOKEN = settings.TOKEN
-CHAT_ID = settings.CHAT_ID
-
-# add message at the end of url
-URL = (f"https://api.telegram.org/bot{TOKEN}"
-       f"/sendMessage?chat_id={CHAT_ID}&text=")
+from borrowings.services import (
+    iter_overdue_borrowings,
+    mark_overdue_notified,
+    overdue_borrowings,
+    overdue_id_shards,
+)
+from notification.dispatcher import notify
+from notification.outbox import claim, enqueue
+from notification.tasks import send_notification
 
 
 @shared_task()
@@ -21,13 +21,16 @@ def send_borrowing_created_notification(
         user_email: str,
         borrow_date,
         expected_return_date,
+        outbox_key: str = None,
 ) -> None:
-    """Use telegram API to send notification"""
+    """Queue notification for the library chat"""
     message = (f"Borrowing {borrow_id}"
                f" was created by {user_email}.\n"
                f"Borrow date: {borrow_date}.\n"
                f"Expected return date: {expected_return_date}")
-    requests.post(f"{URL}{message}")
+    with claim(outbox_key) as claimed:
+        if claimed:
+            notify(message)
 
 
 @shared_task()
@@ -36,31 +39,120 @@ def send_borrowing_overdue_notification(
         user_email: str,
         borrow_date,
         expected_return_date,
+        level: int = 1,
 ) -> None:
-    """Use telegram API to send notification about borrowing overdue"""
+    """Queue notification about borrowing overdue"""
     message = (f"!!!Borrowing {borrow_id}"
                f" is overdue by {user_email}!!!\n"
                f"Borrow date: {borrow_date}.\n"
                f"Expected return date: {expected_return_date}")
-    requests.post(f"{URL}{message}")
+    if level > 1:
+        message += f"\nStill not returned, reminder {level - 1}."
+    notify(message)
 
 
 @shared_task()
-def check_borrowings_for_overdue() -> None:
+def send_borrowing_overdue_notifications(
+        borrowings: list, outbox_key: str = None
+) -> None:
+    """Send notifications about a chunk of overdue borrowings"""
+    with claim(outbox_key) as claimed:
+        if not claimed:
+            return
+
+        for borrowing in borrowings:
+            send_borrowing_overdue_notification(*borrowing)
+
+
+@shared_task()
+def sweep_overdue_shard(
+        first_id: int,
+        last_id: int,
+        today,
+        chunk_size: int,
+        dry_run: bool = False,
+) -> list[int]:
+    """Notify about borrowings within one id range that became overdue
+    or reached the next escalation level since they were notified.
+
+    The notification state of each chunk is updated in the transaction
+    that writes its notification to the outbox, so a borrowing is
+    notified once per level. Return counts of newly overdue and
+    escalated borrowings.
+    """
+    new = escalated = 0
+
+    for chunk in iter_overdue_borrowings(
+            today, chunk_size, (first_id, last_id)
+    ):
+        if not dry_run:
+            with transaction.atomic():
+                mark_overdue_notified([row[0] for row in chunk], today)
+                enqueue(
+                    f"borrowing-overdue-{today}-{chunk[0][0]}",
+                    send_borrowing_overdue_notifications,
+                    [row[:4] + row[5:] for row in chunk],
+                )
+
+        chunk_new = sum(1 for row in chunk if row[4] == 0)
+        new += chunk_new
+        escalated += len(chunk) - chunk_new
+
+    return [new, escalated]
+
+
+@shared_task()
+def report_overdue_sweep(
+        shard_counts: list, dry_run: bool = False, today=None
+) -> int:
+    """Aggregate shard results into the daily overdue digest
+    and return how many borrowings were notified"""
+    today = today or timezone.now().date()
+    new = sum(counts[0] for counts in shard_counts)
+    escalated = sum(counts[1] for counts in shard_counts)
+    overdue = overdue_borrowings(today).count()
+
+    if overdue:
+        message = (f"Overdue digest for {today}: "
+                   f"{overdue} borrowings overdue, "
+                   f"{new} newly overdue, {escalated} escalated.")
+    else:
+        message = "No borrowings overdue today!"
+
+    if not dry_run:
+        # A repeated sweep on the same day sends no second digest
+        enqueue(f"overdue-digest-{today}", send_notification, message)
+
+    return new + escalated
+
+
+def start_overdue_sweep(
+        chunk_size: int = None,
+        shards: int = None,
+        dry_run: bool = False,
+) -> AsyncResult:
+    """Fan the overdue sweep out as a chord of id range shards"""
+    today = timezone.now().date()
+    chunk_size = chunk_size or settings.OVERDUE_SCAN_CHUNK_SIZE
+    id_ranges = overdue_id_shards(
+        today, shards or settings.OVERDUE_SWEEP_SHARDS
+    )
+
+    if not id_ranges:
+        return report_overdue_sweep.delay([], dry_run, today)
+
+    return chord(
+        sweep_overdue_shard.s(
+            first_id, last_id, today, chunk_size, dry_run
+        )
+        for first_id, last_id in id_ranges
+    )(report_overdue_sweep.s(dry_run, today))
+
+
+@shared_task()
+def check_borrowings_for_overdue(
+        chunk_size: int = None, shards: int = None
+) -> None:
     """Check borrowings for overdue and
      send notification about borrowings status"""
-    overdue_missing = True
-    for borrowing in Borrowing.objects.all():
-        if (borrowing.expected_return_date
-                - borrowing.borrow_date <= timedelta(days=1)):
-            send_borrowing_overdue_notification.delay(
-                borrowing.id,
-                borrowing.user.email,
-                borrowing.borrow_date,
-                borrowing.expected_return_date
-            )
-            overdue_missing = False
-
-    if overdue_missing:
-        message = "No borrowings overdue today!"
-        requests.post(f"{URL}{message}")
+    start_overdue_sweep(chunk_size, shards)
@@ -1,18 +1,22 @@
 import datetime
+import json
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
-from django.db.models import signals
 
 from book.models import Book
 from borrowings.models import Borrowing
 from borrowings.serializers import BorrowingSerializer
+from borrowings.tests.utils import created_message_disconnected
+from payment.models import Payment
 
 BORROWING_URL = reverse("borrowings:borrowing-list")
+BORROWING_EXPORT_URL = reverse("borrowings:borrowing-export")
 
 NOW = timezone.now().date()
 NOW_PLUS_ONE_DAY = NOW + datetime.timedelta(days=1)
@@ -53,7 +57,7 @@ class UnauthenticatedBorrowingApiTests(TestCase):
 class AuthenticatedBorrowingApiTests(TestCase):
 
     def setUp(self):
-        signals.post_save.disconnect(sender=Borrowing, dispatch_uid="post_save_signal_processed")
+        self.enterContext(created_message_disconnected())
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             "test@test.com",
@@ -74,6 +78,26 @@ class AuthenticatedBorrowingApiTests(TestCase):
 
         self.assertEqual(res.data["results"], serializer.data)
 
+    def test_list_borrowing_with_cursor_pagination(self):
+        borrowings = [sample_borrowing(user=self.user) for _ in range(12)]
+
+        res = self.client.get(BORROWING_URL, {"pagination": "cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", res.data)
+        self.assertEqual(
+            [borrowing["id"] for borrowing in res.data["results"]],
+            [borrowing.id for borrowing in borrowings[:1:-1]],
+        )
+
+        res = self.client.get(res.data["next"])
+
+        self.assertEqual(
+            [borrowing["id"] for borrowing in res.data["results"]],
+            [borrowing.id for borrowing in borrowings[1::-1]],
+        )
+        self.assertIsNone(res.data["next"])
+
     def test_filter_borrowings_by_is_active(self):
         active_borrowing = sample_borrowing(user=self.user)
 
@@ -92,6 +116,7 @@ class AuthenticatedBorrowingApiTests(TestCase):
         self.assertIn(active_serializer.data, res.data["results"])
         self.assertNotIn(inactive_serializer.data, res.data["results"])
 
+    @override_settings(STRIPE_BACKEND="local")
     def test_borrowing_create(self):
         book = Book.objects.create(
             title="testBook",
@@ -108,6 +133,56 @@ class AuthenticatedBorrowingApiTests(TestCase):
         res = self.client.post(BORROWING_URL, payload)
 
         self.assertEqual(res.status_code, status.HTTP_302_FOUND)
+        payment = Payment.objects.get()
+        self.assertEqual(res.url, payment.session_url)
+
+    @override_settings(STRIPE_BACKEND="local", PAYMENT_CHECKOUT_MODE="async")
+    @patch("borrowings.views.create_checkout_sessions.delay")
+    def test_borrowing_create_with_async_checkout(self, delay):
+        book = Book.objects.create(
+            title="testBook",
+            author="testAuthor",
+            inventory=5,
+            daily_fee=2
+        )
+
+        payload = {
+            "expected_return_date": NOW_PLUS_ONE_DAY,
+            "book": book.id,
+        }
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(BORROWING_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        payment = Payment.objects.get()
+        self.assertIsNone(payment.session_id)
+        self.assertEqual(res.data["payment_id"], payment.id)
+        self.assertEqual(res["Location"], res.data["status_url"])
+        self.assertTrue(
+            res.data["status_url"].endswith(f"/payments/{payment.id}/")
+        )
+        delay.assert_called_once_with()
+
+    def test_can_not_borrow_sold_out_book(self):
+        book = Book.objects.create(
+            title="testBook",
+            author="testAuthor",
+            inventory=0,
+            daily_fee=2
+        )
+
+        payload = {
+            "expected_return_date": NOW_PLUS_ONE_DAY,
+            "book": book.id,
+        }
+
+        res = self.client.post(BORROWING_URL, payload)
+
+        book.refresh_from_db()
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(book.inventory, 0)
+        self.assertFalse(Borrowing.objects.filter(book=book).exists())
 
     def test_can_not_borrow_book_less_than_one_day(self):
         book = Book.objects.create(
@@ -156,6 +231,36 @@ class AdminBorrowingApiTests(TestCase):
             borrowing_1_serializer.data, res.data["results"]
         )
 
+    def test_export_borrowings_ndjson(self):
+        user2 = get_user_model().objects.create_user(
+            "user2@email.com", "testpass_user2"
+        )
+        sample_borrowing(user=self.user)
+        borrowing = sample_borrowing(user=user2)
+
+        res = self.client.get(
+            BORROWING_EXPORT_URL, {"output": "ndjson", "user_id": user2.id}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        rows = [
+            json.loads(line)
+            for line in b"".join(res.streaming_content).splitlines()
+        ]
+        self.assertEqual(
+            rows,
+            [{
+                "id": borrowing.id,
+                "borrow_date": str(borrowing.borrow_date),
+                "expected_return_date": str(NOW),
+                "actual_return_date": None,
+                "book_id": borrowing.book_id,
+                "book_title": "testBook",
+                "user_id": user2.id,
+                "user_email": "user2@email.com",
+            }]
+        )
+
     def test_return_book_custom_endpoint(self):
         borrowing = sample_borrowing(user=self.user)
 
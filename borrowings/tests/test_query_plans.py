@@ -0,0 +1,104 @@
+import datetime
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from DRF_API_Library.tests.plans import scanned_indexes, seq_scanned_tables
+from book.models import Book
+from borrowings.models import Borrowing
+from borrowings.services import (
+    filtering,
+    notification_due_borrowings,
+    overdue_borrowings,
+)
+from borrowings.tests.utils import created_message_disconnected
+from borrowings.views import BorrowingViewSet
+
+TODAY = datetime.date.today()
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql", "Query plans are Postgres specific"
+)
+class BorrowingQueryPlanTests(TestCase):
+    """Hot borrowing queries must be served by an index.
+
+    Sequential scans are disabled for the planner, so a query
+    only falls back to one when no index can serve it.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.enterClassContext(created_message_disconnected())
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(email=f"user{number}@test.com")
+            for number in range(50)
+        )
+        book = Book.objects.create(
+            title="testBook", inventory=5, daily_fee=2
+        )
+        Borrowing.objects.bulk_create(
+            Borrowing(
+                expected_return_date=TODAY + datetime.timedelta(
+                    days=number % 20 - 10
+                ),
+                actual_return_date=None if number % 5 else TODAY,
+                book=book,
+                user=users[number % len(users)],
+            )
+            for number in range(2000)
+        )
+        cls.user = users[0]
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Borrowing._meta.db_table}")
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def list_queryset(self, **params):
+        request = Request(APIRequestFactory().get("/", params))
+        request.user = self.user
+
+        return filtering(BorrowingViewSet.queryset, request)
+
+    def assert_index_scan(self, queryset, *indexes):
+        """Assert the queryset reads one of the indexes, never the
+        whole table"""
+        self.assertNotIn(
+            Borrowing._meta.db_table, seq_scanned_tables(queryset)
+        )
+        self.assertTrue(scanned_indexes(queryset) & set(indexes))
+
+    def test_user_borrowings(self):
+        self.assert_index_scan(
+            self.list_queryset(), "borrowing_user_return_idx"
+        )
+
+    def test_user_active_borrowings(self):
+        self.assert_index_scan(
+            self.list_queryset(is_active="true"), "borrowing_user_return_idx"
+        )
+
+    def test_user_returned_borrowings(self):
+        self.assert_index_scan(
+            self.list_queryset(is_active="false"),
+            "borrowing_user_return_idx",
+        )
+
+    def test_overdue_borrowings(self):
+        self.assert_index_scan(
+            overdue_borrowings(TODAY), "borrowing_overdue_idx"
+        )
+
+    def test_notification_due_borrowings(self):
+        self.assert_index_scan(
+            notification_due_borrowings(TODAY),
+            "borrowing_overdue_idx",
+            "borrowing_overdue_level_idx",
+        )
@@ -0,0 +1,180 @@
+import datetime
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from DRF_API_Library.celery import app
+from book.models import Book
+from borrowings.models import Borrowing
+from borrowings.services import overdue_id_shards
+from borrowings.tasks import (
+    check_borrowings_for_overdue,
+    send_borrowing_overdue_notification,
+    send_borrowing_overdue_notifications,
+)
+from borrowings.tests.utils import created_message_disconnected
+from notification.models import OutboxMessage
+from notification.tasks import send_notification
+
+TODAY = timezone.now().date()
+
+
+class CheckBorrowingsForOverdueTests(TestCase):
+
+    def setUp(self):
+        self.enterContext(created_message_disconnected())
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.book = Book.objects.create(
+            title="testBook", inventory=5, daily_fee=2
+        )
+        app.conf.task_always_eager = True
+
+    def tearDown(self):
+        app.conf.task_always_eager = False
+
+    def sample_borrowing(self, days_overdue, actual_return_date=None):
+        return Borrowing.objects.create(
+            expected_return_date=(
+                TODAY - datetime.timedelta(days=days_overdue)
+            ),
+            actual_return_date=actual_return_date,
+            book=self.book,
+            user=self.user,
+        )
+
+    def overdue_messages(self) -> list:
+        return list(
+            OutboxMessage.objects.filter(
+                task=send_borrowing_overdue_notifications.name
+            ).order_by("id").values_list("args", flat=True)
+        )
+
+    def digest(self) -> str:
+        return OutboxMessage.objects.get(
+            task=send_notification.name
+        ).args[0]
+
+    def test_only_active_overdue_borrowings_are_notified(self):
+        overdue = [self.sample_borrowing(days) for days in (1, 2, 3)]
+        self.sample_borrowing(0)
+        self.sample_borrowing(-3)
+        self.sample_borrowing(5, actual_return_date=TODAY)
+
+        check_borrowings_for_overdue(chunk_size=2, shards=1)
+
+        notified = [
+            row for message in self.overdue_messages() for row in message[0]
+        ]
+        self.assertEqual(len(self.overdue_messages()), 2)
+        self.assertEqual(
+            sorted(row[0] for row in notified),
+            sorted(borrowing.id for borrowing in overdue),
+        )
+        self.assertTrue(
+            all(row[1] == self.user.email for row in notified)
+        )
+        self.assertIn(
+            "3 borrowings overdue, 3 newly overdue, 0 escalated",
+            self.digest(),
+        )
+
+        for borrowing in overdue:
+            borrowing.refresh_from_db()
+            self.assertEqual(borrowing.overdue_level, 1)
+            self.assertEqual(borrowing.first_overdue_notice, TODAY)
+            self.assertEqual(borrowing.last_overdue_notice, TODAY)
+
+    def test_sweep_is_split_into_shards(self):
+        overdue = [self.sample_borrowing(1) for _ in range(5)]
+
+        check_borrowings_for_overdue(chunk_size=10, shards=3)
+
+        notified = [
+            row[0] for message in self.overdue_messages()
+            for row in message[0]
+        ]
+        self.assertEqual(len(self.overdue_messages()), 3)
+        self.assertEqual(
+            sorted(notified), [borrowing.id for borrowing in overdue]
+        )
+        self.assertIn("5 borrowings overdue", self.digest())
+
+    def test_no_overdue_borrowings(self):
+        self.sample_borrowing(-1)
+
+        check_borrowings_for_overdue()
+
+        self.assertEqual(self.overdue_messages(), [])
+        self.assertEqual(self.digest(), "No borrowings overdue today!")
+
+    def test_repeated_sweep_does_not_notify_again(self):
+        self.sample_borrowing(2)
+
+        check_borrowings_for_overdue()
+        check_borrowings_for_overdue()
+
+        self.assertEqual(len(self.overdue_messages()), 1)
+        self.assertEqual(
+            OutboxMessage.objects.filter(
+                task=send_notification.name
+            ).count(),
+            1,
+        )
+
+    def test_escalation_levels(self):
+        reminded = self.sample_borrowing(8)
+        Borrowing.objects.filter(pk=reminded.pk).update(
+            overdue_level=1,
+            first_overdue_notice=TODAY - datetime.timedelta(days=7),
+            last_overdue_notice=TODAY - datetime.timedelta(days=7),
+        )
+        waiting = self.sample_borrowing(6)
+        Borrowing.objects.filter(pk=waiting.pk).update(overdue_level=1)
+        forgotten = self.sample_borrowing(40)
+
+        check_borrowings_for_overdue()
+
+        levels = {
+            row[0]: row[4]
+            for message in self.overdue_messages() for row in message[0]
+        }
+        self.assertEqual(levels, {reminded.id: 2, forgotten.id: 3})
+        self.assertIn("1 newly overdue, 1 escalated", self.digest())
+
+        reminded.refresh_from_db()
+        self.assertEqual(reminded.overdue_level, 2)
+        self.assertEqual(
+            reminded.first_overdue_notice,
+            TODAY - datetime.timedelta(days=7),
+        )
+        self.assertEqual(reminded.last_overdue_notice, TODAY)
+
+    @patch("borrowings.tasks.notify")
+    def test_reminder_message(self, mock_notify):
+        send_borrowing_overdue_notification(
+            1, "test@test.com", TODAY, TODAY, 3
+        )
+
+        self.assertIn("reminder 2", mock_notify.call_args[0][0])
+
+
+class OverdueIdShardsTests(TestCase):
+
+    def test_no_overdue_borrowings(self):
+        self.assertEqual(overdue_id_shards(TODAY, 4), [])
+
+    @patch("borrowings.services.notification_due_borrowings")
+    def test_id_space_is_covered_without_gaps(self, mock_overdue):
+        mock_overdue.return_value.aggregate.return_value = {
+            "first_id": 10, "last_id": 19
+        }
+
+        self.assertEqual(
+            overdue_id_shards(TODAY, 3), [(10, 13), (14, 17), (18, 19)]
+        )
+        self.assertEqual(overdue_id_shards(TODAY, 50)[-1], (19, 19))
+        self.assertEqual(len(overdue_id_shards(TODAY, 50)), 10)
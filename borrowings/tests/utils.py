@@ -0,0 +1,23 @@
+from contextlib import contextmanager
+
+from django.db.models import signals
+
+from borrowings.models import Borrowing
+from borrowings.signals import send_borrowing_created_message
+
+
+@contextmanager
+def created_message_disconnected():
+    """Create borrowings without writing their notifications to the
+    outbox, reconnecting the receiver after the block"""
+    signals.post_save.disconnect(
+        sender=Borrowing, dispatch_uid="post_save_signal_processed"
+    )
+    try:
+        yield
+    finally:
+        signals.post_save.connect(
+            send_borrowing_created_message,
+            sender=Borrowing,
+            dispatch_uid="post_save_signal_processed",
+        )
@@ -1,13 +1,33 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.db.models import Count, Max, Sum
 from django.shortcuts import redirect
+from django.urls import reverse
 from django.utils import timezone
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
+from DRF_API_Library.caching import (
+    CachedResponseMixin,
+    invalidate_responses,
+)
+from DRF_API_Library.exports import ExportMixin
+from DRF_API_Library.pagination import KeysetPaginationMixin
+from DRF_API_Library.prefetch import SerializerPrefetchMixin
+from DRF_API_Library.replicas import ReplicaReadMixin
+from DRF_API_Library.values import ValuesListMixin
+from DRF_API_Library.versioning import (
+    ConditionalRequestMixin,
+    next_version,
+)
+from book.models import Book
+from book.services import reserve_copy, release_copy
 from borrowings.models import Borrowing
 from borrowings.serializers import (
     BorrowingSerializer,
@@ -16,37 +36,115 @@ from borrowings.serializers import (
     BorrowingReturnSerializer,
 )
 from borrowings.services import filtering
+from payment.models import Payment
+from payment.tasks import create_checkout_sessions
 from payment.utils.services import PaymentService
 
 
+def checkout_response(request, payment):
+    """Answer with the payment to pay.
+
+    In async checkout mode the Stripe session is created by a worker
+    after commit, so the client gets 202 with the payment URL to poll
+    for session_url instead of a redirect to Stripe.
+    """
+    if payment.session_url:
+        return redirect(payment.session_url)
+
+    transaction.on_commit(enqueue_checkout)
+    status_url = request.build_absolute_uri(
+        reverse("payment:payment-detail", args=[payment.id])
+    )
+
+    return Response(
+        {"payment_id": payment.id, "status_url": status_url},
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": status_url},
+    )
+
+
+def enqueue_checkout():
+    try:
+        create_checkout_sessions.delay()
+    except Exception as e:
+        # The periodic run of the task picks the payment up later
+        print("Error enqueueing checkout sessions!")
+        print(e)
+
+
 class BorrowingPagination(PageNumberPagination):
     page_size = 10
     max_page_size = 100
 
 
-class BorrowingViewSet(viewsets.ModelViewSet):
+class BorrowingCursorPagination(CursorPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    # id grows with borrow_date and, unlike it, is unique,
+    # so the cursor never has to fall back to offsets
+    ordering = "-id"
+
+
+class BorrowingViewSet(
+    ReplicaReadMixin,
+    CachedResponseMixin,
+    ConditionalRequestMixin,
+    ValuesListMixin,
+    SerializerPrefetchMixin,
+    ExportMixin,
+    KeysetPaginationMixin,
+    viewsets.ModelViewSet
+):
     """Borrowing view set with implemented filtering
      by user_id or is_active status and custom action return."""
 
-    queryset = Borrowing.objects.select_related("book", "user")
+    queryset = Borrowing.objects.all()
     serializer_class = BorrowingSerializer()
     permission_classes = (IsAuthenticated,)
     pagination_class = BorrowingPagination
+    keyset_pagination_class = BorrowingCursorPagination
+    values_list_enabled = True
+    # Detail of a borrowing with its book, user and payments
+    cache_models = {"retrieve": (Borrowing, Book, get_user_model(), Payment)}
+    cache_per_user = ("retrieve",)
+    etag_values = (
+        "version",
+        "book__version",
+        "user__version",
+        # A new payment raises the max id, a deleted one the count
+        Count("payments"),
+        Max("payments__id"),
+        Sum("payments__version"),
+    )
+    export_fields = {
+        "id": "id",
+        "borrow_date": "borrow_date",
+        "expected_return_date": "expected_return_date",
+        "actual_return_date": "actual_return_date",
+        "book_id": "book_id",
+        "book_title": "book__title",
+        "user_id": "user_id",
+        "user_email": "user__email",
+    }
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         with transaction.atomic():
-            self.perform_create(serializer)
+            if not reserve_copy(serializer.validated_data["book"].id):
+                raise ValidationError(
+                    "Sorry but all such books were taken away",
+                    code=status.HTTP_403_FORBIDDEN
+                )
 
-            borrowing = Borrowing.objects.get(pk=serializer["id"].value)
-            borrowing.book.inventory -= 1
-            borrowing.book.save()
-
-            PaymentService().create_payment(borrowing)
-            session_url = borrowing.payments.last().session_url
+            self.perform_create(serializer)
+            payment = PaymentService().create_payment(
+                serializer.instance,
+                checkout=settings.PAYMENT_CHECKOUT_MODE == "sync",
+            )
 
-            return redirect(session_url)
+            return checkout_response(request, payment)
 
     def get_queryset(self):
         return filtering(self.queryset, self.request)
@@ -85,16 +183,31 @@ class BorrowingViewSet(viewsets.ModelViewSet):
             serializer = BorrowingReturnSerializer(borrowing)
 
             borrowing.actual_return_date = timezone.now().date()
-            borrowing.save()
+            closed = Borrowing.objects.filter(
+                pk=borrowing.pk, actual_return_date__isnull=True
+            ).update(
+                actual_return_date=borrowing.actual_return_date,
+                version=next_version(),
+            )
+
+            if not closed:
+                data = {"error": "This borrowing is already closed"}
+                return Response(
+                    data=data,
+                    status=status.HTTP_403_FORBIDDEN
+                )
+
+            invalidate_responses(Borrowing)
 
-            borrowing.book.inventory += 1
-            borrowing.book.save()
+            release_copy(borrowing.book_id)
 
             if borrowing.actual_return_date > borrowing.expected_return_date:
-                PaymentService().calculate_fine(borrowing)
-                session_url = borrowing.payments.last().session_url
+                payment = PaymentService().calculate_fine(
+                    borrowing,
+                    checkout=settings.PAYMENT_CHECKOUT_MODE == "sync",
+                )
 
-                return redirect(session_url)
+                return checkout_response(request, payment)
 
             return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -104,7 +217,13 @@ class BorrowingViewSet(viewsets.ModelViewSet):
                 name="user_id",
                 type={"type": "array", "items": {"type": "number"}},
                 description="Filter by user id (ex. ?user_id=1,4)"
-            )
+            ),
+            OpenApiParameter(
+                name="pagination",
+                type=str,
+                enum=["cursor"],
+                description="Use cursor pagination (ex. ?pagination=cursor)"
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
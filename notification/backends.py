@@ -0,0 +1,77 @@
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from DRF_API_Library.outbound import outbound
+
+
+class BaseBackend:
+    """Deliver notification messages to the library chat"""
+
+    def send(self, text: str) -> None:
+        raise NotImplementedError
+
+
+class HTTPBackend(BaseBackend):
+    """Post messages as JSON to NOTIFICATION_HTTP_URL.
+
+    Run the notification_sink command for a local endpoint to load
+    test against.
+    """
+
+    upstream = "notification"
+
+    def __init__(self, url: str = None):
+        self.url = url or settings.NOTIFICATION_HTTP_URL
+
+    def payload(self, text: str) -> dict:
+        return {"text": text}
+
+    def send(self, text: str) -> None:
+        response = outbound(self.upstream).post(
+            self.url, json=self.payload(text)
+        )
+        response.raise_for_status()
+
+
+class TelegramBackend(HTTPBackend):
+    """Send messages to the chat with the Telegram Bot API"""
+
+    API_URL = "https://api.telegram.org/bot{token}/sendMessage"
+    upstream = "telegram"
+
+    def __init__(self):
+        super().__init__(self.API_URL.format(token=settings.TOKEN))
+
+    def payload(self, text: str) -> dict:
+        return {"chat_id": settings.CHAT_ID, "text": text}
+
+
+class MemoryBackend(BaseBackend):
+    """Keep messages in MemoryBackend.outbox, for tests"""
+
+    outbox = []
+
+    def send(self, text: str) -> None:
+        self.outbox.append(text)
+
+
+class FileBackend(BaseBackend):
+    """Append messages as JSON lines to NOTIFICATION_FILE_PATH"""
+
+    def __init__(self, path: str = None):
+        self.path = path or settings.NOTIFICATION_FILE_PATH
+        self._lock = threading.Lock()
+
+    def send(self, text: str) -> None:
+        line = json.dumps({"text": text, "sent_at": time.time()})
+        with self._lock, open(self.path, "a") as file:
+            file.write(line + "\n")
+
+
+def get_backend() -> BaseBackend:
+    """Create the backend selected by NOTIFICATION_BACKEND"""
+    return import_string(settings.NOTIFICATION_BACKEND)()
@@ -0,0 +1,390 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
+
+import redis
+from django.conf import settings
+from prometheus_client import Counter, Gauge, Histogram
+
+from notification.backends import get_backend
+
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DEPTH = Gauge(
+    "notification_queue_depth",
+    "Notifications waiting to be sent",
+    multiprocess_mode="max",
+)
+LATENCY = Histogram(
+    "notification_latency_seconds",
+    "Time from notify() to delivery of the notification",
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+BATCHES = Counter(
+    "notification_batches_total",
+    "Coalesced notification batches by outcome",
+    ["outcome"],
+)
+
+SEPARATOR = "\n\n"
+# Buffered notifications read at once to build a batch
+PEEK_SIZE = 100
+# Outcomes of sending a batch
+SENT = "sent"
+REJECTED = "rejected"
+FAILED = "error"
+
+
+def split(text: str, max_length: int) -> list[str]:
+    """Cut a text into pieces that fit a single message"""
+    return [
+        text[start:start + max_length]
+        for start in range(0, len(text), max_length)
+    ]
+
+
+def is_rejected(error: Exception) -> bool:
+    """Tell whether the chat refused the message itself, ex. a text
+    Telegram can not parse or a chat not found, so sending it again
+    fails the same way"""
+    response = getattr(error, "response", None)
+    return (
+        response is not None
+        and 400 <= response.status_code < 500
+        and response.status_code not in (408, 429)
+    )
+
+
+def batch_size(texts: list[str], max_length: int) -> int:
+    """Count how many leading texts fit one message together"""
+    size = length = 0
+
+    for text in texts:
+        length += len(text) + (len(SEPARATOR) if size else 0)
+        if size and length > max_length:
+            break
+        size += 1
+
+    return size
+
+
+class TokenBucket:
+    """Allow rate sends per second on average, burst at once"""
+
+    def __init__(self, rate: float, burst: int, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self._tokens = burst
+        self._updated = clock()
+
+    def wait_time(self) -> float:
+        """Take a token, or tell how long to wait for one"""
+        now = self.clock()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+
+        return (1 - self._tokens) / self.rate
+
+
+class RedisTokenBucket:
+    """TokenBucket shared by all processes in a Redis hash.
+
+    Tokens are taken by a script with the clock of the Redis server, so
+    every worker flushing the queue draws from the same bucket.
+    """
+
+    SCRIPT = """
+        local now = redis.call("TIME")
+        now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+        local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+        local state = redis.call("HMGET", KEYS[1], "tokens", "updated")
+        local tokens = tonumber(state[1]) or burst
+        local updated = tonumber(state[2]) or now
+
+        tokens = math.min(burst, tokens + (now - updated) * rate)
+        local wait = 0
+        if tokens >= 1 then
+            tokens = tokens - 1
+        else
+            wait = (1 - tokens) / rate
+        end
+
+        redis.call("HSET", KEYS[1], "tokens", tokens, "updated", now)
+        -- A full bucket is the same as no bucket
+        redis.call("EXPIRE", KEYS[1], math.ceil(burst / rate) + 60)
+        return tostring(wait)
+    """
+
+    def __init__(self, client, key: str, rate: float, burst: int):
+        self.key = key
+        self.rate = rate
+        self.burst = burst
+        self._take = client.register_script(self.SCRIPT)
+
+    def wait_time(self) -> float:
+        """Take a token, or tell how long to wait for one"""
+        return float(self._take([self.key], [self.rate, self.burst]))
+
+
+class LocalBuffer:
+    """Notification queue of this process.
+
+    Used without Redis, a background thread of the process flushes it.
+    """
+
+    def __init__(self):
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def token_bucket(self, rate: float, burst: int) -> TokenBucket:
+        return TokenBucket(rate, burst)
+
+    def push(self, items: list[str]) -> int:
+        with self._lock:
+            self._items.extend(items)
+            return len(self._items)
+
+    def peek(self, count: int) -> list[str]:
+        with self._lock:
+            return list(islice(self._items, count))
+
+    def ack(self, items: list[str]) -> None:
+        """Remove sent items from the head of the queue"""
+        with self._lock:
+            if list(islice(self._items, len(items))) == items:
+                for _ in items:
+                    self._items.popleft()
+
+    @contextmanager
+    def flush_lock(self, timeout: float):
+        acquired = self._flush_lock.acquire(blocking=False)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self._flush_lock.release()
+
+
+class RedisBuffer:
+    """Notification queue shared by all processes in a Redis list"""
+
+    KEY = "notification:queue"
+    LOCK_KEY = "notification:flush"
+    BUCKET_KEY = "notification:bucket"
+    # Trims the items only if they are still at the head of the list,
+    # so a flusher whose lock expired can not drop unsent items
+    ACK_SCRIPT = """
+        local head = redis.call("LRANGE", KEYS[1], 0, #ARGV - 1)
+        for i = 1, #ARGV do
+            if head[i] ~= ARGV[i] then
+                return 0
+            end
+        end
+        redis.call("LTRIM", KEYS[1], #ARGV, -1)
+        return #ARGV
+    """
+
+    def __init__(self, url: str):
+        self.client = redis.Redis.from_url(url)
+        self._ack = self.client.register_script(self.ACK_SCRIPT)
+
+    def __len__(self):
+        return self.client.llen(self.KEY)
+
+    def token_bucket(self, rate: float, burst: int) -> RedisTokenBucket:
+        return RedisTokenBucket(self.client, self.BUCKET_KEY, rate, burst)
+
+    def push(self, items: list[str]) -> int:
+        return self.client.rpush(self.KEY, *items)
+
+    def peek(self, count: int) -> list[str]:
+        return [
+            item.decode()
+            for item in self.client.lrange(self.KEY, 0, count - 1)
+        ]
+
+    def ack(self, items: list[str]) -> None:
+        """Remove sent items from the head of the queue"""
+        self._ack([self.KEY], items)
+
+    @contextmanager
+    def flush_lock(self, timeout: float):
+        """Let a single process flush at a time to keep the send rate"""
+        lock = self.client.lock(self.LOCK_KEY, timeout=timeout)
+        acquired = lock.acquire(blocking=False)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+
+
+class Dispatcher:
+    """Buffer notifications and send them in coalesced batches.
+
+    notify() only appends to the buffer. flush() joins queued
+    notifications into messages of at most max_length characters and
+    sends them no faster than the token bucket of the buffer allows, so
+    bursts of events turn into a few messages instead of a request
+    each. Notifications stay queued until their message is sent, a
+    flusher dying in between sends them again rather than losing them.
+    A batch the chat rejects is sent again one notification at a time,
+    and notifications rejected on their own are logged and dropped, so
+    they never hold up the queue.
+    """
+
+    def __init__(self, buffer, send, rate: float, burst: int, max_length):
+        self.buffer = buffer
+        self.send = send
+        self.bucket = buffer.token_bucket(rate, burst)
+        self.max_length = max_length
+
+    def notify(self, text: str) -> None:
+        if not text.strip():
+            # The chat rejects empty messages
+            return
+
+        queued_at = time.time()
+        depth = self.buffer.push([
+            json.dumps({"text": piece, "queued_at": queued_at})
+            for piece in split(text, self.max_length)
+        ])
+        QUEUE_DEPTH.set(depth)
+
+    def flush(self, budget: float) -> int:
+        """Send batches for up to budget seconds, return notifications
+        sent"""
+        deadline = time.monotonic() + budget
+        sent = 0
+        # Notifications of a rejected batch left to send one by one
+        isolated = 0
+
+        with self.buffer.flush_lock(budget + 30) as acquired:
+            if not acquired:
+                return 0
+
+            while time.monotonic() < deadline:
+                items = self.buffer.peek(PEEK_SIZE)
+                if not items:
+                    break
+
+                notifications = [json.loads(item) for item in items]
+                size = 1 if isolated else batch_size(
+                    [notification["text"] for notification in notifications],
+                    self.max_length,
+                )
+
+                outcome = self._send(notifications[:size], deadline)
+                if outcome in (None, FAILED):
+                    break
+                if outcome == REJECTED and size > 1:
+                    isolated = size
+                    continue
+
+                self.buffer.ack(items[:size])
+                isolated = max(isolated - 1, 0)
+                if outcome == REJECTED:
+                    logger.error(
+                        "Notification rejected by the chat, dropped: %r",
+                        notifications[0]["text"],
+                    )
+                else:
+                    sent += size
+
+            QUEUE_DEPTH.set(len(self.buffer))
+
+        return sent
+
+    def _send(self, notifications: list[dict], deadline: float):
+        """Send a batch, return its outcome or None if the deadline
+        passes before the token bucket allows it"""
+        wait = self.bucket.wait_time()
+        while wait:
+            if time.monotonic() + wait > deadline:
+                return None
+            time.sleep(wait)
+            wait = self.bucket.wait_time()
+
+        try:
+            self.send(SEPARATOR.join(
+                notification["text"] for notification in notifications
+            ))
+        except Exception as e:
+            outcome = REJECTED if is_rejected(e) else FAILED
+            BATCHES.labels(outcome).inc()
+            logger.warning("Error sending notifications: %s", e)
+            return outcome
+
+        BATCHES.labels(SENT).inc()
+        now = time.time()
+        for notification in notifications:
+            LATENCY.observe(now - notification["queued_at"])
+
+        return SENT
+
+    def run_flusher(self, interval: float) -> None:
+        """Flush the buffer periodically from a daemon thread"""
+        def loop():
+            while True:
+                time.sleep(interval)
+                self.flush(interval)
+
+        threading.Thread(target=loop, daemon=True).start()
+
+
+_dispatcher = None
+_dispatcher_pid = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> Dispatcher:
+    """Return the dispatcher of this process.
+
+    Notifications are buffered in Redis when NOTIFICATION_REDIS_URL is
+    set and flushed by the flush_notifications task, otherwise they
+    stay in the process and a background thread flushes them.
+    """
+    global _dispatcher, _dispatcher_pid
+
+    with _dispatcher_lock:
+        if _dispatcher_pid != os.getpid():
+            if settings.NOTIFICATION_REDIS_URL:
+                buffer = RedisBuffer(settings.NOTIFICATION_REDIS_URL)
+            else:
+                buffer = LocalBuffer()
+
+            _dispatcher = Dispatcher(
+                buffer,
+                get_backend().send,
+                rate=settings.NOTIFICATION_RATE,
+                burst=settings.NOTIFICATION_BURST,
+                max_length=settings.NOTIFICATION_MAX_LENGTH,
+            )
+            _dispatcher_pid = os.getpid()
+
+            if isinstance(buffer, LocalBuffer):
+                _dispatcher.run_flusher(settings.NOTIFICATION_FLUSH_INTERVAL)
+
+        return _dispatcher
+
+
+def notify(text: str) -> None:
+    """Queue a notification for the library chat"""
+    get_dispatcher().notify(text)
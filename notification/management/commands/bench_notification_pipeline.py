@@ -0,0 +1,170 @@
+import datetime
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+from celery.contrib.testing.worker import start_worker
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.test import override_settings
+from django.utils import timezone
+
+from DRF_API_Library.celery import app
+from book.models import Book
+from borrowings.models import Borrowing
+from notification.backends import MemoryBackend
+from notification.management.commands.notification_sink import SinkServer
+from notification.models import OutboxMessage
+
+
+BORROWING_ID = re.compile(r"^Borrowing (\d+) was created", re.MULTILINE)
+
+
+class Command(BaseCommand):
+    """Django command to benchmark notifications end to end offline.
+
+    Create borrowings one transaction each, as the API does, and run a
+    Celery worker in this process on the configured broker. Messages go
+    through the outbox, the worker, the dispatcher and the selected
+    backend, and the command reports throughput and latency from
+    commit to delivery.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--borrowings", type=int, default=1000)
+        parser.add_argument(
+            "--backend", choices=["memory", "file", "http"], default="memory"
+        )
+        parser.add_argument("--rate", type=float, default=5)
+        parser.add_argument("--burst", type=int, default=5)
+        parser.add_argument("--flush-interval", type=float, default=0.5)
+
+    def handle(self, *args, **options):
+        if app.conf.broker_url is None:
+            raise CommandError("Set CELERY_BROKER_URL, ex. memory://")
+
+        backend_settings, delivered, stop = self._backend(options["backend"])
+
+        with override_settings(
+            NOTIFICATION_REDIS_URL=None,
+            NOTIFICATION_RATE=options["rate"],
+            NOTIFICATION_BURST=options["burst"],
+            NOTIFICATION_FLUSH_INTERVAL=options["flush_interval"],
+            **backend_settings,
+        ), start_worker(app, pool="solo", perform_ping_check=False):
+            try:
+                self._run(options["borrowings"], delivered)
+            finally:
+                stop()
+
+    def _run(self, count: int, delivered) -> None:
+        user, _ = get_user_model().objects.get_or_create(
+            email="notification-bench@test.com"
+        )
+        book = Book.objects.create(
+            title="Notification bench", inventory=count, daily_fee=1
+        )
+        expected_return_date = (
+            timezone.now().date() + datetime.timedelta(days=7)
+        )
+
+        committed = {}
+        started = time.perf_counter()
+        for _ in range(count):
+            borrowing = Borrowing.objects.create(
+                book=book,
+                user=user,
+                expected_return_date=expected_return_date,
+            )
+            committed[borrowing.id] = time.perf_counter()
+        created = time.perf_counter() - started
+
+        latencies = []
+        seen = 0
+        while len(latencies) < count:
+            texts = delivered()
+            now = time.perf_counter()
+            for text in texts[seen:]:
+                # Leftovers of earlier runs may be relayed as well
+                latencies.extend(
+                    now - committed[int(borrowing_id)]
+                    for borrowing_id in BORROWING_ID.findall(text)
+                    if int(borrowing_id) in committed
+                )
+            seen = len(texts)
+            if now - started > 600:
+                raise CommandError(
+                    f"Only {len(latencies)} of {count} delivered"
+                )
+            time.sleep(0.005)
+        elapsed = time.perf_counter() - started
+
+        OutboxMessage.objects.filter(
+            key__in=[f"borrowing-created-{pk}" for pk in committed]
+        ).delete()
+        Borrowing.objects.filter(id__in=committed).delete()
+        book.delete()
+
+        latencies.sort()
+        self.stdout.write(
+            f"borrowings={count} created={count / created:.0f}/s "
+            f"delivered={count / elapsed:.0f}/s posts={seen} "
+            f"avg_batch={count / seen:.1f} "
+            f"p50={latencies[len(latencies) // 2]:.2f}s "
+            f"p99={latencies[int(len(latencies) * 0.99)]:.2f}s"
+        )
+
+    def _backend(self, name: str):
+        """Return settings, a reader of delivered posts and a cleanup"""
+        if name == "memory":
+            MemoryBackend.outbox.clear()
+            return (
+                {"NOTIFICATION_BACKEND": "notification.backends."
+                                         "MemoryBackend"},
+                lambda: MemoryBackend.outbox,
+                lambda: None,
+            )
+
+        if name == "file":
+            path = tempfile.mktemp(suffix=".jsonl")
+
+            def read():
+                if not os.path.exists(path):
+                    return []
+                with open(path) as file:
+                    return [
+                        json.loads(line)["text"]
+                        for line in file if line.endswith("\n")
+                    ]
+
+            return (
+                {
+                    "NOTIFICATION_BACKEND": "notification.backends."
+                                            "FileBackend",
+                    "NOTIFICATION_FILE_PATH": path,
+                },
+                read,
+                lambda: os.path.exists(path) and os.remove(path),
+            )
+
+        texts = []
+
+        class Output:
+            def write(self, text):
+                texts.append(text)
+
+        server = SinkServer(("127.0.0.1", 0), Output())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return (
+            {
+                "NOTIFICATION_BACKEND": "notification.backends.HTTPBackend",
+                "NOTIFICATION_HTTP_URL": (
+                    f"http://127.0.0.1:{server.server_port}/"
+                ),
+            },
+            lambda: texts,
+            server.shutdown,
+        )
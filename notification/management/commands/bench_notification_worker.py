@@ -0,0 +1,103 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from borrowings.management.commands.bench_overdue_sweep import (
+    Command as OverdueSweepCommand,
+)
+from borrowings.tasks import send_borrowing_created_notification
+from notification import outbox
+from notification.models import OutboxMessage
+
+
+class Command(BaseCommand):
+    """Django command to benchmark notification workers per process.
+
+    Publish a burst of notification tasks through the outbox to the
+    notifications queue on a filesystem broker and consume it with a
+    prefork worker of each concurrency, reporting messages per second
+    of the worker and of each of its processes.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=2000)
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            nargs="+",
+            default=[1, 2],
+            help="Worker processes of each run",
+        )
+        parser.add_argument("--timeout", type=int, default=600)
+
+    def handle(self, *args, **options):
+        for concurrency in options["concurrency"]:
+            rate = self._run(concurrency, options)
+            self.stdout.write(
+                f"concurrency={concurrency} "
+                f"messages={options['messages']} rate={rate:.0f}/s "
+                f"per process={rate / concurrency:.0f}/s"
+            )
+
+    def _run(self, concurrency: int, options) -> float:
+        key = f"bench-{concurrency}-{time.time_ns()}"
+        OutboxMessage.objects.bulk_create(
+            OutboxMessage(
+                key=f"{key}-{number}",
+                task=send_borrowing_created_notification.name,
+                args=[
+                    number, "bench@test.com", "2024-01-01", "2024-01-08"
+                ],
+            )
+            for number in range(options["messages"])
+        )
+        messages = OutboxMessage.objects.filter(key__startswith=key)
+
+        with tempfile.TemporaryDirectory() as directory:
+            for folder in ("queue", "results"):
+                os.makedirs(os.path.join(directory, folder))
+
+            OverdueSweepCommand._use_filesystem_broker(directory)
+            outbox.relay()
+            worker = subprocess.Popen(
+                [
+                    sys.executable, "-m", "celery",
+                    "-A", "DRF_API_Library", "worker",
+                    "--queues", "notifications",
+                    "--concurrency", str(concurrency),
+                    "--without-gossip", "--without-mingle",
+                    "--without-heartbeat", "--loglevel", "WARNING",
+                ],
+                env={
+                    **os.environ,
+                    "CELERY_FILESYSTEM_DIR": directory,
+                    "NOTIFICATION_REDIS_URL": "",
+                    "NOTIFICATION_BACKEND": (
+                        "notification.backends.MemoryBackend"
+                    ),
+                },
+            )
+
+            try:
+                started = time.monotonic()
+                while messages.filter(delivered_at__isnull=True).exists():
+                    if time.monotonic() - started > options["timeout"]:
+                        raise CommandError("Messages were not delivered")
+                    time.sleep(0.2)
+            finally:
+                worker.terminate()
+                worker.wait()
+
+        delivered = messages.aggregate(
+            first=Min("delivered_at"), last=Max("delivered_at")
+        )
+        messages.delete()
+
+        return options["messages"] / max(
+            (delivered["last"] - delivered["first"]).total_seconds(), 0.001
+        )
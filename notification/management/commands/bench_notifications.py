@@ -0,0 +1,81 @@
+import threading
+import time
+
+from django.core.management import BaseCommand
+
+from notification.dispatcher import Dispatcher, LocalBuffer
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the notification dispatcher.
+
+    Produce notifications at a steady rate and send them through the
+    dispatcher to a stand-in for Telegram, then report how many posts
+    were made compared with one post per notification, the batch size
+    and the delivery latency.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=2000)
+        parser.add_argument(
+            "--arrival-rate",
+            type=float,
+            default=200,
+            help="Notifications produced per second",
+        )
+        parser.add_argument("--rate", type=float, default=1)
+        parser.add_argument("--burst", type=int, default=5)
+        parser.add_argument("--interval", type=float, default=2)
+        parser.add_argument(
+            "--send-ms",
+            type=float,
+            default=50,
+            help="Simulated latency of a Telegram call",
+        )
+
+    def handle(self, *args, **options):
+        posts = []
+        queued_at = {}
+        latencies = []
+
+        def send(text):
+            time.sleep(options["send_ms"] / 1000)
+            posts.append(len(text))
+            now = time.perf_counter()
+            for line in text.split("\n\n"):
+                latencies.append(now - queued_at.pop(line))
+
+        dispatcher = Dispatcher(
+            LocalBuffer(),
+            send,
+            rate=options["rate"],
+            burst=options["burst"],
+            max_length=4096,
+        )
+        produced = threading.Event()
+
+        def produce():
+            for number in range(options["messages"]):
+                text = f"Borrowing {number} was created by user{number}."
+                queued_at[text] = time.perf_counter()
+                dispatcher.notify(text)
+                time.sleep(1 / options["arrival_rate"])
+            produced.set()
+
+        started = time.perf_counter()
+        threading.Thread(target=produce, daemon=True).start()
+        while not produced.is_set() or len(dispatcher.buffer):
+            time.sleep(options["interval"])
+            dispatcher.flush(options["interval"])
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        self.stdout.write(
+            f"notifications={options['messages']} "
+            f"posts={len(posts)} (was {options['messages']}) "
+            f"avg_batch={options['messages'] / len(posts):.1f} "
+            f"avg_chars={sum(posts) / len(posts):.0f} "
+            f"elapsed={elapsed:.1f}s "
+            f"p50={latencies[len(latencies) // 2]:.2f}s "
+            f"p99={latencies[int(len(latencies) * 0.99)]:.2f}s"
+        )
@@ -0,0 +1,83 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management import BaseCommand
+
+
+class SinkHandler(BaseHTTPRequestHandler):
+    """Accept notification posts over keep-alive HTTP/1.1"""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):  # noqa: N802
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.record(json.loads(body)["text"])
+
+        answer = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(answer)))
+        self.end_headers()
+        self.wfile.write(answer)
+
+    def log_message(self, *args):
+        pass
+
+
+class SinkServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, output=None):
+        super().__init__(address, SinkHandler)
+        self.output = output
+        self.posts = self.messages = 0
+        self._lock = threading.Lock()
+
+    def record(self, text: str) -> None:
+        with self._lock:
+            self.posts += 1
+            self.messages += text.count("\n\n") + 1
+            if self.output:
+                self.output.write(text + "\n\n")
+
+
+class Command(BaseCommand):
+    """Django command to run a local endpoint for HTTPBackend.
+
+    Accept notifications instead of Telegram, so load tests run fully
+    offline, and print how many posts and messages arrive per second.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--port", type=int, default=8025)
+        parser.add_argument(
+            "--print-messages",
+            action="store_true",
+            help="Print received texts too",
+        )
+
+    def handle(self, *args, **options):
+        server = SinkServer(
+            ("127.0.0.1", options["port"]),
+            self.stdout if options["print_messages"] else None,
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.stdout.write(
+            f"Listening on http://127.0.0.1:{options['port']}/"
+        )
+
+        posts = messages = 0
+        try:
+            while True:
+                time.sleep(1)
+                if server.posts != posts:
+                    self.stdout.write(
+                        f"posts/s={server.posts - posts} "
+                        f"messages/s={server.messages - messages} "
+                        f"total={server.messages}"
+                    )
+                    posts, messages = server.posts, server.messages
+        except KeyboardInterrupt:
+            server.shutdown()
@@ -0,0 +1,30 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class OutboxMessage(models.Model):
+    """Notification task written in the transaction of its event.
+
+    Rows are published to Celery only after the transaction commits,
+    so rolled back events are never notified. The key identifies the
+    event, a second message for the same event is dropped.
+    """
+
+    key = models.CharField(max_length=255, unique=True)
+    task = models.CharField(max_length=255)
+    args = models.JSONField(encoder=DjangoJSONEncoder, default=list)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    published_at = models.DateTimeField(blank=True, null=True)
+    delivered_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=models.Q(delivered_at__isnull=True),
+                name="outbox_undelivered_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Outbox message {self.key}"
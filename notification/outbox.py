@@ -0,0 +1,119 @@
+import datetime
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from DRF_API_Library.celery import app
+from notification.models import OutboxMessage
+
+
+def enqueue(key: str, task, *args) -> None:
+    """Write a notification task to the outbox of the current transaction.
+
+    The task is published with the outbox_key keyword argument once the
+    transaction commits. A message with the same key is ignored.
+    """
+    OutboxMessage.objects.bulk_create(
+        [OutboxMessage(key=key, task=task.name, args=list(args))],
+        ignore_conflicts=True,
+    )
+
+    # One relay per transaction publishes all of its messages
+    if not any(
+        callback[1] is relay_on_commit
+        for callback in connection.run_on_commit
+    ):
+        transaction.on_commit(relay_on_commit)
+
+
+def relay_on_commit() -> None:
+    try:
+        relay()
+    except Exception as e:
+        # Left in the outbox for the periodic relay
+        print("Error relaying outbox messages!")
+        print(e)
+
+
+def relay(batch_size: int = None) -> int:
+    """Publish unpublished outbox messages, return how many.
+
+    Messages published more than NOTIFICATION_OUTBOX_REDELIVER_SECONDS
+    ago and still not delivered are published again. Messages are
+    locked in batches with SKIP LOCKED, so concurrent relays never
+    publish the same message twice and messages being delivered are
+    left alone, and each batch is sent over a single broker connection.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_OUTBOX_BATCH_SIZE
+    redeliver_before = timezone.now() - datetime.timedelta(
+        seconds=settings.NOTIFICATION_OUTBOX_REDELIVER_SECONDS
+    )
+    published = 0
+
+    while True:
+        with transaction.atomic():
+            messages = list(
+                OutboxMessage.objects.select_for_update(
+                    skip_locked=True
+                ).filter(
+                    Q(published_at__isnull=True)
+                    | Q(published_at__lt=redeliver_before),
+                    delivered_at__isnull=True,
+                ).order_by("id")[:batch_size]
+            )
+
+            with app.producer_or_acquire() as producer:
+                for message in messages:
+                    app.send_task(
+                        message.task,
+                        args=message.args,
+                        kwargs={"outbox_key": message.key},
+                        producer=producer,
+                    )
+
+            OutboxMessage.objects.filter(
+                id__in=[message.id for message in messages]
+            ).update(published_at=timezone.now())
+
+        published += len(messages)
+        if len(messages) < batch_size:
+            return published
+
+
+@contextmanager
+def claim(outbox_key: str = None):
+    """Deliver an outbox message within the block, which gets False if
+    the message was delivered already.
+
+    The message is marked delivered in a transaction committed when
+    the block succeeds, so a message redelivered by the broker or
+    published twice is handled once, and waits on the row lock while
+    it is being handled. When the consumer fails or dies the message
+    stays undelivered and relay() publishes it again. Tasks called
+    without an outbox key are always handled.
+    """
+    if outbox_key is None:
+        yield True
+        return
+
+    with transaction.atomic():
+        yield bool(
+            OutboxMessage.objects.filter(
+                key=outbox_key, delivered_at__isnull=True
+            ).update(delivered_at=timezone.now())
+        )
+
+
+def purge(retention_days: int) -> int:
+    """Delete delivered messages older than retention_days"""
+    deleted, _ = OutboxMessage.objects.filter(
+        delivered_at__isnull=False,
+        created_at__lt=timezone.now() - datetime.timedelta(
+            days=retention_days
+        ),
+    ).delete()
+
+    return deleted
@@ -0,0 +1,31 @@
+from celery import shared_task
+from django.conf import settings
+
+from notification import outbox
+from notification.dispatcher import get_dispatcher, notify
+
+
+@shared_task()
+def send_notification(text: str, outbox_key: str = None) -> None:
+    """Queue a text for the library chat"""
+    with outbox.claim(outbox_key) as claimed:
+        if claimed:
+            notify(text)
+
+
+@shared_task()
+def flush_notifications() -> int:
+    """Send buffered notifications in rate-limited batches"""
+    return get_dispatcher().flush(settings.NOTIFICATION_FLUSH_INTERVAL)
+
+
+@shared_task()
+def relay_outbox() -> int:
+    """Publish outbox messages whose on-commit relay failed"""
+    return outbox.relay()
+
+
+@shared_task()
+def purge_outbox() -> int:
+    """Forget delivered outbox messages"""
+    return outbox.purge(settings.NOTIFICATION_OUTBOX_RETENTION_DAYS)
@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from notification.backends import (
+    FileBackend,
+    MemoryBackend,
+    TelegramBackend,
+    get_backend,
+)
+from notification.dispatcher import Dispatcher, LocalBuffer
+
+
+class BackendTests(SimpleTestCase):
+
+    def setUp(self):
+        MemoryBackend.outbox.clear()
+
+    @override_settings(
+        NOTIFICATION_BACKEND="notification.backends.MemoryBackend"
+    )
+    def test_backend_is_selected_by_settings(self):
+        backend = get_backend()
+        dispatcher = Dispatcher(
+            LocalBuffer(), backend.send, rate=10, burst=10, max_length=100
+        )
+
+        dispatcher.notify("one")
+        dispatcher.notify("two")
+        dispatcher.flush(1)
+
+        self.assertIsInstance(backend, MemoryBackend)
+        self.assertEqual(MemoryBackend.outbox, ["one\n\ntwo"])
+
+    def test_file_backend_appends_json_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "notifications.jsonl")
+            backend = FileBackend(path)
+
+            backend.send("one")
+            backend.send("two\nlines")
+
+            with open(path) as file:
+                texts = [json.loads(line)["text"] for line in file]
+
+        self.assertEqual(texts, ["one", "two\nlines"])
+
+    @override_settings(TOKEN="123:abc", CHAT_ID="42")
+    @patch("DRF_API_Library.outbound.OutboundClient.post")
+    def test_telegram_backend_posts_json_body(self, post):
+        TelegramBackend().send("Borrowing 1 & more?")
+
+        post.assert_called_once_with(
+            "https://api.telegram.org/bot123:abc/sendMessage",
+            json={"chat_id": "42", "text": "Borrowing 1 & more?"},
+        )
+        post.return_value.raise_for_status.assert_called_once()
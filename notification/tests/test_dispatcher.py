@@ -0,0 +1,163 @@
+import json
+from unittest.mock import MagicMock
+
+from django.test import SimpleTestCase
+from requests import HTTPError
+
+from notification.dispatcher import (
+    Dispatcher,
+    LocalBuffer,
+    TokenBucket,
+    batch_size,
+    split,
+)
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class DispatcherTests(SimpleTestCase):
+
+    def setUp(self):
+        self.buffer = LocalBuffer()
+        self.send = MagicMock()
+        self.dispatcher = Dispatcher(
+            self.buffer, self.send, rate=100, burst=100, max_length=20
+        )
+
+    def queued_texts(self):
+        return [
+            json.loads(item)["text"] for item in self.buffer.peek(1000)
+        ]
+
+    def test_notifications_are_coalesced(self):
+        for text in ("one", "two", "three", "four", "five"):
+            self.dispatcher.notify(text)
+
+        self.assertEqual(self.dispatcher.flush(5), 5)
+
+        self.assertEqual(
+            [call.args[0] for call in self.send.call_args_list],
+            ["one\n\ntwo\n\nthree", "four\n\nfive"],
+        )
+        self.assertEqual(len(self.buffer), 0)
+
+    def test_long_notification_is_split(self):
+        self.dispatcher.notify("x" * 45)
+
+        self.assertEqual(
+            self.queued_texts(), ["x" * 20, "x" * 20, "x" * 5]
+        )
+
+    def test_failed_batch_is_requeued_in_order(self):
+        self.send.side_effect = [None, ConnectionError("down")]
+        for text in ("one", "two", "three", "four", "five"):
+            self.dispatcher.notify(text)
+
+        with self.assertLogs("notification.dispatcher", "WARNING"):
+            self.assertEqual(self.dispatcher.flush(5), 3)
+
+        self.assertEqual(self.queued_texts(), ["four", "five"])
+
+    def test_notifications_stay_queued_until_sent(self):
+        for text in ("one", "two", "three", "four", "five"):
+            self.dispatcher.notify(text)
+
+        queued = []
+        self.send.side_effect = lambda text: queued.append(
+            self.queued_texts()
+        )
+        self.dispatcher.flush(5)
+
+        self.assertEqual(
+            queued,
+            [["one", "two", "three", "four", "five"], ["four", "five"]],
+        )
+        self.assertEqual(self.queued_texts(), [])
+
+    def test_rejected_notification_is_dropped(self):
+        def send(text):
+            if "bad" in text:
+                raise HTTPError(response=MagicMock(status_code=400))
+
+        self.send.side_effect = send
+        for text in ("one", "bad", "two", "three"):
+            self.dispatcher.notify(text)
+
+        with self.assertLogs("notification.dispatcher") as logs:
+            self.assertEqual(self.dispatcher.flush(5), 3)
+
+        self.assertEqual(
+            [call.args[0] for call in self.send.call_args_list],
+            ["one\n\nbad\n\ntwo\n\nthree", "one", "bad", "two", "three"],
+        )
+        self.assertIn("'bad'", logs.output[-1])
+        self.assertEqual(self.queued_texts(), [])
+
+    def test_rate_limited_batch_stays_queued(self):
+        self.send.side_effect = HTTPError(response=MagicMock(status_code=429))
+        self.dispatcher.notify("one")
+
+        with self.assertLogs("notification.dispatcher", "WARNING"):
+            self.assertEqual(self.dispatcher.flush(5), 0)
+
+        self.assertEqual(self.queued_texts(), ["one"])
+
+    def test_empty_notification_is_not_queued(self):
+        self.dispatcher.notify("")
+        self.dispatcher.notify(" \n")
+
+        self.assertEqual(len(self.buffer), 0)
+
+    def test_ack_ignores_items_sent_by_another_flusher(self):
+        self.dispatcher.notify("one")
+        items = self.buffer.peek(1)
+        self.buffer.ack(items)
+        self.dispatcher.notify("two")
+
+        self.buffer.ack(items)
+
+        self.assertEqual(self.queued_texts(), ["two"])
+
+    def test_flush_stops_when_out_of_tokens(self):
+        self.dispatcher.bucket = TokenBucket(0.001, 1)
+        for text in ("a" * 15, "b" * 15):
+            self.dispatcher.notify(text)
+
+        self.assertEqual(self.dispatcher.flush(0.5), 1)
+
+        self.send.assert_called_once_with("a" * 15)
+        self.assertEqual(self.queued_texts(), ["b" * 15])
+
+
+class HelpersTests(SimpleTestCase):
+
+    def test_split(self):
+        self.assertEqual(split("abcdefg", 3), ["abc", "def", "g"])
+        self.assertEqual(split("", 3), [])
+
+    def test_batch_size_keeps_oversized_first_text(self):
+        self.assertEqual(batch_size(["abc", "de", "f"], 7), 2)
+        self.assertEqual(batch_size(["abcdefgh", "a"], 7), 1)
+
+    def test_token_bucket(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, burst=2, clock=clock)
+
+        self.assertEqual(bucket.wait_time(), 0)
+        self.assertEqual(bucket.wait_time(), 0)
+        self.assertEqual(bucket.wait_time(), 0.5)
+
+        clock.now = 0.5
+        self.assertEqual(bucket.wait_time(), 0)
+
+        clock.now = 10
+        self.assertEqual(bucket.wait_time(), 0)
+        self.assertEqual(bucket.wait_time(), 0)
+        self.assertGreater(bucket.wait_time(), 0)
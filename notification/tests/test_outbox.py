@@ -0,0 +1,170 @@
+import datetime
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from DRF_API_Library.celery import app
+from book.models import Book
+from borrowings.models import Borrowing
+from borrowings.tasks import send_borrowing_created_notification
+from notification import outbox
+from notification.models import OutboxMessage
+
+
+@patch.object(app, "producer_or_acquire")
+@patch.object(app, "send_task")
+class OutboxTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@test.com", "testpass"
+        )
+        self.book = Book.objects.create(
+            title="testBook", inventory=5, daily_fee=2
+        )
+
+    def create_borrowing(self):
+        return Borrowing.objects.create(
+            expected_return_date=(
+                timezone.now().date() + datetime.timedelta(days=3)
+            ),
+            book=self.book,
+            user=self.user,
+        )
+
+    def test_committed_borrowing_is_published_after_commit(
+            self, send_task, producer
+    ):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                borrowing = self.create_borrowing()
+                self.assertEqual(OutboxMessage.objects.count(), 1)
+
+            send_task.assert_not_called()
+
+        callbacks = [
+            callback for callback in callbacks
+            if callback is outbox.relay_on_commit
+        ]
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+
+        send_task.assert_called_once()
+        self.assertEqual(
+            send_task.call_args.args[0],
+            send_borrowing_created_notification.name,
+        )
+        self.assertEqual(
+            send_task.call_args.kwargs["args"][:2],
+            [borrowing.id, self.user.email],
+        )
+        self.assertEqual(
+            send_task.call_args.kwargs["kwargs"],
+            {"outbox_key": f"borrowing-created-{borrowing.id}"},
+        )
+        self.assertFalse(
+            OutboxMessage.objects.filter(published_at__isnull=True).exists()
+        )
+
+    def test_rolled_back_borrowing_is_not_published(
+            self, send_task, producer
+    ):
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    self.create_borrowing()
+                    raise ValueError
+            except ValueError:
+                pass
+
+        self.assertEqual(callbacks, [])
+        self.assertFalse(OutboxMessage.objects.exists())
+        self.assertEqual(outbox.relay(), 0)
+        send_task.assert_not_called()
+
+    def test_messages_of_a_transaction_are_relayed_together(
+            self, send_task, producer
+    ):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                for _ in range(3):
+                    self.create_borrowing()
+                outbox.enqueue(
+                    "borrowing-created-duplicate",
+                    send_borrowing_created_notification,
+                )
+                outbox.enqueue(
+                    "borrowing-created-duplicate",
+                    send_borrowing_created_notification,
+                )
+
+        self.assertEqual(callbacks.count(outbox.relay_on_commit), 1)
+        self.assertEqual(send_task.call_count, 4)
+        producer.assert_called_once()
+        self.assertEqual(outbox.relay(), 0)
+
+    @patch("borrowings.tasks.notify")
+    def test_consumer_is_idempotent(self, notify, send_task, producer):
+        borrowing = self.create_borrowing()
+        key = f"borrowing-created-{borrowing.id}"
+        args = OutboxMessage.objects.get(key=key).args
+
+        send_borrowing_created_notification(*args, outbox_key=key)
+        send_borrowing_created_notification(*args, outbox_key=key)
+
+        notify.assert_called_once()
+        self.assertIn(f"Borrowing {borrowing.id}", notify.call_args.args[0])
+
+    @patch("borrowings.tasks.notify")
+    def test_failed_consumer_leaves_message_undelivered(
+            self, notify, send_task, producer
+    ):
+        with self.captureOnCommitCallbacks(execute=True):
+            borrowing = self.create_borrowing()
+        key = f"borrowing-created-{borrowing.id}"
+        args = OutboxMessage.objects.get(key=key).args
+        notify.side_effect = ConnectionError
+
+        with self.assertRaises(ConnectionError):
+            send_borrowing_created_notification(*args, outbox_key=key)
+
+        message = OutboxMessage.objects.get(key=key)
+        self.assertIsNone(message.delivered_at)
+        self.assertEqual(outbox.relay(), 0)
+
+        # Published again once the consumer had time to deliver it
+        message.published_at -= datetime.timedelta(
+            seconds=settings.NOTIFICATION_OUTBOX_REDELIVER_SECONDS + 1
+        )
+        message.save()
+        send_task.reset_mock()
+        self.assertEqual(outbox.relay(), 1)
+        self.assertEqual(
+            send_task.call_args.kwargs["kwargs"], {"outbox_key": key}
+        )
+
+        notify.side_effect = None
+        send_borrowing_created_notification(*args, outbox_key=key)
+        notify.assert_called()
+        self.assertEqual(outbox.relay(), 0)
+        self.assertEqual(outbox.purge(0), 1)
+
+    def test_purge_keeps_undelivered_messages(self, send_task, producer):
+        for key in ("old-delivered", "old-pending", "new-delivered"):
+            outbox.enqueue(key, send_borrowing_created_notification)
+        for key in ("old-delivered", "new-delivered"):
+            with outbox.claim(key):
+                pass
+        OutboxMessage.objects.filter(key__startswith="old").update(
+            created_at=timezone.now() - datetime.timedelta(days=8)
+        )
+
+        self.assertEqual(outbox.purge(7), 1)
+        self.assertEqual(
+            sorted(OutboxMessage.objects.values_list("key", flat=True)),
+            ["new-delivered", "old-pending"],
+        )
@@ -6,5 +6,8 @@ class PaymentConfig(AppConfig):
     name = "payment"
 
     def ready(self) -> None:
-        """Connect signal handlers"""
+        """Connect signal handlers and configure the Stripe client"""
         from . import signals
+        from payment.utils.stripe_client import configure_stripe
+
+        configure_stripe()
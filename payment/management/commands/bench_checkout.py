@@ -0,0 +1,120 @@
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from book.models import Book
+from borrowings.views import BorrowingViewSet
+from payment.models import Payment
+from payment.tasks import create_checkout_sessions
+
+
+class Command(BaseCommand):
+    """Django command to benchmark checkout creation.
+
+    Borrow one book from several threads against the local Stripe
+    stand-in and compare sync checkout, which calls Stripe while the
+    book row is locked, with async checkout, which leaves sessions to
+    the outbox worker. Run it with a reachable Celery broker, offline
+    CELERY_BROKER_URL=memory:// with
+    CELERY_RESULT_BACKEND=cache+memory:// will do.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=100)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--latency",
+            type=int,
+            default=300,
+            help="Simulated Stripe round trip in ms",
+        )
+        parser.add_argument(
+            "--mode", choices=["sync", "async"], nargs="+",
+            default=["sync", "async"],
+        )
+
+    def handle(self, *args, **options):
+        self.user, _ = get_user_model().objects.get_or_create(
+            email="checkout-bench@library.local"
+        )
+        self.book = Book.objects.create(
+            title="Checkout benchmark",
+            inventory=options["requests"] * len(options["mode"]),
+            daily_fee=1,
+        )
+        self.view = BorrowingViewSet.as_view({"post": "create"})
+
+        for mode in options["mode"]:
+            with override_settings(
+                STRIPE_BACKEND="local",
+                STRIPE_LOCAL_LATENCY_MS=options["latency"],
+                PAYMENT_CHECKOUT_MODE=mode,
+            ):
+                self._run(mode, options["requests"], options["concurrency"])
+
+        Payment.objects.filter(borrowing__book=self.book).delete()
+        self.book.borrowings.all().delete()
+        self.book.delete()
+
+    def _run(self, mode, requests, concurrency):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            timings = sorted(pool.map(self._borrow, range(requests)))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{mode}: requests={requests} concurrency={concurrency} "
+            f"throughput={requests / elapsed:.1f}/s "
+            f"p50={timings[len(timings) // 2]:.0f}ms "
+            f"p99={timings[int(len(timings) * 0.99)]:.0f}ms"
+        )
+
+        if mode == "async":
+            started = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as pool:
+                created = sum(
+                    pool.map(self._drain, range(concurrency))
+                )
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"outbox: sessions={created} workers={concurrency} "
+                f"elapsed={elapsed:.1f}s rate={created / elapsed:.1f}/s"
+            )
+
+    def _borrow(self, _) -> float:
+        request = APIRequestFactory().post(
+            "/",
+            {
+                "book": self.book.id,
+                "expected_return_date": (
+                    timezone.now().date() + datetime.timedelta(days=7)
+                ),
+            },
+            format="json",
+            HTTP_HOST="localhost",
+        )
+        force_authenticate(request, user=self.user)
+
+        started = time.perf_counter()
+        response = self.view(request)
+        elapsed = (time.perf_counter() - started) * 1000
+        connection.close()
+
+        if response.status_code not in (202, 302):
+            raise RuntimeError(f"Checkout failed: {response.data}")
+
+        return elapsed
+
+    @staticmethod
+    def _drain(_) -> int:
+        try:
+            return create_checkout_sessions()
+        finally:
+            connection.close()
@@ -0,0 +1,134 @@
+import datetime
+import hashlib
+import hmac
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from book.models import Book
+from borrowings.models import Borrowing
+from payment.models import Payment, StripeEvent
+from payment.utils.services import PaymentService
+from payment.views import PaymentViewSet
+
+WEBHOOK_SECRET = "whsec_bench"
+
+
+class Command(BaseCommand):
+    """Django command to benchmark payment confirmation.
+
+    Compare confirming payments through payment_success, which
+    retrieves the session from Stripe (the local stand-in with
+    simulated latency), with acknowledging signed webhook events.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--payments", type=int, default=50)
+        parser.add_argument(
+            "--latency",
+            type=int,
+            default=300,
+            help="Simulated Stripe round trip in ms",
+        )
+
+    def handle(self, *args, **options):
+        self.user, _ = get_user_model().objects.get_or_create(
+            email="webhook-bench@library.local"
+        )
+        book = Book.objects.create(
+            title="Webhook benchmark", inventory=1, daily_fee=1
+        )
+        self.borrowing = Borrowing.objects.create(
+            book=book,
+            user=self.user,
+            expected_return_date=datetime.date(2100, 1, 1),
+        )
+
+        with override_settings(
+            STRIPE_BACKEND="local",
+            STRIPE_LOCAL_LATENCY_MS=options["latency"],
+            STRIPE_WEBHOOK_SECRET=None,
+        ):
+            self._report("polling", self._polling(options["payments"]))
+
+        with override_settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET):
+            self._report("webhook", self._webhooks(options["payments"]))
+
+        StripeEvent.objects.filter(event_id__startswith="evt_bench").delete()
+        self.borrowing.payments.all().delete()
+        self.borrowing.delete()
+        book.delete()
+
+    def _polling(self, payments: int) -> list:
+        view = PaymentViewSet.as_view({"get": "payment_success"})
+        timings = []
+
+        for _ in range(payments):
+            with override_settings(STRIPE_LOCAL_LATENCY_MS=0):
+                payment = PaymentService.create_payment(self.borrowing)
+            request = APIRequestFactory().get(
+                "/", {"session_id": payment.session_id}, HTTP_HOST="localhost"
+            )
+            force_authenticate(request, user=self.user)
+            timings.append(self._time(view, request))
+
+        return timings
+
+    def _webhooks(self, payments: int) -> list:
+        view = PaymentViewSet.as_view(
+            {"post": "stripe_webhook"}, **PaymentViewSet.stripe_webhook.kwargs
+        )
+        timings = []
+
+        for number in range(payments):
+            payment = Payment.objects.create(
+                borrowing=self.borrowing,
+                session_id=f"cs_bench_{time.time_ns()}",
+                money_to_pay=1,
+            )
+            payload = json.dumps({
+                "id": f"evt_bench_{payment.id}",
+                "type": "checkout.session.completed",
+                "data": {"object": {
+                    "id": payment.session_id, "payment_status": "paid"
+                }},
+            })
+            timestamp = int(time.time())
+            digest = hmac.new(
+                WEBHOOK_SECRET.encode(),
+                f"{timestamp}.{payload}".encode(),
+                hashlib.sha256,
+            ).hexdigest()
+            request = APIRequestFactory().post(
+                "/",
+                payload,
+                content_type="application/json",
+                HTTP_HOST="localhost",
+                HTTP_STRIPE_SIGNATURE=f"t={timestamp},v1={digest}",
+            )
+            timings.append(self._time(view, request))
+
+        return timings
+
+    @staticmethod
+    def _time(view, request) -> float:
+        started = time.perf_counter()
+        response = view(request)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        if response.status_code != 200:
+            raise RuntimeError(f"Confirmation failed: {response.data}")
+
+        return elapsed
+
+    def _report(self, name: str, timings: list) -> None:
+        timings.sort()
+        self.stdout.write(
+            f"{name}: payments={len(timings)} "
+            f"p50={timings[len(timings) // 2]:.1f}ms "
+            f"p99={timings[int(len(timings) * 0.99)]:.1f}ms"
+        )
@@ -1,13 +1,15 @@
 from django.db import models
 
+from DRF_API_Library.versioning import VersionedModel
 from borrowings.models import Borrowing
 
 
-class Payment(models.Model):
+class Payment(VersionedModel):
 
     class Status(models.TextChoices):
         PENDING = "PENDING", "Pending"
         PAID = "PAID", "Paid"
+        EXPIRED = "EXPIRED", "Expired"
 
     class Type(models.TextChoices):
         PAYMENT = "PAYMENT", "Payment"
@@ -29,13 +31,43 @@ class Payment(models.Model):
         related_name="payments"
     )
     session_url = models.URLField(max_length=500, blank=True, null=True)
-    session_id = models.CharField(max_length=255, blank=True, null=True)
+    session_id = models.CharField(
+        max_length=255, blank=True, null=True, unique=True
+    )
     money_to_pay = models.DecimalField(
         max_digits=10,
         decimal_places=2,
         blank=True,
         null=True
     )
+    # Set while a worker creates the checkout session, see
+    # payment.tasks.create_checkout_sessions
+    checkout_claimed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["borrowing"],
+                condition=models.Q(status="PENDING"),
+                name="payment_pending_idx",
+            ),
+            models.Index(
+                fields=["id"],
+                condition=models.Q(session_id__isnull=True),
+                name="payment_checkout_outbox_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Payment ID: {self.id} - Status: {self.status}"
+
+
+class StripeEvent(models.Model):
+    """Stripe webhook event that was already processed"""
+
+    event_id = models.CharField(max_length=255, primary_key=True)
+    event_type = models.CharField(max_length=255)
+    received_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"Stripe event {self.event_id}: {self.event_type}"
@@ -1,5 +1,8 @@
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver, Signal
 
+from DRF_API_Library.caching import invalidate_responses
+from notification.outbox import enqueue
 from payment.tasks import send_success_payment_notification
 from payment.models import Payment
 
@@ -13,14 +16,24 @@ successful_payment = Signal()
     dispatch_uid="post_save_signal_processed"
 )
 def send_success_payment_message(sender, instance, created, **kwargs):
-    """Handle successful payment"""
+    """Write the notification of a successful payment to the outbox"""
     if created:
-        try:
-            send_success_payment_notification.delay(
-                instance.borrowing.id,
-                instance.borrowing.user.email,
-                instance.money_to_pay
-            )
-        except Exception as e:
-            print("Error sending created borrowing notification!")
-            print(e)
+        # Keyed by session, so a payment also confirmed by a webhook
+        # is notified once
+        enqueue(
+            f"payment-paid-{instance.session_id}",
+            send_success_payment_notification,
+            instance.borrowing.id,
+            instance.borrowing.user.email,
+            instance.money_to_pay,
+        )
+
+
+@receiver(
+    [post_save, post_delete],
+    sender=Payment,
+    dispatch_uid="payment_response_cache_invalidation"
+)
+def invalidate_response_cache(sender, instance, **kwargs):
+    """Handle changes of Payment"""
+    invalidate_responses(Payment)
@@ -1,27 +1,155 @@
-import requests
+import datetime
+
+import stripe
 
 from decimal import Decimal
 from celery import shared_task
+from django.db import transaction
+from django.db.models import Case, Q, Value, When
+from django.utils import timezone
 
 from DRF_API_Library import settings
-
-
-TOKEN = settings.TOKEN
-CHAT_ID = settings.CHAT_ID
-
-# add message at the end of url
-URL = (f"https://api.telegram.org/bot{TOKEN}"
-       f"/sendMessage?chat_id={CHAT_ID}&text=")
+from DRF_API_Library.caching import invalidate_responses
+from DRF_API_Library.versioning import next_version
+from notification.dispatcher import notify
+from notification.outbox import claim
+from payment.models import Payment, StripeEvent
+from payment.utils.services import PaymentService
 
 
 @shared_task()
 def send_success_payment_notification(
     borrowing_id: int,
     user_email: str,
-    money_to_pay: Decimal
+    money_to_pay: Decimal,
+    outbox_key: str = None,
 ) -> None:
-    """Use telegram API to send notification"""
+    """Queue notification for the library chat"""
     message = (f"Customer: {user_email}\n"
                f"successful payed {money_to_pay} "
                f"for borrowing with id:{borrowing_id}.\n")
-    requests.post(f"{URL}{message}")
+    with claim(outbox_key) as claimed:
+        if claimed:
+            notify(message)
+
+
+@shared_task()
+def notify_payment_paid(session_id: str, outbox_key: str = None) -> None:
+    """Send the notification of a payment confirmed by a webhook"""
+    with claim(outbox_key) as claimed:
+        if not claimed:
+            return
+
+        borrowing_id, user_email, money_to_pay = Payment.objects.filter(
+            session_id=session_id
+        ).values_list(
+            "borrowing_id", "borrowing__user__email", "money_to_pay"
+        ).get()
+
+        send_success_payment_notification(
+            borrowing_id, user_email, money_to_pay
+        )
+
+
+@shared_task()
+def purge_stripe_events() -> int:
+    """Forget webhook events older than Stripe's retry window"""
+    deleted, _ = StripeEvent.objects.filter(
+        received_at__lt=timezone.now() - datetime.timedelta(
+            days=settings.STRIPE_EVENT_RETENTION_DAYS
+        )
+    ).delete()
+
+    return deleted
+
+
+def claim_checkout_batch(batch_size: int) -> list[Payment]:
+    """Claim outbox payments for this worker.
+
+    Rows are locked with SKIP LOCKED only to mark them claimed, so the
+    transaction ends before any call to Stripe. Claims of a worker
+    that died are taken over after CHECKOUT_CLAIM_SECONDS.
+    """
+    now = timezone.now()
+    expired = now - datetime.timedelta(
+        seconds=settings.CHECKOUT_CLAIM_SECONDS
+    )
+
+    with transaction.atomic():
+        batch = list(
+            Payment.objects.select_for_update(
+                skip_locked=True, of=("self",)
+            ).select_related(
+                "borrowing__book"
+            ).filter(
+                Q(checkout_claimed_at__isnull=True)
+                | Q(checkout_claimed_at__lt=expired),
+                status=Payment.Status.PENDING,
+                session_id__isnull=True,
+            ).order_by("id")[:batch_size]
+        )
+        # Not part of any response, so the version stays
+        Payment.objects.filter(
+            pk__in=[payment.pk for payment in batch]
+        ).update(checkout_claimed_at=now)
+
+    return batch
+
+
+@shared_task(bind=True, max_retries=5, default_retry_delay=30)
+def create_checkout_sessions(self, batch_size: int = None) -> int:
+    """Create Stripe checkout sessions for payments in the outbox.
+
+    Batches are claimed in a short transaction, so several workers
+    drain the outbox without taking the same payment twice and no row
+    lock or transaction is held while Stripe is called. Sessions are
+    written back only to payments still without one. Payments Stripe
+    fails on are released and the task retries later.
+    """
+    batch_size = batch_size or settings.CHECKOUT_BATCH_SIZE
+    created = failed = 0
+
+    while not failed:
+        batch = claim_checkout_batch(batch_size)
+
+        done, released = [], []
+        for payment in batch:
+            try:
+                PaymentService.create_checkout_session(payment)
+            except stripe.error.StripeError:
+                failed += 1
+                released.append(payment.pk)
+            else:
+                done.append(payment)
+
+        if released:
+            Payment.objects.filter(pk__in=released).update(
+                checkout_claimed_at=None
+            )
+        if done:
+            # Sessions of a claim taken over by another worker are the
+            # same, the payment id is their idempotency key
+            created += Payment.objects.filter(
+                pk__in=[payment.pk for payment in done],
+                session_id__isnull=True,
+            ).update(
+                session_id=Case(*(
+                    When(pk=payment.pk, then=Value(payment.session_id))
+                    for payment in done
+                )),
+                session_url=Case(*(
+                    When(pk=payment.pk, then=Value(payment.session_url))
+                    for payment in done
+                )),
+                checkout_claimed_at=None,
+                version=next_version(),
+            )
+            invalidate_responses(Payment)
+
+        if len(batch) < batch_size:
+            break
+
+    if failed:
+        raise self.retry()
+
+    return created
@@ -0,0 +1,82 @@
+import datetime
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from DRF_API_Library.tests.plans import scanned_indexes, seq_scanned_tables
+from book.models import Book
+from borrowings.models import Borrowing
+from payment.models import Payment
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql", "Query plans are Postgres specific"
+)
+class PaymentQueryPlanTests(TestCase):
+    """Hot payment queries must be served by an index.
+
+    Sequential scans are disabled for the planner, so a query
+    only falls back to one when no index can serve it.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test12345"
+        )
+        book = Book.objects.create(
+            title="Test book", daily_fee=3.33, inventory=1
+        )
+        borrowings = Borrowing.objects.bulk_create(
+            Borrowing(
+                expected_return_date=datetime.date.today(),
+                book=book,
+                user=cls.user,
+            )
+            for _ in range(200)
+        )
+        Payment.objects.bulk_create(
+            Payment(
+                borrowing=borrowings[number % len(borrowings)],
+                session_id=f"cs_test_{number}",
+                status=(
+                    Payment.Status.PENDING if number % 10
+                    else Payment.Status.PAID
+                ),
+            )
+            for number in range(2000)
+        )
+        cls.borrowing = borrowings[0]
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Payment._meta.db_table}")
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assert_index_scan(self, queryset):
+        self.assertNotIn(
+            Payment._meta.db_table, seq_scanned_tables(queryset)
+        )
+
+    def test_payment_by_session_id(self):
+        self.assert_index_scan(
+            Payment.objects.filter(session_id="cs_test_42")
+        )
+
+    def test_user_payments(self):
+        queryset = Payment.objects.filter(borrowing__user=self.user)
+
+        self.assert_index_scan(queryset)
+        self.assertIn("borrowing_user_return_idx", scanned_indexes(queryset))
+
+    def test_pending_borrowing_payments(self):
+        queryset = Payment.objects.filter(
+            borrowing=self.borrowing, status=Payment.Status.PENDING
+        )
+
+        self.assert_index_scan(queryset)
+        self.assertIn("payment_pending_idx", scanned_indexes(queryset))
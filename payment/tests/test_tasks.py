@@ -0,0 +1,133 @@
+import datetime
+from unittest.mock import patch
+
+import stripe
+from celery.exceptions import Retry
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from book.models import Book
+from borrowings.models import Borrowing
+from payment.models import Payment
+from payment.tasks import claim_checkout_batch, create_checkout_sessions
+from payment.utils.local_stripe import LocalCheckoutSession
+from payment.utils.services import PaymentService
+
+
+@override_settings(STRIPE_BACKEND="local")
+class CreateCheckoutSessionsTests(TestCase):
+    """Tests for the checkout session outbox worker"""
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="test12345"
+        )
+        self.borrowing = Borrowing.objects.create(
+            expected_return_date=(
+                datetime.date.today() + datetime.timedelta(days=3)
+            ),
+            book=Book.objects.create(
+                title="Test book",
+                daily_fee=3.33,
+                inventory=1
+            ),
+            user=user
+        )
+
+    def outbox_payment(self):
+        return PaymentService.create_payment(self.borrowing, checkout=False)
+
+    def test_sessions_are_created_in_batches(self):
+        payments = [self.outbox_payment() for _ in range(5)]
+
+        created = create_checkout_sessions(batch_size=2)
+
+        self.assertEqual(created, 5)
+        for payment in payments:
+            payment.refresh_from_db()
+            self.assertTrue(payment.session_id.startswith("cs_local_"))
+            self.assertIn(payment.session_id, payment.session_url)
+        self.assertFalse(
+            Payment.objects.filter(session_id__isnull=True).exists()
+        )
+
+    def test_paid_payments_are_skipped(self):
+        payment = self.outbox_payment()
+        Payment.objects.filter(pk=payment.pk).update(
+            status=Payment.Status.PAID
+        )
+
+        self.assertEqual(create_checkout_sessions(), 0)
+
+    def test_failed_payment_stays_in_outbox(self):
+        payment = self.outbox_payment()
+
+        with patch.object(
+            PaymentService,
+            "create_checkout_session",
+            side_effect=stripe.error.APIConnectionError("Network error"),
+        ), self.assertRaises(Retry):
+            create_checkout_sessions()
+
+        payment.refresh_from_db()
+        self.assertIsNone(payment.session_id)
+        self.assertIsNone(payment.checkout_claimed_at)
+
+    def test_stripe_is_called_outside_the_claim_transaction(self):
+        self.outbox_payment()
+        depth = len(connection.atomic_blocks)
+        create_session = PaymentService.create_checkout_session
+        depths = []
+
+        def record_depth(payment):
+            depths.append(len(connection.atomic_blocks))
+            create_session(payment)
+
+        with patch.object(
+            PaymentService, "create_checkout_session", record_depth
+        ):
+            create_checkout_sessions()
+
+        self.assertEqual(depths, [depth])
+
+    def test_claimed_payments_are_skipped_until_claim_expires(self):
+        payment = self.outbox_payment()
+        self.assertEqual(claim_checkout_batch(10), [payment])
+
+        self.assertEqual(claim_checkout_batch(10), [])
+
+        Payment.objects.filter(pk=payment.pk).update(
+            checkout_claimed_at=timezone.now() - datetime.timedelta(hours=1)
+        )
+        self.assertEqual(claim_checkout_batch(10), [payment])
+
+    def test_existing_session_is_not_overwritten(self):
+        payment = self.outbox_payment()
+        create_session = PaymentService.create_checkout_session
+
+        def race(claimed):
+            # Another worker took over the claim and wrote its session
+            Payment.objects.filter(pk=claimed.pk).update(
+                session_id="cs_other", session_url="https://other"
+            )
+            create_session(claimed)
+
+        with patch.object(PaymentService, "create_checkout_session", race):
+            self.assertEqual(create_checkout_sessions(), 0)
+
+        payment.refresh_from_db()
+        self.assertEqual(payment.session_id, "cs_other")
+
+    def test_session_creation_is_idempotent(self):
+        payment = self.outbox_payment()
+
+        PaymentService.create_checkout_session(payment)
+        first_session = payment.session_id
+        PaymentService.create_checkout_session(payment)
+
+        self.assertEqual(payment.session_id, first_session)
+        self.assertEqual(
+            LocalCheckoutSession.retrieve(first_session).id, first_session
+        )
@@ -16,6 +16,7 @@ from payment.serializers import PaymentSerializer
 PAYMENT_URL = reverse("payment:payment-list")
 PAYMENT_SUCCESS_URL = reverse("payment:payment-success")
 PAYMENT_CANCEL_URL = reverse("payment:payment-cancel")
+PAYMENT_EXPORT_URL = reverse("payment:payment-export")
 
 
 def detail_url(payment_id):
@@ -75,6 +76,31 @@ class AuthenticatedPaymentApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, serializer.data)
 
+    def test_payment_list_with_cursor_pagination(self):
+        """
+        Test retrieving payments page by page with a cursor.
+        """
+        payments = [self.payment] + [
+            Payment.objects.create(borrowing=self.borrowing)
+            for _ in range(10)
+        ]
+
+        response = self.client.get(PAYMENT_URL, {"pagination": "cursor"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertEqual(
+            response.data["results"],
+            PaymentSerializer(payments[:0:-1], many=True).data
+        )
+
+        response = self.client.get(response.data["next"])
+
+        self.assertEqual(
+            response.data["results"],
+            PaymentSerializer(payments[:1], many=True).data
+        )
+
     def test_retrieve_payment(self):
         """
         Test retrieving a specific payment.
@@ -133,6 +159,14 @@ class AuthenticatedPaymentApiTests(TestCase):
             }
         )
 
+    def test_export_payments_not_allowed(self):
+        """
+        Test that only admins can export payments.
+        """
+        response = self.client.get(PAYMENT_EXPORT_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
 
 class AdminPaymentApiTests(TestCase):
     """
@@ -182,3 +216,23 @@ class AdminPaymentApiTests(TestCase):
             response.status_code,
             status.HTTP_405_METHOD_NOT_ALLOWED
         )
+
+    def test_export_payments(self):
+        """
+        Test streaming all payments as CSV.
+        """
+        response = self.client.get(PAYMENT_EXPORT_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response["Content-Disposition"],
+            'attachment; filename="payment.csv"'
+        )
+        self.assertEqual(
+            b"".join(response.streaming_content).decode().splitlines(),
+            [
+                "id,status,payment_type,borrowing_id,money_to_pay,"
+                "session_id,session_url",
+                f"{self.payment.id},PENDING,PAYMENT,{self.borrowing.id},,,",
+            ]
+        )
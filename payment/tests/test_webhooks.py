@@ -0,0 +1,196 @@
+import datetime
+import hashlib
+import hmac
+import json
+import time
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from book.models import Book
+from borrowings.models import Borrowing
+from notification.models import OutboxMessage
+from payment.models import Payment, StripeEvent
+from payment.tasks import notify_payment_paid, purge_stripe_events
+
+WEBHOOK_SECRET = "whsec_test"
+WEBHOOK_URL = reverse("payment:payment-webhook")
+PAYMENT_SUCCESS_URL = reverse("payment:payment-success")
+
+
+def stripe_event(event_id, event_type, session_id, payment_status="paid"):
+    return json.dumps({
+        "id": event_id,
+        "object": "event",
+        "type": event_type,
+        "data": {
+            "object": {
+                "id": session_id,
+                "object": "checkout.session",
+                "payment_status": payment_status,
+            }
+        },
+    })
+
+
+def signature(payload, secret=WEBHOOK_SECRET):
+    """Build a Stripe-Signature header the way Stripe signs events"""
+    timestamp = int(time.time())
+    digest = hmac.new(
+        secret.encode(),
+        f"{timestamp}.{payload}".encode(),
+        hashlib.sha256
+    ).hexdigest()
+
+    return f"t={timestamp},v1={digest}"
+
+
+@override_settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET)
+class StripeWebhookTests(TestCase):
+    """Tests for the Stripe webhook endpoint"""
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="test12345"
+        )
+        self.borrowing = Borrowing.objects.create(
+            expected_return_date=(
+                datetime.date.today() + datetime.timedelta(days=3)
+            ),
+            book=Book.objects.create(
+                title="Test book",
+                daily_fee=3.33,
+                inventory=1
+            ),
+            user=self.user
+        )
+        self.payment = Payment.objects.create(
+            borrowing=self.borrowing,
+            session_id="cs_test_1",
+            money_to_pay=9.99
+        )
+
+    def paid_notifications(self):
+        return list(OutboxMessage.objects.filter(
+            task=notify_payment_paid.name
+        ).values_list("key", "args"))
+
+    def post_event(self, payload, secret=WEBHOOK_SECRET):
+        return self.client.generic(
+            "POST",
+            WEBHOOK_URL,
+            payload,
+            content_type="application/json",
+            HTTP_STRIPE_SIGNATURE=signature(payload, secret),
+        )
+
+    @patch("notification.outbox.relay")
+    def test_completed_session_marks_payment_paid(self, relay):
+        payload = stripe_event(
+            "evt_1", "checkout.session.completed", "cs_test_1"
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.post_event(payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.Status.PAID)
+        self.assertEqual(
+            self.paid_notifications(),
+            [("payment-paid-cs_test_1", ["cs_test_1"])],
+        )
+
+    @patch("notification.outbox.relay")
+    def test_redelivered_event_is_applied_once(self, relay):
+        payload = stripe_event(
+            "evt_1", "checkout.session.completed", "cs_test_1"
+        )
+
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                res = self.post_event(payload)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(StripeEvent.objects.count(), 1)
+        self.assertEqual(len(self.paid_notifications()), 1)
+
+    def test_unpaid_completed_session_stays_pending(self):
+        self.post_event(stripe_event(
+            "evt_1", "checkout.session.completed", "cs_test_1", "unpaid"
+        ))
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.Status.PENDING)
+
+    @patch("notification.outbox.relay")
+    def test_expired_session_is_not_paid_later(self, relay):
+        self.post_event(stripe_event(
+            "evt_1", "checkout.session.expired", "cs_test_1", "unpaid"
+        ))
+        self.post_event(stripe_event(
+            "evt_2", "checkout.session.completed", "cs_test_1"
+        ))
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.Status.EXPIRED)
+        self.assertEqual(self.paid_notifications(), [])
+
+    def test_invalid_signature(self):
+        res = self.post_event(
+            stripe_event("evt_1", "checkout.session.completed", "cs_test_1"),
+            secret="whsec_other",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(StripeEvent.objects.exists())
+
+    @override_settings(STRIPE_WEBHOOK_SECRET=None)
+    def test_webhook_disabled_without_secret(self):
+        res = self.post_event(
+            stripe_event("evt_1", "checkout.session.completed", "cs_test_1")
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch("payment.utils.services.PaymentService.set_paid_status")
+    def test_payment_success_reads_webhook_status(self, set_paid_status):
+        self.client.force_authenticate(self.user)
+        query_params = {"session_id": "cs_test_1"}
+
+        res = self.client.get(PAYMENT_SUCCESS_URL, query_params)
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+
+        Payment.objects.filter(pk=self.payment.pk).update(
+            status=Payment.Status.PAID
+        )
+        res = self.client.get(PAYMENT_SUCCESS_URL, query_params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        set_paid_status.assert_not_called()
+
+    @patch("payment.tasks.notify")
+    def test_notify_payment_paid(self, notify):
+        notify_payment_paid("cs_test_1")
+
+        notify.assert_called_once()
+        self.assertIn("test@test.com", notify.call_args.args[0])
+
+    def test_purge_stripe_events(self):
+        StripeEvent.objects.create(event_id="evt_new", event_type="test")
+        StripeEvent.objects.create(event_id="evt_old", event_type="test")
+        StripeEvent.objects.filter(event_id="evt_old").update(
+            received_at=timezone.now() - datetime.timedelta(days=31)
+        )
+
+        self.assertEqual(purge_stripe_events(), 1)
+        self.assertEqual(
+            list(StripeEvent.objects.values_list("event_id", flat=True)),
+            ["evt_new"]
+        )
@@ -0,0 +1,58 @@
+import threading
+import time
+import uuid
+
+import stripe
+from django.conf import settings
+
+
+class LocalCheckoutSession:
+    """In-process stand-in for stripe.checkout.Session.
+
+    Used when STRIPE_BACKEND is "local" so checkout can be developed,
+    tested and benchmarked offline. STRIPE_LOCAL_LATENCY_MS simulates
+    the Stripe round trip. Like Stripe, a repeated idempotency key
+    returns the session created the first time.
+    """
+
+    _sessions = {}
+    _idempotent = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def create(cls, idempotency_key=None, **params):
+        time.sleep(settings.STRIPE_LOCAL_LATENCY_MS / 1000)
+
+        with cls._lock:
+            if idempotency_key in cls._idempotent:
+                return cls._sessions[cls._idempotent[idempotency_key]]
+
+            session_id = f"cs_local_{uuid.uuid4().hex}"
+            session = stripe.checkout.Session.construct_from(
+                {
+                    "id": session_id,
+                    "object": "checkout.session",
+                    "url": f"https://checkout.local/pay/{session_id}",
+                    "mode": params.get("mode"),
+                    "success_url": params.get("success_url"),
+                    "cancel_url": params.get("cancel_url"),
+                    "payment_status": "unpaid",
+                },
+                "local",
+            )
+            cls._sessions[session_id] = session
+            if idempotency_key:
+                cls._idempotent[idempotency_key] = session_id
+
+        return session
+
+    @classmethod
+    def retrieve(cls, session_id):
+        time.sleep(settings.STRIPE_LOCAL_LATENCY_MS / 1000)
+
+        try:
+            return cls._sessions[session_id]
+        except KeyError:
+            raise stripe.error.InvalidRequestError(
+                f"No such checkout.session: '{session_id}'", "id"
+            )
@@ -1,34 +1,56 @@
 from decimal import Decimal
 
 import stripe
+from django.conf import settings
+from django.db import transaction
 
-from DRF_API_Library import settings
-from payment.models import Borrowing, Payment
+from DRF_API_Library.caching import invalidate_responses
+from DRF_API_Library.versioning import next_version
+from notification.outbox import enqueue
+from payment.models import Borrowing, Payment, StripeEvent
+from payment.utils.local_stripe import LocalCheckoutSession
 
 
 class PaymentService:
     FINE_MULTIPLIER = 2
-    STRIPE_API_KEY = settings.STRIPE_API_KEY
     SUCCESS_URL = (
         "http://localhost:8000/api/library/"
         "payments/success?session_id={CHECKOUT_SESSION_ID}"
     )
     CANCEL_URL = "http://localhost:8000/api/library/payments/cancel/"
+    PAID_EVENTS = (
+        "checkout.session.completed",
+        "checkout.session.async_payment_succeeded",
+    )
+    PAID_STATUSES = ("paid", "no_payment_required")
 
     @classmethod
-    def _create_stripe_session(cls, borrowing, money_to_pay):
+    def _checkout_sessions(cls):
+        """
+        Return the checkout session API selected by STRIPE_BACKEND.
+
+        Returns:
+        - stripe.checkout.Session or its local stand-in.
+        """
+        if settings.STRIPE_BACKEND == "local":
+            return LocalCheckoutSession
+
+        return stripe.checkout.Session
+
+    @classmethod
+    def _create_stripe_session(cls, borrowing, money_to_pay, **options):
         """
         Create a Stripe checkout session for the given borrowing.
 
         Args:
         - borrowing: Borrowing object representing the transaction.
         - money_to_pay: The total amount to be paid for the borrowing.
+        - options: Extra request options, e.g. idempotency_key.
 
         Returns:
         - session: Stripe checkout session object.
         """
-        stripe.api_key = cls.STRIPE_API_KEY
-        session = stripe.checkout.Session.create(
+        session = cls._checkout_sessions().create(
             payment_method_types=["card"],
             line_items=[
                 {
@@ -45,12 +67,62 @@ class PaymentService:
             mode="payment",
             success_url=cls.SUCCESS_URL,
             cancel_url=cls.CANCEL_URL,
+            **options,
         )
 
         return session
 
     @classmethod
-    def create_payment(cls, borrowing):
+    def _create(cls, borrowing, payment_type, money_to_pay, checkout):
+        """
+        Create a pending payment, with a checkout session if asked.
+
+        Without a checkout session the payment waits in the outbox
+        for create_checkout_sessions.
+
+        Returns:
+        - payment: The created Payment object.
+        """
+        payment = Payment(
+            status=Payment.Status.PENDING,
+            payment_type=payment_type,
+            borrowing=borrowing,
+            money_to_pay=money_to_pay,
+        )
+
+        if checkout:
+            session = cls._create_stripe_session(borrowing, money_to_pay)
+            payment.session_id = session.id
+            payment.session_url = session.url
+
+        payment.save()
+
+        return payment
+
+    @classmethod
+    def create_checkout_session(cls, payment):
+        """
+        Create the Stripe checkout session of an outbox payment.
+
+        The payment id is the idempotency key, so a retry after a lost
+        response gets the session Stripe already created.
+
+        Args:
+        - payment: Pending Payment object without a session.
+
+        Returns:
+        - None
+        """
+        session = cls._create_stripe_session(
+            payment.borrowing,
+            payment.money_to_pay,
+            idempotency_key=f"checkout-payment-{payment.id}",
+        )
+        payment.session_id = session.id
+        payment.session_url = session.url
+
+    @classmethod
+    def create_payment(cls, borrowing, checkout=True):
         """
         Create a new payment for the given borrowing.
 
@@ -60,34 +132,32 @@ class PaymentService:
 
         Args:
         - borrowing: Borrowing object representing the transaction.
+        - checkout: Create the Stripe session now, otherwise leave
+        the payment to the outbox.
 
         Returns:
-        - None
+        - payment: The created Payment object.
         """
         days_borrowed = borrowing.expected_return_date - borrowing.borrow_date
         money_to_pay = days_borrowed.days * borrowing.book.daily_fee
-        session = cls._create_stripe_session(borrowing, money_to_pay)
 
-        Payment.objects.create(
-            status="PENDING",
-            payment_type="PAYMENT",
-            borrowing=borrowing,
-            session_url=session.url,
-            session_id=session.id,
-            money_to_pay=money_to_pay
+        return cls._create(
+            borrowing, Payment.Type.PAYMENT, money_to_pay, checkout
         )
 
     @classmethod
-    def calculate_fine(cls, borrowing):
+    def calculate_fine(cls, borrowing, checkout=True):
         """
         Calculate the fine for a borrowing.
 
         Parameters:
             borrowing (Borrowing): The Borrowing object
             for which the fine is being calculated.
+            checkout (bool): Create the Stripe session now, otherwise
+            leave the payment to the outbox.
 
         Returns:
-            None
+            Payment: The created fine payment.
 
         Applies the fine multiplier FINE_MULTIPLIER to the number of
         overdue days, multiplied by the daily fee for the book,
@@ -100,15 +170,9 @@ class PaymentService:
         ).days
         daily_fee = borrowing.book.daily_fee
         fine_amount = overdue_days * daily_fee * cls.FINE_MULTIPLIER
-        session = cls._create_stripe_session(borrowing, fine_amount)
 
-        Payment.objects.create(
-            status="PENDING",
-            payment_type="FINE",
-            borrowing=borrowing,
-            session_id=session.id,
-            session_url=session.url,
-            money_to_pay=fine_amount,
+        return cls._create(
+            borrowing, Payment.Type.FINE, fine_amount, checkout
         )
 
     @classmethod
@@ -125,10 +189,63 @@ class PaymentService:
         - session_id: The ID of the Stripe checkout session.
 
         Returns:
-        - None
+        - payment: The updated Payment object.
         """
-        stripe.api_key = cls.STRIPE_API_KEY
-        stripe.checkout.Session.retrieve(session_id)
+        cls._checkout_sessions().retrieve(session_id)
         payment = Payment.objects.get(session_id=session_id)
         payment.status = Payment.Status.PAID
-        payment.save()
+        payment.save(update_fields=["status"])
+
+        return payment
+
+    @classmethod
+    def handle_webhook_event(cls, event):
+        """
+        Apply a verified Stripe webhook event to its payment.
+
+        The event id is recorded in the same transaction as the status
+        change, so a redelivered event is dropped. Each transition is
+        one UPDATE conditional on the payment still being PENDING, and
+        the notification is written to the outbox of the transaction.
+
+        Args:
+        - event: Event built by stripe.Webhook.construct_event.
+
+        Returns:
+        - bool: False if the event was already processed.
+        """
+        from payment.tasks import notify_payment_paid
+
+        session = event["data"]["object"]
+        pending = Payment.objects.filter(
+            session_id=session["id"], status=Payment.Status.PENDING
+        )
+
+        with transaction.atomic():
+            _, created = StripeEvent.objects.get_or_create(
+                event_id=event["id"], defaults={"event_type": event["type"]}
+            )
+            if not created:
+                return False
+
+            if (
+                event["type"] in cls.PAID_EVENTS
+                and session.get("payment_status") in cls.PAID_STATUSES
+            ):
+                if pending.update(
+                    status=Payment.Status.PAID, version=next_version()
+                ):
+                    invalidate_responses(Payment)
+                    enqueue(
+                        f"payment-paid-{session['id']}",
+                        notify_payment_paid,
+                        session["id"],
+                    )
+
+            elif event["type"] == "checkout.session.expired":
+                if pending.update(
+                    status=Payment.Status.EXPIRED, version=next_version()
+                ):
+                    invalidate_responses(Payment)
+
+        return True
@@ -0,0 +1,63 @@
+import requests
+import stripe
+from django.conf import settings
+from stripe.http_client import HTTPClient
+
+from DRF_API_Library.outbound import CircuitOpenError, outbound
+
+
+class StripeHTTPClient(HTTPClient):
+    """Stripe HTTP client sending requests through the shared
+    "stripe" outbound client.
+
+    Stripe retries network errors itself with idempotency keys, so the
+    outbound client only adds pooling, timeouts, the circuit breaker
+    and latency metrics.
+    """
+
+    name = "requests"
+
+    def request(self, method, url, headers, post_data=None):
+        response = self._send(method, url, headers, post_data, stream=False)
+
+        return response.content, response.status_code, response.headers
+
+    def request_stream(self, method, url, headers, post_data=None):
+        response = self._send(method, url, headers, post_data, stream=True)
+
+        return response.raw, response.status_code, response.headers
+
+    def close(self):
+        pass
+
+    def _send(self, method, url, headers, post_data, stream):
+        try:
+            return outbound("stripe").request(
+                method,
+                url,
+                retries=0,
+                headers=headers,
+                data=post_data,
+                stream=stream,
+                verify=stripe.ca_bundle_path,
+                proxies=self._proxy,
+            )
+        except CircuitOpenError as e:
+            raise stripe.error.APIConnectionError(str(e), should_retry=False)
+        except requests.RequestException as e:
+            raise stripe.error.APIConnectionError(
+                f"Unexpected error communicating with Stripe: {e}",
+                should_retry=(
+                    isinstance(e, (requests.ConnectionError, requests.Timeout))
+                    and not isinstance(e, requests.exceptions.SSLError)
+                ),
+            )
+
+
+def configure_stripe() -> None:
+    """Set the Stripe key and HTTP client once per process"""
+    stripe.api_key = settings.STRIPE_API_KEY
+    stripe.max_network_retries = settings.OUTBOUND_HTTP.get(
+        "stripe", {}
+    ).get("retries", settings.OUTBOUND_HTTP["default"]["retries"])
+    stripe.default_http_client = StripeHTTPClient()
@@ -1,9 +1,17 @@
 import stripe
+from django.conf import settings
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
+from DRF_API_Library.exports import ExportMixin
+from DRF_API_Library.pagination import KeysetPaginationMixin
+from DRF_API_Library.prefetch import SerializerPrefetchMixin
+from DRF_API_Library.replicas import ReplicaReadMixin
+from DRF_API_Library.values import ValuesListMixin
 from payment.models import Payment
 from payment.serializers import (
     PaymentSerializer,
@@ -13,7 +21,19 @@ from payment.utils.services import PaymentService
 from payment.signals import successful_payment
 
 
+class PaymentCursorPagination(CursorPagination):
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = "-id"
+
+
 class PaymentViewSet(
+    ReplicaReadMixin,
+    ValuesListMixin,
+    SerializerPrefetchMixin,
+    ExportMixin,
+    KeysetPaginationMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     viewsets.GenericViewSet
@@ -21,6 +41,20 @@ class PaymentViewSet(
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
     permission_classes = (IsAuthenticated,)
+    pagination_class = None
+    keyset_pagination_class = PaymentCursorPagination
+    values_list_enabled = True
+    # Marks the payment paid without a webhook
+    primary_actions = ("payment_success",)
+    export_fields = {
+        "id": "id",
+        "status": "status",
+        "payment_type": "payment_type",
+        "borrowing_id": "borrowing_id",
+        "money_to_pay": "money_to_pay",
+        "session_id": "session_id",
+        "session_url": "session_url",
+    }
 
     def get_queryset(self):
         queryset = self.queryset
@@ -30,6 +64,20 @@ class PaymentViewSet(
 
         return queryset.filter(borrowing__user=self.request.user)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="pagination",
+                type=str,
+                enum=["cursor"],
+                description="Use cursor pagination (ex. ?pagination=cursor)"
+            ),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        """Get all payments"""
+        return super().list(request, *args, **kwargs)
+
     @action(
         methods=["GET"],
         detail=False,
@@ -57,11 +105,14 @@ class PaymentViewSet(
         serializer.is_valid(raise_exception=True)
         session_id = serializer.validated_data.get("session_id")
 
+        if settings.STRIPE_WEBHOOK_SECRET:
+            return self._payment_status(request, session_id)
+
         try:
-            PaymentService().set_paid_status(session_id)
+            payment = PaymentService().set_paid_status(session_id)
             successful_payment.send_robust(
                 sender=Payment,
-                instance=Payment.objects.get(session_id=session_id),
+                instance=payment,
                 created=True
             )
             return Response(
@@ -74,6 +125,70 @@ class PaymentViewSet(
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+    def _payment_status(self, request, session_id):
+        """Report the payment status stored by the Stripe webhook"""
+        payment_status = self.get_queryset().filter(
+            session_id=session_id
+        ).values_list("status", flat=True).first()
+
+        if payment_status == Payment.Status.PAID:
+            return Response(
+                {"message": f"Thanks for your payment, {request.user.email}!"},
+                status=status.HTTP_200_OK
+            )
+        if payment_status == Payment.Status.PENDING:
+            return Response(
+                {"message": "Your payment is being confirmed."},
+                status=status.HTTP_202_ACCEPTED
+            )
+        if payment_status == Payment.Status.EXPIRED:
+            return Response(
+                {"error": "The payment session has expired."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(
+            {"error": "Payment not found."},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    @extend_schema(request=None, responses={200: None})
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="webhook",
+        url_name="webhook",
+        authentication_classes=[],
+        permission_classes=[AllowAny]
+    )
+    def stripe_webhook(self, request):
+        """
+        Endpoint for Stripe checkout session webhooks.
+
+        The signature is checked against STRIPE_WEBHOOK_SECRET, the event
+        is applied with a single conditional UPDATE and the endpoint
+        answers right away, leaving notifications to Celery. Redelivered
+        events are acknowledged without being applied again.
+        """
+        if not settings.STRIPE_WEBHOOK_SECRET:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            event = stripe.Webhook.construct_event(
+                request.body,
+                request.headers.get("Stripe-Signature", ""),
+                settings.STRIPE_WEBHOOK_SECRET,
+            )
+        except (ValueError, stripe.error.SignatureVerificationError) as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        PaymentService.handle_webhook_event(event)
+
+        return Response(status=status.HTTP_200_OK)
+
     @action(
         methods=["GET"],
         detail=False,
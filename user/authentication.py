@@ -0,0 +1,130 @@
+import functools
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+
+# Columns of the user that requests read, the rest is loaded on access
+CACHED_USER_FIELDS = (
+    "id", "email", "is_staff", "is_superuser", "is_active", "version"
+)
+
+
+@functools.lru_cache(maxsize=None)
+def cached_user_fields() -> list[str]:
+    """Cached columns in the order of the model, as from_db() expects"""
+    return [
+        field.attname
+        for field in get_user_model()._meta.concrete_fields
+        if field.attname in CACHED_USER_FIELDS
+    ]
+
+
+# Bumped to forget every cached user at once, by queryset updates
+# which do not know the users they change
+GENERATION_KEY = "user:auth:generation"
+
+
+def user_cache_key(user_id) -> str:
+    return f"user:auth:{user_id}"
+
+
+def users_generation(cached: dict) -> int:
+    """Generation of the cached users, from values read with get_many().
+
+    A missing generation starts from the clock, so it never goes back
+    to a value that users were cached under before eviction.
+    """
+    if GENERATION_KEY not in cached:
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        return cache.get(GENERATION_KEY)
+
+    return cached[GENERATION_KEY]
+
+
+def invalidate_user(user_id) -> None:
+    """Forget the cached user"""
+    invalidate_users([user_id])
+
+
+def invalidate_users(user_ids) -> None:
+    """Forget the cached users.
+
+    The keys are deleted again after commit, so a request racing the
+    transaction can not keep the old rows cached.
+    """
+    keys = [user_cache_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _bump_generation() -> None:
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        users_generation({})
+
+
+def invalidate_all_users() -> None:
+    """Forget every cached user, bumped again after commit as well"""
+    _bump_generation()
+    transaction.on_commit(_bump_generation)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT authentication reading the user from the shared cache.
+
+    The columns permissions and querysets filter on are cached for
+    USER_CACHE_TIMEOUT seconds, so authenticated requests skip the
+    user query. The user is built with the other fields deferred and
+    saving, deleting or updating it through the User queryset
+    invalidates the cache.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+        key = user_cache_key(user_id)
+        cached = cache.get_many([key, GENERATION_KEY])
+        generation = users_generation(cached)
+        cached_generation, values = cached.get(key, (None, None))
+
+        if values is None or cached_generation != generation:
+            values = self.user_model.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).values_list(*cached_user_fields()).first()
+            if values is None:
+                raise AuthenticationFailed(
+                    _("User not found"), code="user_not_found"
+                )
+            cache.set(
+                key, (generation, values), settings.USER_CACHE_TIMEOUT
+            )
+
+        user = get_user_model().from_db(
+            DEFAULT_DB_ALIAS, cached_user_fields(), values
+        )
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+
+        return user
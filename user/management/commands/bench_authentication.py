@@ -0,0 +1,74 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from borrowings.views import BorrowingViewSet
+from user.authentication import CachedJWTAuthentication
+
+
+class Command(BaseCommand):
+    """Django command to benchmark authenticated requests.
+
+    Send GET /borrowings/ with a JWT of a user with and without
+    the cached user and report requests per second of each.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--email",
+            help="User to authenticate as, the first staff user by default",
+        )
+        parser.add_argument(
+            "--seconds",
+            type=float,
+            default=5,
+            help="Duration of each run",
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by("id")
+        user = (
+            users.filter(email=options["email"]) if options["email"]
+            else users.filter(is_staff=True)
+        ).first()
+        if user is None:
+            self.stderr.write("A user to authenticate as is required")
+            return
+
+        header = f"Bearer {AccessToken.for_user(user)}"
+
+        for authentication_class in (
+            JWTAuthentication, CachedJWTAuthentication
+        ):
+            view = BorrowingViewSet.as_view(
+                {"get": "list"},
+                authentication_classes=(authentication_class,),
+            )
+            rate = self._rate(view, header, options["seconds"])
+            self.stdout.write(
+                f"{authentication_class.__name__}: {rate:.0f} requests/s"
+            )
+
+    @staticmethod
+    def _rate(view, header: str, seconds: float) -> float:
+        factory = APIRequestFactory()
+        requests = 0
+        started = time.perf_counter()
+        deadline = started + seconds
+
+        while time.perf_counter() < deadline:
+            request = factory.get(
+                "/", {"pagination": "cursor"},
+                HTTP_HOST="localhost", HTTP_AUTHORIZE=header,
+            )
+            response = view(request)
+            response.render()
+            if response.status_code != 200:
+                raise RuntimeError(f"Request failed: {response.content}")
+            requests += 1
+
+        return requests / (time.perf_counter() - started)
@@ -2,8 +2,33 @@ from django.db import models
 from django.utils.translation import gettext as _
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 
+from DRF_API_Library.caching import invalidate_responses
+from DRF_API_Library.versioning import VersionedModel, next_version
+from user.authentication import invalidate_all_users
 
-class UserManager(BaseUserManager):
+
+class UserQuerySet(models.QuerySet):
+    """Queryset of users keeping the cached users of requests current.
+
+    update(), and bulk_update() which runs through it, bump the
+    version of the updated users and forget every cached user, as the
+    single UPDATE does not tell which users it changed.
+    """
+
+    def update(self, **kwargs):
+        kwargs.setdefault("version", next_version())
+        updated = super().update(**kwargs)
+
+        if updated:
+            invalidate_all_users()
+            invalidate_responses(self.model)
+
+        return updated
+
+    update.alters_data = True
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     """Define a model manager for User model with no username field."""
 
     use_in_migrations = True
@@ -37,7 +62,7 @@ class UserManager(BaseUserManager):
         return self._create_user(email, password, **extra_fields)
 
 
-class User(AbstractUser):
+class User(AbstractUser, VersionedModel):
     """User model."""
 
     username = None
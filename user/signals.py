@@ -0,0 +1,17 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from DRF_API_Library.caching import invalidate_responses
+from user.authentication import invalidate_user
+
+
+@receiver(
+    [post_save, post_delete],
+    sender=get_user_model(),
+    dispatch_uid="user_auth_cache_invalidation"
+)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """Handle changes of User"""
+    invalidate_user(instance.pk)
+    invalidate_responses(sender)
@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.authentication import cached_user_fields, user_cache_key
+
+BORROWING_URL = reverse("borrowings:borrowing-list")
+PAYMENT_URL = reverse("payment:payment-list")
+ME_URL = reverse("user:manage")
+
+
+class CachedJWTAuthenticationTest(TestCase):
+    """Tests for authentication with the cached user"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com",
+            password="test_password",
+            first_name="Test",
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZE=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_user_is_read_from_cache(self):
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(BORROWING_URL)
+        with CaptureQueriesContext(connection) as second:
+            res = self.client.get(BORROWING_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(second), len(first) - 1)
+        self.assertNotIn(
+            'FROM "user_user"', " ".join(query["sql"] for query in second)
+        )
+
+    def test_saving_user_invalidates_cache(self):
+        self.client.get(PAYMENT_URL)
+        self.assertIsNotNone(cache.get(user_cache_key(self.user.id)))
+
+        self.user.is_staff = True
+        self.user.save()
+
+        self.assertIsNone(cache.get(user_cache_key(self.user.id)))
+        self.client.get(PAYMENT_URL)
+        self.assertTrue(dict(zip(
+            cached_user_fields(), cache.get(user_cache_key(self.user.id))[1]
+        ))["is_staff"])
+
+    def test_queryset_update_invalidates_cache(self):
+        self.client.get(BORROWING_URL)
+
+        # A single UPDATE of the filtered rows
+        with self.assertNumQueries(1):
+            get_user_model().objects.filter(email=self.user.email).update(
+                is_active=False
+            )
+        res = self.client.get(BORROWING_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.version, 2)
+
+    def test_inactive_user_is_rejected(self):
+        self.client.get(BORROWING_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(BORROWING_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected(self):
+        self.client.get(BORROWING_URL)
+
+        self.user.delete()
+        res = self.client.get(BORROWING_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_has_all_fields(self):
+        self.client.get(ME_URL)
+
+        res = self.client.patch(ME_URL, {"last_name": "User"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["first_name"], "Test")
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_name, "User")
@@ -1,6 +1,10 @@
+from django.contrib.auth import get_user_model
+from django.utils.http import quote_etag
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 
+from DRF_API_Library.caching import CachedResponseMixin
+from DRF_API_Library.versioning import ConditionalRequestMixin
 from user.serializers import UserSerializer
 
 
@@ -9,11 +13,21 @@ class CreateUserView(generics.CreateAPIView):
     serializer_class = UserSerializer
 
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class ManageUserView(
+    CachedResponseMixin,
+    ConditionalRequestMixin,
+    generics.RetrieveUpdateAPIView
+):
     """View to manage user profile"""
     serializer_class = UserSerializer
     permission_classes = (IsAuthenticated,)
+    cache_models = {"retrieve": (get_user_model(),)}
+    cache_per_user = ("retrieve",)
+
+    def get_etag(self, lock: bool = False):
+        """The authenticated user comes with its version"""
+        return quote_etag(str(self.request.user.version))
 
     def get_object(self):
-        """Get authenticated user object"""
-        return self.request.user
+        """Get authenticated user object with all its fields"""
+        return get_user_model().objects.get(pk=self.request.user.pk)